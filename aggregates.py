@@ -0,0 +1,205 @@
+import threading
+import weakref
+from collections import Counter
+import columnar
+from storage import get_storage
+
+# Dimensi agregat: nama -> fungsi pengambil kunci dari record aktivitas
+DIMENSIONS = {
+    "status": lambda record: record.get("status"),
+    "marketer": lambda record: record.get("marketer_username"),
+    "location": lambda record: record.get("prospect_location"),
+    "activity_type": lambda record: record.get("activity_type"),
+    "day": lambda record: str(record.get("created_at") or "")[:10] or None,
+}
+
+
+class ActivityAggregates:
+    """
+    Jumlah aktivitas per status, marketing, lokasi, jenis dan hari, serta
+    jumlah aktivitas per nama prospek (untuk menghitung prospek unik).
+    Agregat tingkat atas juga menyimpan sub-agregat per marketing.
+    """
+
+    def __init__(self, per_marketer=True):
+        self.total = 0
+        self.counts = {dimension: Counter() for dimension in DIMENSIONS}
+        self.prospects = Counter()
+        self.by_marketer = {} if per_marketer else None
+
+    # Menambah (sign=1) atau mengurangi (sign=-1) satu record dari agregat
+    def add(self, record, sign=1):
+        self.total += sign
+        for dimension, key_func in DIMENSIONS.items():
+            _bump(self.counts[dimension], key_func(record), sign)
+        _bump(self.prospects, record.get("prospect_name"), sign)
+        if self.by_marketer is not None:
+            username = record.get("marketer_username")
+            sub = self.by_marketer.get(username)
+            if sub is None:
+                sub = self.by_marketer[username] = ActivityAggregates(per_marketer=False)
+            sub.add(record, sign)
+            if sub.total == 0:
+                del self.by_marketer[username]
+
+    def prospect_count(self):
+        return len(self.prospects)
+
+    # Daftar (kunci, jumlah) terurut dari jumlah terbesar
+    def most_common(self, dimension, n=None):
+        return self.counts[dimension].most_common(n)
+
+    def for_marketer(self, username):
+        return self.by_marketer.get(username) or ActivityAggregates(per_marketer=False)
+
+    def copy(self):
+        result = ActivityAggregates(per_marketer=self.by_marketer is not None)
+        result.total = self.total
+        result.counts = {dimension: Counter(counter) for dimension, counter in self.counts.items()}
+        result.prospects = Counter(self.prospects)
+        if self.by_marketer is not None:
+            result.by_marketer = {username: sub.copy() for username, sub in self.by_marketer.items()}
+        return result
+
+    # Menambahkan isi agregat lain ke agregat ini
+    def merge(self, other):
+        self.total += other.total
+        for dimension, counter in other.counts.items():
+            self.counts[dimension].update(counter)
+        self.prospects.update(other.prospects)
+        if self.by_marketer is not None and other.by_marketer is not None:
+            for username, sub in other.by_marketer.items():
+                self.by_marketer.setdefault(username, ActivityAggregates(per_marketer=False)).merge(sub)
+        return self
+
+    # Kebalikan to_dict
+    @classmethod
+    def from_dict(cls, data):
+        result = cls(per_marketer="by_marketer" in data)
+        result.total = data["total"]
+        result.counts.update({dimension: Counter(counter) for dimension, counter in data["counts"].items()})
+        result.prospects = Counter(data["prospects"])
+        if result.by_marketer is not None:
+            result.by_marketer = {username: cls.from_dict(sub) for username, sub in data["by_marketer"].items()}
+        return result
+
+    def to_dict(self):
+        data = {
+            "total": self.total,
+            "counts": {dimension: dict(counter) for dimension, counter in self.counts.items()},
+            "prospects": dict(self.prospects),
+        }
+        if self.by_marketer is not None:
+            data["by_marketer"] = {username: sub.to_dict() for username, sub in self.by_marketer.items()}
+        return data
+
+
+# Fungsi untuk menaikkan/menurunkan hitungan dan membuang kunci yang bernilai nol
+def _bump(counter, key, sign):
+    counter[key] += sign
+    if counter[key] <= 0:
+        del counter[key]
+
+# Fungsi untuk menghitung agregat dari seluruh record aktivitas
+def build_aggregates(activities):
+    aggregates = ActivityAggregates()
+    for record in activities:
+        aggregates.add(record)
+    return aggregates
+
+
+# Agregat aktif: {"storage", "version", "aggregates", "snapshot"}
+_state = {}
+_lock = threading.Lock()
+_registered = weakref.WeakSet()
+
+# Listener penyimpanan: terapkan selisih (sebelum, sesudah) ke agregat
+def _on_change(storage, collection, changes, old_version, new_version):
+    if collection != "activities":
+        return
+    with _lock:
+        if _state.get("storage") is not storage or _state.get("version") != old_version:
+            return
+        aggregates = _state["aggregates"]
+        for before, after in changes:
+            if before is not None:
+                aggregates.add(before, -1)
+            if after is not None:
+                aggregates.add(after, 1)
+        _state["version"] = new_version
+        _state["snapshot"] = None
+
+# Kolom aktivitas yang dibaca dari snapshot kolumnar untuk membangun agregat
+AGGREGATE_COLUMNS = ["status", "marketer_username", "prospect_location", "activity_type", "created_at", "prospect_name"]
+
+# Fungsi untuk membangun ulang agregat dari data penyimpanan
+def rebuild_aggregates(storage=None):
+    """
+    Jika snapshot kolumnar mutakhir, agregat dibangun dari kolom snapshot
+    yang di-mmap sehingga proses dashboard tidak perlu memuat seluruh record;
+    jika tidak, dari record penyimpanan.
+    """
+    storage = storage or get_storage()
+    with _lock:
+        if storage not in _registered:
+            storage.add_listener(_on_change)
+            _registered.add(storage)
+    # Versi dibaca lebih dulu: jika data berubah sesudahnya, agregat dibangun ulang saat dibaca
+    version = storage.version("activities")
+    rows = columnar.iter_snapshot_rows("activities", AGGREGATE_COLUMNS, storage)
+    aggregates = build_aggregates(rows if rows is not None else storage.load("activities"))
+    with _lock:
+        _state.update({"storage": storage, "version": version, "aggregates": aggregates, "snapshot": None})
+    return aggregates
+
+# Fungsi untuk mendapatkan agregat aktivitas (opsional untuk satu marketing)
+def get_activity_aggregates(marketer_username=None):
+    """
+    Agregat diperbarui oleh listener penyimpanan setiap kali proses ini
+    menulis aktivitas, sehingga tidak perlu menghitung ulang seluruh data.
+    Jika data diubah proses lain (versi tidak cocok), agregat dibangun ulang.
+    Hasilnya salinan yang aman dibaca selama rerun Streamlit.
+    """
+    storage = get_storage()
+    version = storage.version("activities")
+    with _lock:
+        current = _state.get("storage") is storage and _state.get("version") == version
+    if not current:
+        rebuild_aggregates(storage)
+    with _lock:
+        if _state["snapshot"] is None:
+            _state["snapshot"] = _state["aggregates"].copy()
+        snapshot = _state["snapshot"]
+    if marketer_username is not None:
+        return snapshot.for_marketer(marketer_username)
+    return snapshot
+
+# Fungsi untuk membandingkan agregat inkremental dengan hasil hitung ulang
+def verify_aggregates(storage=None):
+    """
+    Mengembalikan (cocok, daftar dimensi yang berbeda).
+    """
+    storage = storage or get_storage()
+    with _lock:
+        aggregates = _state.get("aggregates") if _state.get("storage") is storage else None
+        incremental = aggregates.to_dict() if aggregates is not None else None
+    if incremental is None:
+        incremental = get_activity_aggregates().to_dict()
+    expected = build_aggregates(storage.load("activities")).to_dict()
+    differences = [key for key in expected if expected[key] != incremental.get(key)]
+    return not differences, differences
+
+
+if __name__ == "__main__":
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == "rebuild":
+        aggregates = rebuild_aggregates()
+        print(f"Agregat dibangun ulang: {aggregates.total} aktivitas, {aggregates.prospect_count()} prospek")
+    elif command == "verify":
+        ok, differences = verify_aggregates()
+        print("Agregat konsisten" if ok else f"Agregat berbeda pada: {', '.join(differences)}")
+        sys.exit(0 if ok else 1)
+    else:
+        print("Penggunaan: python aggregates.py rebuild|verify")
@@ -4,6 +4,7 @@ import matplotlib.pyplot as plt
 import plotly.express as px
 from datetime import datetime, timedelta
 import os
+import multiprocessing
 from utils_with_edit_delete import (
     initialize_database, check_login, login, logout,
     get_all_users, add_user, delete_user, get_all_marketing_activities,
@@ -11,13 +12,30 @@ from utils_with_edit_delete import (
     edit_marketing_activity, delete_marketing_activity,
     get_activity_by_id, get_all_followups, get_followups_by_activity_id,
     get_followups_by_username, add_followup, update_activity_status,
-    get_app_config, update_app_config
+    get_app_config, update_app_config, add_marketing_activities_bulk,
+    query_marketing_activities, get_upcoming_followups, is_activity_archived, ACTIVITY_STATUSES
 )
-from data_utils import backup_data, restore_data, validate_data_integrity, export_to_csv
-from auto_backup import backup_data
+from data_utils import (
+    backup_data, restore_data, list_backups, validate_data_integrity, export_to_csv,
+    ACTIVITY_IMPORT_COLUMNS, read_import_file, prepare_activity_import
+)
+from auto_backup import start_sheet_sync, request_sheet_sync, get_sheet_sync
+from columnar import start_columnar_snapshots, get_columnar_worker
+from archive import (
+    archive_closed_activities, aggregates_with_archive, followup_count_with_archive, get_archive, get_archive_settings
+)
+from locking import get_lock_metrics
+from frames import get_activities_frame, get_followups_frame, get_activity_labels
+from aggregates import verify_aggregates, rebuild_aggregates
+from search_index import search_activities
+from auth import password_pool, PasswordPoolBusy
 
 # Initialize database
-initialize_database()
+# Proses worker pool password mengimpor ulang script ini; kode start hanya di proses utama
+if multiprocessing.parent_process() is None:
+    initialize_database()
+    start_sheet_sync()
+    start_columnar_snapshots()
 
 # Page configuration
 st.set_page_config(
@@ -35,6 +53,29 @@ STATUS_MAPPING = {
     'gagal': 'Gagal'
 }
 
+# Pilihan urutan daftar aktivitas: label -> (field, menurun); pilihan pertama menjadi default.
+# Urutan relevansi (field None) hanya berlaku saat ada kata pencarian, selain itu terbaru lebih dulu.
+ACTIVITY_SORT_OPTIONS = {
+    'Terbaru': ('created_at', True),
+    'Paling Relevan': (None, False),
+    'Terlama': ('created_at', False),
+    'Nama Prospek (A-Z)': ('prospect_name', False)
+}
+
+# Jumlah pilihan aktivitas yang ditampilkan per halaman pada pemilih aktivitas
+ACTIVITY_PICKER_PAGE_SIZE = 50
+
+# Jumlah aktivitas terbaru yang ditampilkan di dashboard
+DASHBOARD_RECENT_LIMIT = 10
+
+# Fungsi untuk menambahkan nama prospek ke daftar follow-up (untuk tampilan dashboard)
+def followups_with_prospect_names(followups):
+    rows = []
+    for followup in followups:
+        activity = get_activity_by_id(followup['activity_id'])
+        rows.append({**followup, 'prospect_name': activity['prospect_name'] if activity else None})
+    return rows
+
 def add_marketing_activity_wrapper(
     marketer_username, 
     prospect_name, 
@@ -62,7 +103,7 @@ def add_marketing_activity_wrapper(
             description
         )
         if success:
-            backup_data()
+            request_sheet_sync()
             st.success("Data tersimpan!")
             return True, message, activity_id
         else:
@@ -73,6 +114,43 @@ def add_marketing_activity_wrapper(
         st.error(f"Error: {str(e)}")
         return False, str(e), None
 
+def activity_picker(label, marketer_username=None, key="activity_picker", page_size=ACTIVITY_PICKER_PAGE_SIZE):
+    """
+    Selectbox aktivitas dengan pencarian dan halaman. Label diambil dari
+    lookup id -> label per versi data, dan hanya satu halaman pilihan yang
+    dikirim ke selectbox. Pencarian memakai indeks pencarian (hasil paling
+    relevan lebih dulu) ditambah kecocokan ID persis.
+    Mengembalikan ID aktivitas terpilih atau None.
+    """
+    labels, ids = get_activity_labels(marketer_username)
+    
+    search_term = st.text_input("Cari Aktivitas (ID, prospek, kontak atau catatan)", key=f"{key}_search")
+    if search_term:
+        matches = [activity_id for activity_id in search_activities(search_term) if activity_id in labels]
+        if search_term.strip() in labels and search_term.strip() not in matches:
+            matches.insert(0, search_term.strip())
+    else:
+        matches = ids
+    
+    if not matches:
+        st.info("Tidak ada aktivitas yang cocok dengan pencarian.")
+        return None
+    
+    total_pages = (len(matches) - 1) // page_size + 1
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > total_pages:
+        st.session_state[page_key] = total_pages
+    
+    page = 1
+    if total_pages > 1:
+        page = st.number_input("Halaman", min_value=1, max_value=total_pages, step=1, key=page_key)
+    
+    start = (page - 1) * page_size
+    end = min(start + page_size, len(matches))
+    st.caption(f"Menampilkan {start + 1}-{end} dari {len(matches)} aktivitas")
+    
+    return st.selectbox(label, options=matches[start:end], format_func=labels.get, key=key)
+
 def show_login_page():
     """Display the login page"""
     # Custom CSS for login page
@@ -118,11 +196,16 @@ def show_login_page():
             submit = st.form_submit_button("Login", use_container_width=True)
             
             if submit:
-                if login(username, password):
-                    st.success("Login berhasil!")
-                    st.rerun()
+                try:
+                    logged_in = login(username, password)
+                except PasswordPoolBusy:
+                    st.error("Server sedang sibuk memproses login lain. Silakan coba lagi sebentar lagi.")
                 else:
-                    st.error("Username atau password salah!")
+                    if logged_in:
+                        st.success("Login berhasil!")
+                        st.rerun()
+                    else:
+                        st.error("Username atau password salah!")
         
         # Footer
         st.markdown("""
@@ -167,27 +250,25 @@ def show_superadmin_dashboard():
     st.title("Dashboard Superadmin")
     
     # Get all data
-    activities = get_all_marketing_activities()
+    aggregates = aggregates_with_archive()
     followups = get_all_followups()
     users = get_all_users()
     marketing_users = [user for user in users if user['role'] == 'marketing']
     
-    if not activities:
+    if not aggregates.total:
         st.info("Belum ada data aktivitas pemasaran. Tambahkan aktivitas pemasaran terlebih dahulu.")
         return
     
-    activities_df = pd.DataFrame(activities)
-    
     # Key metrics
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Total Aktivitas", len(activities))
+        st.metric("Total Aktivitas", aggregates.total)
     with col2:
-        st.metric("Total Prospek", activities_df['prospect_name'].nunique())
+        st.metric("Total Prospek", aggregates.prospect_count())
     with col3:
         st.metric("Total Marketing", len(marketing_users))
     with col4:
-        st.metric("Total Follow-up", len(followups) if followups else 0)
+        st.metric("Total Follow-up", followup_count_with_archive())
     
     # First row of charts
     st.subheader("Analisis Aktivitas Pemasaran")
@@ -195,8 +276,7 @@ def show_superadmin_dashboard():
     
     with col1:
         # Status distribution
-        status_counts = activities_df['status'].value_counts().reset_index()
-        status_counts.columns = ['Status', 'Jumlah']
+        status_counts = pd.DataFrame(aggregates.most_common('status'), columns=['Status', 'Jumlah'])
         status_counts['Status'] = status_counts['Status'].map(lambda x: STATUS_MAPPING.get(x, x))
         
         fig = px.pie(
@@ -216,8 +296,7 @@ def show_superadmin_dashboard():
     
     with col2:
         # Activities per marketer
-        marketer_counts = activities_df['marketer_username'].value_counts().reset_index()
-        marketer_counts.columns = ['Marketing', 'Jumlah Aktivitas']
+        marketer_counts = pd.DataFrame(aggregates.most_common('marketer'), columns=['Marketing', 'Jumlah Aktivitas'])
         
         fig = px.bar(
             marketer_counts,
@@ -234,11 +313,10 @@ def show_superadmin_dashboard():
     
     with col1:
         # Activities by location
-        location_counts = activities_df['prospect_location'].value_counts().reset_index()
-        location_counts.columns = ['Lokasi', 'Jumlah']
+        location_counts = pd.DataFrame(aggregates.most_common('location', 10), columns=['Lokasi', 'Jumlah'])
         
         fig = px.bar(
-            location_counts.head(10),
+            location_counts,
             x='Lokasi',
             y='Jumlah',
             title='10 Lokasi Prospek Teratas',
@@ -249,9 +327,8 @@ def show_superadmin_dashboard():
     
     with col2:
         # Activities by type
-        if 'activity_type' in activities_df.columns:
-            type_counts = activities_df['activity_type'].value_counts().reset_index()
-            type_counts.columns = ['Jenis Aktivitas', 'Jumlah']
+        if aggregates.counts['activity_type']:
+            type_counts = pd.DataFrame(aggregates.most_common('activity_type'), columns=['Jenis Aktivitas', 'Jumlah'])
             
             fig = px.pie(
                 type_counts,
@@ -264,8 +341,7 @@ def show_superadmin_dashboard():
     
     # Recent activities
     st.subheader("Aktivitas Pemasaran Terbaru")
-    activities_df['created_at'] = pd.to_datetime(activities_df['created_at'])
-    activities_df = activities_df.sort_values('created_at', ascending=False)
+    recent_activities, _ = query_marketing_activities(limit=DASHBOARD_RECENT_LIMIT)
     
     display_columns = ['marketer_username', 'prospect_name', 'prospect_location', 
                       'activity_type', 'status', 'created_at']
@@ -279,31 +355,16 @@ def show_superadmin_dashboard():
         'created_at': 'Tanggal Dibuat'
     }
     
-    display_df = activities_df[display_columns].rename(columns=column_mapping)
+    display_df = pd.DataFrame(recent_activities, columns=display_columns).rename(columns=column_mapping)
     display_df['Status'] = display_df['Status'].map(lambda x: STATUS_MAPPING.get(x, x))
-    st.dataframe(display_df.head(10), use_container_width=True)
+    st.dataframe(display_df, use_container_width=True)
     
     # Upcoming follow-ups
     if followups:
         st.subheader("Follow-up yang Akan Datang")
-        followups_df = pd.DataFrame(followups)
-        followups_df['next_followup_date'] = pd.to_datetime(followups_df['next_followup_date'])
-        
-        today = datetime.now()
-        next_week = today + timedelta(days=7)
-        upcoming_followups = followups_df[
-            (followups_df['next_followup_date'] >= today) & 
-            (followups_df['next_followup_date'] <= next_week)
-        ]
-        
-        if not upcoming_followups.empty:
-            upcoming_followups = upcoming_followups.merge(
-                activities_df[['id', 'prospect_name']],
-                left_on='activity_id',
-                right_on='id',
-                how='left'
-            )
-            
+        upcoming_followups = get_upcoming_followups(days=7)
+        
+        if upcoming_followups:
             display_columns = ['marketer_username', 'prospect_name', 'next_followup_date', 'next_action']
             column_mapping = {
                 'marketer_username': 'Marketing',
@@ -312,8 +373,9 @@ def show_superadmin_dashboard():
                 'next_action': 'Tindakan Selanjutnya'
             }
             
-            display_df = upcoming_followups[display_columns].rename(columns=column_mapping)
-            display_df = display_df.sort_values('Tanggal Follow-up')
+            display_df = pd.DataFrame(
+                followups_with_prospect_names(upcoming_followups), columns=display_columns
+            ).rename(columns=column_mapping)
             st.dataframe(display_df, use_container_width=True)
         else:
             st.info("Tidak ada follow-up yang dijadwalkan dalam 7 hari ke depan.")
@@ -324,29 +386,23 @@ def show_marketing_dashboard():
     user = st.session_state.user
     username = user['username']
     
-    # Ambil data aktivitas marketing
-    activities = get_marketing_activities_by_username(username)
+    # Ambil agregat aktivitas marketing
+    aggregates = aggregates_with_archive(username)
     followups = get_followups_by_username(username)
     
     # Jika tidak ada data, tampilkan pesan
-    if not activities:
+    if not aggregates.total:
         st.info("Anda belum memiliki aktivitas pemasaran. Tambahkan aktivitas pemasaran terlebih dahulu.")
         return
     
-    # Konversi ke DataFrame untuk analisis
-    activities_df = pd.DataFrame(activities)
-    
     # Metrik utama
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Aktivitas", len(activities))
+        st.metric("Total Aktivitas", aggregates.total)
     with col2:
-        st.metric("Total Prospek", activities_df['prospect_name'].nunique())
+        st.metric("Total Prospek", aggregates.prospect_count())
     with col3:
-        if followups:
-            st.metric("Total Follow-up", len(followups))
-        else:
-            st.metric("Total Follow-up", 0)
+        st.metric("Total Follow-up", followup_count_with_archive(username))
     
     # Baris pertama grafik
     st.subheader("Analisis Aktivitas Pemasaran")
@@ -354,8 +410,7 @@ def show_marketing_dashboard():
     
     with col1:
         # Distribusi status prospek
-        status_counts = activities_df['status'].value_counts().reset_index()
-        status_counts.columns = ['Status', 'Jumlah']
+        status_counts = pd.DataFrame(aggregates.most_common('status'), columns=['Status', 'Jumlah'])
         
         # Mapping status untuk tampilan yang lebih baik
         status_mapping = {
@@ -383,9 +438,8 @@ def show_marketing_dashboard():
     
     with col2:
         # Aktivitas per jenis
-        if 'activity_type' in activities_df.columns:
-            type_counts = activities_df['activity_type'].value_counts().reset_index()
-            type_counts.columns = ['Jenis Aktivitas', 'Jumlah']
+        if aggregates.counts['activity_type']:
+            type_counts = pd.DataFrame(aggregates.most_common('activity_type'), columns=['Jenis Aktivitas', 'Jumlah'])
             
             fig = px.pie(
                 type_counts,
@@ -401,11 +455,10 @@ def show_marketing_dashboard():
     
     with col1:
         # Aktivitas per lokasi
-        location_counts = activities_df['prospect_location'].value_counts().reset_index()
-        location_counts.columns = ['Lokasi', 'Jumlah']
+        location_counts = pd.DataFrame(aggregates.most_common('location', 10), columns=['Lokasi', 'Jumlah'])
         
         fig = px.bar(
-            location_counts.head(10),
+            location_counts,
             x='Lokasi',
             y='Jumlah',
             title='10 Lokasi Prospek Teratas',
@@ -417,9 +470,8 @@ def show_marketing_dashboard():
     # Daftar aktivitas terbaru
     st.subheader("Aktivitas Pemasaran Terbaru")
     
-    # Konversi created_at ke datetime dan urutkan
-    activities_df['created_at'] = pd.to_datetime(activities_df['created_at'])
-    activities_df = activities_df.sort_values('created_at', ascending=False)
+    # Hanya 10 aktivitas terbaru yang diambil (urut created_at menurun)
+    recent_activities, _ = query_marketing_activities(marketer_username=username, limit=DASHBOARD_RECENT_LIMIT)
     
     # Pilih kolom yang ingin ditampilkan
     display_columns = ['prospect_name', 'prospect_location', 
@@ -434,38 +486,22 @@ def show_marketing_dashboard():
         'created_at': 'Tanggal Dibuat'
     }
     
-    display_df = activities_df[display_columns].rename(columns=column_mapping)
+    display_df = pd.DataFrame(recent_activities, columns=display_columns).rename(columns=column_mapping)
     
     # Mapping status untuk tampilan yang lebih baik
     display_df['Status'] = display_df['Status'].map(lambda x: status_mapping.get(x, x))
     
     # Tampilkan 10 aktivitas terbaru
-    st.dataframe(display_df.head(10), use_container_width=True)
+    st.dataframe(display_df, use_container_width=True)
     
     # Daftar follow-up yang akan datang
     if followups:
         st.subheader("Follow-up yang Akan Datang")
         
-        followups_df = pd.DataFrame(followups)
-        followups_df['next_followup_date'] = pd.to_datetime(followups_df['next_followup_date'])
-        
-        # Filter follow-up yang akan datang (dalam 7 hari ke depan)
-        today = datetime.now()
-        next_week = today + timedelta(days=7)
-        upcoming_followups = followups_df[
-            (followups_df['next_followup_date'] >= today) & 
-            (followups_df['next_followup_date'] <= next_week)
-        ]
-        
-        if not upcoming_followups.empty:
-            # Gabungkan dengan data aktivitas untuk mendapatkan nama prospek
-            upcoming_followups = upcoming_followups.merge(
-                activities_df[['id', 'prospect_name']],
-                left_on='activity_id',
-                right_on='id',
-                how='left'
-            )
-            
+        # Follow-up yang dijadwalkan dalam 7 hari ke depan, terurut dari yang terdekat
+        upcoming_followups = get_upcoming_followups(username, days=7)
+        
+        if upcoming_followups:
             # Pilih kolom yang ingin ditampilkan
             display_columns = ['prospect_name', 'next_followup_date', 'next_action']
             
@@ -476,8 +512,10 @@ def show_marketing_dashboard():
                 'next_action': 'Tindakan Selanjutnya'
             }
             
-            display_df = upcoming_followups[display_columns].rename(columns=column_mapping)
-            display_df = display_df.sort_values('Tanggal Follow-up')
+            # Nama prospek diambil dari aktivitas terkait
+            display_df = pd.DataFrame(
+                followups_with_prospect_names(upcoming_followups), columns=display_columns
+            ).rename(columns=column_mapping)
             
             st.dataframe(display_df, use_container_width=True)
         else:
@@ -489,37 +527,77 @@ def show_marketing_activities_page():
     
     user = st.session_state.user
     
-    tab1, tab2, tab3, tab4 = st.tabs(["Daftar Aktivitas", "Tambah Aktivitas", "Edit Aktivitas", "Hapus Aktivitas"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["Daftar Aktivitas", "Tambah Aktivitas", "Edit Aktivitas", "Hapus Aktivitas", "Import Aktivitas"])
     
     with tab1:
-        activities = get_all_marketing_activities() if user['role'] == 'superadmin' else get_marketing_activities_by_username(user['username'])
+        marketer_filter = None if user['role'] == 'superadmin' else user['username']
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            status_filter = st.selectbox(
+                "Filter Status", ['Semua'] + ACTIVITY_STATUSES,
+                format_func=lambda x: STATUS_MAPPING.get(x, x)
+            )
+        
+        with col2:
+            search_term = st.text_input("Cari Prospek", "", help="Mencari nama prospek, lokasi, kontak, deskripsi dan catatan follow-up")
+        
+        with col3:
+            date_range = st.date_input("Rentang Tanggal Dibuat", value=[], format="YYYY-MM-DD")
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            if user['role'] == 'superadmin':
+                marketing_usernames = [u['username'] for u in get_all_users() if u['role'] == 'marketing']
+                selected_marketer = st.selectbox("Filter Marketing", ['Semua'] + marketing_usernames)
+                if selected_marketer != 'Semua':
+                    marketer_filter = selected_marketer
+        
+        with col2:
+            sort_option = st.selectbox("Urutkan", list(ACTIVITY_SORT_OPTIONS))
+        
+        with col3:
+            page_size = st.selectbox("Baris per Halaman", [25, 50, 100], index=1)
+        
+        include_archived = st.checkbox(
+            "Cari di arsip", value=False,
+            help="Sertakan aktivitas berhasil/gagal yang sudah lama dan telah dipindahkan ke arsip"
+        )
+        
+        # Kembali ke halaman pertama jika filter berubah
+        filter_state = (status_filter, search_term, tuple(date_range), marketer_filter, sort_option, page_size,
+                        include_archived)
+        if st.session_state.get("activity_list_filters") != filter_state:
+            st.session_state.activity_list_filters = filter_state
+            st.session_state.activity_list_page = 1
+        
+        sort_by, descending = ACTIVITY_SORT_OPTIONS[sort_option]
+        if sort_by is None and not search_term:
+            sort_by, descending = ACTIVITY_SORT_OPTIONS['Terbaru']
+        query_args = dict(
+            status=None if status_filter == 'Semua' else status_filter,
+            marketer_username=marketer_filter,
+            date_from=date_range[0] if len(date_range) > 0 else None,
+            date_to=date_range[1] if len(date_range) > 1 else None,
+            search=search_term or None,
+            sort_by=sort_by,
+            descending=descending,
+            limit=page_size,
+            include_archived=include_archived
+        )
+        
+        page = st.session_state.get("activity_list_page", 1)
+        activities, total = query_marketing_activities(offset=(page - 1) * page_size, **query_args)
+        total_pages = max(1, (total - 1) // page_size + 1)
+        if page > total_pages:
+            page = st.session_state.activity_list_page = total_pages
+            activities, total = query_marketing_activities(offset=(page - 1) * page_size, **query_args)
         
         if not activities:
-            st.info("Belum ada data aktivitas pemasaran.")
+            st.info("Belum ada data aktivitas pemasaran yang sesuai.")
         else:
-            activities_df = pd.DataFrame(activities)
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                if 'status' in activities_df.columns:
-                    status_options = ['Semua'] + sorted(activities_df['status'].unique().tolist())
-                    status_filter = st.selectbox("Filter Status", status_options)
-            
-            with col2:
-                search_term = st.text_input("Cari Prospek", "")
-            
-            filtered_df = activities_df.copy()
-            
-            if status_filter != 'Semua' and 'status' in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df['status'] == status_filter]
-            
-            if search_term:
-                filtered_df = filtered_df[
-                    filtered_df['prospect_name'].str.contains(search_term, case=False) |
-                    filtered_df['prospect_location'].str.contains(search_term, case=False)
-                ]
-            
             if user['role'] == 'superadmin':
                 display_columns = ['id', 'marketer_username', 'prospect_name', 'prospect_location', 
                                   'activity_type', 'status', 'created_at']
@@ -544,21 +622,33 @@ def show_marketing_activities_page():
                     'created_at': 'Tanggal Dibuat'
                 }
             
-            display_df = filtered_df[display_columns].rename(columns=column_mapping)
+            display_df = pd.DataFrame(
+                [{column: activity.get(column) for column in display_columns} for activity in activities]
+            ).rename(columns=column_mapping)
             
             if 'Status' in display_df.columns:
                 display_df['Status'] = display_df['Status'].map(lambda x: STATUS_MAPPING.get(x, x))
             
             st.dataframe(display_df, use_container_width=True)
             
+            first_row = (page - 1) * page_size + 1
+            st.caption(f"Menampilkan {first_row}-{first_row + len(activities) - 1} dari {total} aktivitas")
+            if total_pages > 1:
+                st.number_input("Halaman", min_value=1, max_value=total_pages, step=1, key="activity_list_page")
+            
             st.subheader("Detail Aktivitas")
+            activity_labels = {activity['id']: f"{activity['id']} - {activity['prospect_name']}" for activity in activities}
             selected_id = st.selectbox("Pilih ID Aktivitas untuk melihat detail", 
-                                      options=filtered_df['id'].tolist())
+                                      options=list(activity_labels), format_func=activity_labels.get)
             
             if selected_id:
-                activity = get_activity_by_id(selected_id)
+                activity = get_activity_by_id(selected_id, include_archived=include_archived)
+                archived = include_archived and is_activity_archived(selected_id)
                 
                 if activity:
+                    if archived:
+                        st.caption("Aktivitas ini berada di arsip dan hanya dapat dilihat.")
+                    
                     col1, col2 = st.columns(2)
                     
                     with col1:
@@ -582,7 +672,7 @@ def show_marketing_activities_page():
                     st.write("**Deskripsi**")
                     st.write(activity['description'])
                     
-                    followups = get_followups_by_activity_id(selected_id)
+                    followups = get_followups_by_activity_id(selected_id, include_archived=archived)
                     
                     if followups:
                         st.subheader("Riwayat Follow-up")
@@ -600,7 +690,7 @@ def show_marketing_activities_page():
                     else:
                         st.info("Belum ada follow-up untuk aktivitas ini.")
                     
-                    if st.button("Tambahkan Follow-up", key="add_followup_button"):
+                    if not archived and st.button("Tambahkan Follow-up", key="add_followup_button"):
                         st.session_state.add_followup_activity_id = selected_id
                         st.session_state.add_followup_mode = True
                         st.rerun()
@@ -651,17 +741,15 @@ def show_marketing_activities_page():
     with tab3:
         st.subheader("Edit Aktivitas Pemasaran")
         
-        activities = get_all_marketing_activities() if user['role'] == 'superadmin' else get_marketing_activities_by_username(user['username'])
+        marketer_filter = None if user['role'] == 'superadmin' else user['username']
         
-        if not activities:
+        if not get_activity_labels(marketer_filter)[1]:
             st.info("Belum ada data aktivitas pemasaran untuk diedit.")
         else:
-            activities_df = pd.DataFrame(activities)
-            
-            selected_id = st.selectbox(
+            selected_id = activity_picker(
                 "Pilih ID Aktivitas untuk diedit",
-                options=activities_df['id'].tolist(),
-                format_func=lambda x: f"{x} - {activities_df[activities_df['id'] == x]['prospect_name'].values[0]}"
+                marketer_filter,
+                key="edit_activity_select"
             )
             
             if selected_id:
@@ -725,17 +813,14 @@ def show_marketing_activities_page():
     with tab4:
         st.subheader("Hapus Aktivitas Pemasaran")
         
-        activities = get_all_marketing_activities() if user['role'] == 'superadmin' else get_marketing_activities_by_username(user['username'])
+        marketer_filter = None if user['role'] == 'superadmin' else user['username']
         
-        if not activities:
+        if not get_activity_labels(marketer_filter)[1]:
             st.info("Belum ada data aktivitas pemasaran untuk dihapus.")
         else:
-            activities_df = pd.DataFrame(activities)
-            
-            selected_id = st.selectbox(
+            selected_id = activity_picker(
                 "Pilih ID Aktivitas untuk dihapus",
-                options=activities_df['id'].tolist(),
-                format_func=lambda x: f"{x} - {activities_df[activities_df['id'] == x]['prospect_name'].values[0]}",
+                marketer_filter,
                 key="delete_activity_select"
             )
             
@@ -766,6 +851,64 @@ def show_marketing_activities_page():
                             st.rerun()
                         else:
                             st.error(message)
+    
+    with tab5:
+        st.subheader("Import Aktivitas dari CSV/Excel")
+        st.write("Kolom wajib: Nama Prospek, Lokasi Prospek, Nama Kontak Person, Tanggal Aktivitas, Jenis Aktivitas, Deskripsi Aktivitas.")
+        if user['role'] == 'superadmin':
+            st.write("Kolom Marketing (username) boleh diisi untuk mencatat aktivitas atas nama marketing lain.")
+        
+        template_df = pd.DataFrame(columns=list(ACTIVITY_IMPORT_COLUMNS.values()))
+        st.download_button(
+            label="Download Template CSV",
+            data=template_df.to_csv(index=False),
+            file_name="template_import_aktivitas.csv",
+            mime="text/csv"
+        )
+        
+        uploaded_file = st.file_uploader("Pilih file CSV atau Excel", type=["csv", "xlsx"], key="import_activities_file")
+        
+        if uploaded_file is not None:
+            try:
+                import_df = read_import_file(uploaded_file)
+            except ImportError:
+                st.error("Membaca file Excel membutuhkan paket openpyxl. Simpan file sebagai CSV atau install openpyxl.")
+                import_df = None
+            except Exception as e:
+                st.error(f"File tidak dapat dibaca: {str(e)}")
+                import_df = None
+            
+            if import_df is not None:
+                is_superadmin = user['role'] == 'superadmin'
+                records, errors = prepare_activity_import(
+                    import_df,
+                    user['username'],
+                    allow_marketer_column=is_superadmin,
+                    known_usernames=[u['username'] for u in get_all_users()] if is_superadmin else None
+                )
+                
+                st.write(f"Baris valid: **{len(records)}** dari {len(import_df)}")
+                
+                if errors:
+                    st.warning(f"{len(errors)} baris ditolak dan tidak akan diimport.")
+                    with st.expander("Lihat baris yang ditolak"):
+                        for error in errors[:200]:
+                            st.write(f"- {error}")
+                        if len(errors) > 200:
+                            st.write(f"... dan {len(errors) - 200} baris lainnya")
+                
+                if records:
+                    preview_df = pd.DataFrame(records[:20]).rename(columns=ACTIVITY_IMPORT_COLUMNS)
+                    st.dataframe(preview_df, use_container_width=True)
+                    
+                    if st.button(f"Import {len(records)} Aktivitas", use_container_width=True):
+                        success, message, activity_ids = add_marketing_activities_bulk(records)
+                        
+                        if success:
+                            request_sheet_sync()
+                            st.success(message)
+                        else:
+                            st.error(message)
 
 def show_followup_page():
     """Display follow-up management page"""
@@ -815,8 +958,6 @@ def show_followup_page():
                         )
                         
                         if success:
-                            update_activity_status(activity_id, status_update)
-                            
                             st.success(message)
                             st.session_state.add_followup_mode = False
                             del st.session_state.add_followup_activity_id
@@ -841,13 +982,17 @@ def show_followup_page():
             if not followups:
                 st.info("Belum ada data follow-up.")
             else:
-                followups_df = pd.DataFrame(followups)
+                followups_df = get_followups_frame(None if user['role'] == 'superadmin' else user['username'])
+                
+                followup_search = st.text_input("Cari Follow-up", "", help="Mencari nama prospek, kontak, deskripsi aktivitas dan catatan follow-up")
+                if followup_search:
+                    matched_activity_ids = search_activities(followup_search)
+                    followups_df = followups_df[followups_df['activity_id'].isin(matched_activity_ids)]
                 
-                activities = get_all_marketing_activities()
-                activity_to_prospect = {activity['id']: activity['prospect_name'] for activity in activities}
+                activities_df = get_activities_frame()
+                activity_to_prospect = pd.Series(activities_df['prospect_name'].values, index=activities_df['id'])
                 followups_df['prospect_name'] = followups_df['activity_id'].map(activity_to_prospect)
                 
-                followups_df['next_followup_date'] = pd.to_datetime(followups_df['next_followup_date'])
                 followups_df = followups_df.sort_values('next_followup_date')
                 
                 display_columns = ['id', 'activity_id', 'prospect_name', 'marketer_username', 
@@ -907,22 +1052,16 @@ def show_followup_page():
             st.info("Follow-up adalah kelanjutan dari aktivitas pemasaran untuk masing-masing klien atau calon klien. Pilih aktivitas pemasaran yang ingin di-follow-up.")
             
             # Filter aktivitas berdasarkan role
-            if user['role'] == 'superadmin':
-                activities = get_all_marketing_activities()
-            else:
-                activities = get_marketing_activities_by_username(user['username'])
+            marketer_filter = None if user['role'] == 'superadmin' else user['username']
             
-            if not activities:
+            if not get_activity_labels(marketer_filter)[1]:
                 st.info("Belum ada aktivitas pemasaran. Tambahkan aktivitas pemasaran terlebih dahulu.")
             else:
-                # Konversi ke DataFrame untuk tampilan
-                activities_df = pd.DataFrame(activities)
-                
                 # Pilih aktivitas untuk follow-up
-                selected_id = st.selectbox(
+                selected_id = activity_picker(
                     "Pilih Aktivitas Pemasaran untuk Follow-up",
-                    options=activities_df['id'].tolist(),
-                    format_func=lambda x: f"{x} - {activities_df[activities_df['id'] == x]['prospect_name'].values[0]}"
+                    marketer_filter,
+                    key="followup_activity_select"
                 )
                 
                 if selected_id:
@@ -1059,8 +1198,8 @@ def show_settings_page():
         st.error("Anda tidak memiliki akses ke halaman ini.")
         return
     
-    # Tab untuk pengaturan umum dan backup/restore
-    tab1, tab2 = st.tabs(["Pengaturan Umum", "Backup & Restore"])
+    # Tab untuk pengaturan umum, backup/restore, dan diagnostik
+    tab1, tab2, tab3 = st.tabs(["Pengaturan Umum", "Backup & Restore", "Diagnostik"])
     
     with tab1:
         st.subheader("Pengaturan Aplikasi")
@@ -1076,8 +1215,9 @@ def show_settings_page():
             submitted = st.form_submit_button("Simpan Pengaturan", use_container_width=True)
             
             if submitted:
-                # Update konfigurasi
+                # Update konfigurasi (seluruh config dikirim agar pengaturan lain tidak hilang)
                 new_config = {
+                    **(config or {}),
                     'app_name': app_name,
                     'company_name': company_name
                 }
@@ -1096,40 +1236,31 @@ def show_settings_page():
         
         with col1:
             st.write("**Backup Data**")
-            st.write("Backup data aplikasi ke file.")
+            st.write("Backup inkremental: hanya bagian data yang berubah yang disimpan.")
             
             if st.button("Backup Data Sekarang", use_container_width=True):
-                success, message, backup_file = backup_data()
-                
-                if success:
-                    st.success(message)
-                    
-                    # Download link
-                    with open(backup_file, "rb") as file:
-                        st.download_button(
-                            label="Download Backup File",
-                            data=file,
-                            file_name=os.path.basename(backup_file),
-                            mime="application/octet-stream",
-                            use_container_width=True
-                        )
-                else:
-                    st.error(message)
+                try:
+                    backup_folder = backup_data()
+                    st.success(f"Backup berhasil dibuat: {os.path.basename(backup_folder)}")
+                except Exception as e:
+                    st.error(f"Gagal membuat backup: {str(e)}")
         
         with col2:
             st.write("**Restore Data**")
-            st.write("Restore data aplikasi dari file backup.")
-            
-            uploaded_file = st.file_uploader("Pilih file backup", type=["zip"])
+            st.write("Restore data aplikasi dari backup yang tersimpan.")
             
-            if uploaded_file is not None:
+            backups = list_backups()
+            if not backups:
+                st.info("Belum ada backup.")
+            else:
+                backup_options = {
+                    f"{backup['created_at']} - {backup['name']} ({backup['files']} file, {backup['size'] / 1024:.1f} KB)": backup["path"]
+                    for backup in backups
+                }
+                selected_backup = st.selectbox("Pilih backup", list(backup_options))
+                
                 if st.button("Restore Data", use_container_width=True):
-                    # Simpan file yang diupload
-                    with open("temp_backup.zip", "wb") as f:
-                        f.write(uploaded_file.getbuffer())
-                    
-                    # Restore data
-                    success, message = restore_data("temp_backup.zip")
+                    success, message = restore_data(backup_options[selected_backup])
                     
                     if success:
                         st.success(message)
@@ -1190,6 +1321,186 @@ def show_settings_page():
                         )
                 else:
                     st.error(message)
+        
+        st.divider()
+        
+        st.subheader("Arsip Data")
+        st.write("Aktivitas berhasil/gagal yang lama tidak berubah dipindahkan beserta follow-up-nya ke arsip "
+                 "terkompresi. Angka di dashboard tetap menghitung aktivitas arsip; isi arsip hanya dibaca "
+                 "saat pencarian arsip diaktifkan.")
+        
+        archive_counts = get_archive().stats()["counts"]
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Aktivitas di Arsip", archive_counts["activities"])
+        with col2:
+            st.metric("Follow-up di Arsip", archive_counts["followups"])
+        
+        min_age_days = st.number_input(
+            "Arsipkan jika tidak berubah selama (hari)", min_value=1,
+            value=int(get_archive_settings()["min_age_days"]), step=1
+        )
+        if st.button("Arsipkan Sekarang", use_container_width=True):
+            try:
+                activity_count, followup_count = archive_closed_activities(min_age_days)
+                st.success(f"{activity_count} aktivitas dan {followup_count} follow-up dipindahkan ke arsip")
+            except Exception as e:
+                st.error(f"Gagal mengarsipkan data: {str(e)}")
+    
+    with tab3:
+        st.subheader("Waktu Tunggu Lock Data")
+        st.write("Lama sesi menunggu giliran menulis data (per proses sejak aplikasi dijalankan).")
+        
+        lock_metrics = get_lock_metrics()
+        
+        if not lock_metrics:
+            st.info("Belum ada penulisan data sejak aplikasi dijalankan.")
+        else:
+            metrics_df = pd.DataFrame([
+                {
+                    'Data': name,
+                    'Jumlah Lock': metric['acquisitions'],
+                    'Rata-rata Tunggu (ms)': round(metric['avg_wait_seconds'] * 1000, 2),
+                    'Maksimum Tunggu (ms)': round(metric['max_wait_seconds'] * 1000, 2),
+                    'Terakhir (ms)': round(metric['last_wait_seconds'] * 1000, 2)
+                }
+                for name, metric in lock_metrics.items()
+            ])
+            st.dataframe(metrics_df, use_container_width=True)
+
+        st.subheader("Hash Password")
+        st.write("Waktu proses bcrypt di pool worker (per proses sejak aplikasi dijalankan).")
+        
+        pool_metrics = password_pool.metrics()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Sedang Diproses", pool_metrics['pending'])
+        with col2:
+            st.metric("Antrian Maksimum", pool_metrics['max_pending'])
+        with col3:
+            st.metric("Ditolak", pool_metrics['rejected'])
+        with col4:
+            st.metric("Fallback Langsung", pool_metrics['fallbacks'])
+        
+        if pool_metrics['operations']:
+            pool_df = pd.DataFrame([
+                {
+                    'Operasi': operation,
+                    'Jumlah': metric['count'],
+                    'Rata-rata Proses (ms)': round(metric['avg_seconds'] * 1000, 1),
+                    'Maksimum Proses (ms)': round(metric['max_seconds'] * 1000, 1),
+                    'Rata-rata Tunggu (ms)': round(metric['avg_wait_seconds'] * 1000, 1)
+                }
+                for operation, metric in pool_metrics['operations'].items()
+            ])
+            st.dataframe(pool_df, use_container_width=True)
+
+        st.subheader("Sinkronisasi Google Sheets")
+
+        sheet_sync = get_sheet_sync()
+        if sheet_sync is None:
+            st.info("Sinkronisasi Google Sheets tidak aktif (dinonaktifkan atau file kredensial tidak ditemukan).")
+        else:
+            sync_status = sheet_sync.status()
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Lag Sinkronisasi (detik)", round(sync_status['lag_seconds'], 1))
+            with col2:
+                st.metric("Sinkronisasi Berhasil", sync_status['syncs'])
+            with col3:
+                st.metric("Percobaan Ulang", sync_status['retries'])
+            with col4:
+                st.metric("Gagal", sync_status['failures'])
+
+            st.write(f"Sinkronisasi terakhir: {sync_status['last_success_at'] or '-'}")
+            if sync_status['last_sync']:
+                last_sync = sync_status['last_sync']
+                if last_sync['rewritten']:
+                    st.write("Seluruh sheet ditulis ulang.")
+                else:
+                    st.write(
+                        f"Baris diperbarui: {last_sync['updated']}, ditambahkan: {last_sync['appended']}, "
+                        f"dihapus: {last_sync['deleted']} ({round(last_sync['seconds'] * 1000)} ms)"
+                    )
+            if sync_status['last_error']:
+                st.warning(f"Error terakhir: {sync_status['last_error']}")
+
+            client_metrics = sheet_sync.sheet_client.metrics()
+            st.write(
+                f"Koneksi: {'terhubung' if client_metrics['connected'] else 'belum terhubung'}, "
+                f"dibuat {client_metrics['connects']} kali, token diperbarui {client_metrics['token_refreshes']} kali"
+            )
+
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                if st.button("Sinkronkan Sekarang", use_container_width=True):
+                    request_sheet_sync()
+                    st.success("Sinkronisasi dijadwalkan.")
+            with col2:
+                if st.button("Sinkronisasi Penuh", use_container_width=True):
+                    request_sheet_sync(full_resync=True)
+                    st.success("Sinkronisasi penuh dijadwalkan.")
+            with col3:
+                preview = st.button("Pratinjau Perubahan", use_container_width=True)
+            with col4:
+                if st.button("Cek Koneksi", use_container_width=True):
+                    ok, message, elapsed = sheet_sync.sheet_client.health_check()
+                    if ok:
+                        st.success(f"{message} ({round(elapsed * 1000)} ms)")
+                    else:
+                        st.error(message)
+
+            if preview:
+                try:
+                    delta = sheet_sync.diff()
+                except Exception as e:
+                    st.error(f"Gagal menghitung perubahan: {str(e)}")
+                else:
+                    if delta['rewrite']:
+                        st.warning(f"Sheet akan ditulis ulang dengan {len(delta['appended'])} aktivitas.")
+                    elif not (delta['deleted'] or delta['updated'] or delta['appended']):
+                        st.success("Sheet sudah sesuai dengan data aplikasi.")
+                    else:
+                        st.dataframe(pd.DataFrame(
+                            [{'ID': activity_id, 'Perubahan': 'Dihapus'} for activity_id in delta['deleted']] +
+                            [{'ID': activity_id, 'Perubahan': 'Diperbarui'} for activity_id in delta['updated']] +
+                            [{'ID': activity_id, 'Perubahan': 'Ditambahkan'} for activity_id in delta['appended']]
+                        ), use_container_width=True)
+
+        st.subheader("Snapshot Kolumnar")
+
+        columnar_worker = get_columnar_worker()
+        if columnar_worker is None:
+            st.info("Snapshot kolumnar tidak aktif (dinonaktifkan atau pyarrow tidak terpasang).")
+        else:
+            snapshot_status = columnar_worker.status()
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Snapshot Ditulis", snapshot_status['writes'])
+            with col2:
+                st.metric("Gagal", snapshot_status['failures'])
+            with col3:
+                st.metric("Menunggu", len(snapshot_status['pending']))
+            if snapshot_status['last_write']:
+                last_write = snapshot_status['last_write']
+                st.write(
+                    f"Snapshot terakhir: {last_write['collection']} pada {last_write['written_at']} "
+                    f"({round(last_write['seconds'] * 1000)} ms)"
+                )
+            if snapshot_status['last_error']:
+                st.warning(f"Error terakhir: {snapshot_status['last_error']}")
+
+        st.subheader("Agregat Dashboard")
+        st.write("Bandingkan agregat dashboard yang diperbarui inkremental dengan hasil hitung ulang dari data.")
+
+        if st.button("Verifikasi Agregat", use_container_width=True):
+            ok, differences = verify_aggregates()
+
+            if ok:
+                st.success("Agregat dashboard konsisten dengan data.")
+            else:
+                rebuild_aggregates()
+                st.warning(f"Agregat berbeda pada: {', '.join(differences)}. Agregat telah dibangun ulang.")
 
 # Fungsi untuk menampilkan halaman profil
 def show_profile_page():
@@ -1219,7 +1530,7 @@ def show_profile_page():
         
         if activities:
             # Hitung statistik
-            activities_df = pd.DataFrame(activities)
+            activities_df = get_activities_frame(user['username'])
             
             # Status
             if 'status' in activities_df.columns:
@@ -0,0 +1,315 @@
+import os
+import gzip
+import json
+import heapq
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from storage import Storage, COLLECTIONS, get_storage, delete_op
+from repository import read_cached_yaml, store_cached_yaml, invalidate, file_signature
+from yaml_io import write_yaml_file
+from locking import data_lock
+from records import to_records
+from search_index import ACTIVITY_FIELDS, FOLLOWUP_FIELDS, tokenize
+from aggregates import ActivityAggregates, build_aggregates, get_activity_aggregates
+
+# Status aktivitas yang dianggap selesai dan boleh diarsipkan
+CLOSED_STATUSES = ("berhasil", "gagal")
+
+# Pengaturan default arsip (dapat ditimpa lewat archive_settings di config.yaml)
+DEFAULT_ARCHIVE_SETTINGS = {
+    "min_age_days": 180,
+}
+
+# Fungsi untuk membaca pengaturan arsip
+def get_archive_settings(config_file=os.path.join("data", "config.yaml")):
+    config = read_cached_yaml(config_file) or {}
+    return {**DEFAULT_ARCHIVE_SETTINGS, **(config.get("archive_settings") or {})}
+
+
+class ArchiveStore(Storage):
+    """
+    Arsip dingin hanya-baca untuk aktivitas yang sudah selesai beserta
+    follow-up-nya. Setiap koleksi disimpan di <nama file>.archive.gz sebagai
+    baris JSON terkompresi gzip. Setiap pengarsipan menambahkan satu member
+    gzip baru di akhir file, sehingga isi lama tidak pernah ditulis ulang.
+    File hanya dibaca saat arsip diminta, lalu di-cache per proses sampai
+    file-nya berubah.
+
+    Jumlah record dan agregat aktivitas arsip disimpan di archive_stats.yaml
+    setiap kali pengarsipan berjalan, bersama ukuran file arsip saat itu.
+    Ringkasan hanya dihitung ulang dari arsip jika ukurannya tidak cocok
+    (misalnya pengarsipan terputus sebelum ringkasan ditulis).
+    """
+
+    def __init__(self, data_dir):
+        super().__init__(data_dir)
+        self._lock = threading.RLock()
+        self._cache = {}
+        self._stats = None
+
+    def archive_path(self, collection):
+        return os.path.splitext(self.file_path(collection))[0] + ".archive.gz"
+
+    def stats_path(self):
+        return os.path.join(self.data_dir, "archive_stats.yaml")
+
+    # Ukuran file arsip (arsip hanya ditambah, sehingga ukuran menandai isinya)
+    def _archive_sizes(self):
+        sizes = {}
+        for collection in COLLECTIONS:
+            signature = file_signature(self.archive_path(collection))
+            sizes[collection] = signature[3] if signature is not None else 0
+        return sizes
+
+    # Ringkasan tersimpan, atau None jika tidak cocok dengan isi arsip saat ini
+    def stored_stats(self):
+        with self._lock:
+            sizes = self._archive_sizes()
+            if self._stats is not None and self._stats["archive_sizes"] == sizes:
+                return self._stats
+            data = read_cached_yaml(self.stats_path())
+            if data is None and not any(sizes.values()):
+                data = {"archive_sizes": sizes, "counts": {collection: 0 for collection in COLLECTIONS},
+                        "followups_by_marketer": {}, "aggregates": ActivityAggregates().to_dict()}
+            if not data or data.get("archive_sizes") != sizes or "followups_by_marketer" not in data:
+                return None
+            self._stats = {**data, "aggregates": ActivityAggregates.from_dict(data["aggregates"])}
+            return self._stats
+
+    # Menulis ringkasan: ditambah dari ringkasan sebelumnya, atau dihitung ulang dari arsip
+    def write_stats(self, previous=None, activities=(), followups=()):
+        with self._lock:
+            sizes = self._archive_sizes()
+            if previous is None:
+                aggregates = build_aggregates(self.load("activities"))
+                followups = self.load("followups")
+                counts = {"activities": aggregates.total, "followups": 0}
+                followups_by_marketer = Counter()
+            else:
+                aggregates = previous["aggregates"].copy()
+                for activity in activities:
+                    aggregates.add(activity)
+                counts = dict(previous["counts"])
+                counts["activities"] += len(activities)
+                followups_by_marketer = Counter(previous["followups_by_marketer"])
+            counts["followups"] += len(followups)
+            followups_by_marketer.update(followup.get("marketer_username") for followup in followups)
+            data = {
+                "archive_sizes": sizes,
+                "counts": counts,
+                "followups_by_marketer": dict(followups_by_marketer),
+                "aggregates": aggregates.to_dict(),
+            }
+            path = self.stats_path()
+            try:
+                write_yaml_file(path, data)
+            except Exception:
+                invalidate(path)
+                raise
+            store_cached_yaml(path, data)
+            self._stats = {**data, "aggregates": aggregates}
+            return self._stats
+
+    # Jumlah record (total dan follow-up per marketing) dan agregat aktivitas arsip tanpa membaca arsip
+    def stats(self):
+        return self.stored_stats() or self.write_stats()
+
+    def source_token(self, collection):
+        return [file_signature(self.archive_path(collection))]
+
+    def version(self, collection):
+        return file_signature(self.archive_path(collection))
+
+    # Record yang diarsipkan ulang (misalnya setelah pengarsipan terputus) memakai salinan terakhir
+    def load(self, collection):
+        path = self.archive_path(collection)
+        with self._lock:
+            signature = file_signature(path)
+            entry = self._cache.get(collection)
+            if entry is None or entry["signature"] != signature:
+                index = {}
+                if signature is not None:
+                    with gzip.open(path, 'rt', encoding='utf-8') as file:
+                        for line in file:
+                            record = json.loads(line)
+                            index[record["id"]] = record
+                entry = self._cache[collection] = {
+                    "signature": signature,
+                    "records": to_records(collection, index.values())
+                }
+            return entry["records"]
+
+    # Menambahkan record ke arsip sebagai member gzip baru
+    def append(self, collection, records):
+        """
+        Pemanggil wajib memegang data_lock koleksi tersebut.
+        """
+        if not records:
+            return
+        payload = "".join(
+            json.dumps(dict(record), ensure_ascii=False, default=str) + "\n" for record in records
+        ).encode("utf-8")
+        with self._lock, open(self.archive_path(collection), 'ab') as file:
+            size = file.tell()
+            try:
+                file.write(gzip.compress(payload))
+                file.flush()
+                os.fsync(file.fileno())
+            except BaseException:
+                # Member yang terpotong membuat seluruh member sesudahnya tidak terbaca
+                file.truncate(size)
+                raise
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+# Fungsi untuk mendapatkan arsip yang berada di direktori data backend aktif
+def get_archive():
+    global _archive
+    storage = get_storage()
+    with _archive_lock:
+        if _archive is None or _archive.data_dir != storage.data_dir:
+            _archive = ArchiveStore(storage.data_dir)
+        return _archive
+
+# Fungsi untuk mendapatkan waktu terakhir aktivitas disentuh (dirinya atau follow-up-nya)
+def _last_touched(activity, followups):
+    stamps = [str(activity.get(field) or "") for field in ("created_at", "updated_at")]
+    stamps += [str(followup.get("created_at") or "") for followup in followups]
+    return max(stamps)
+
+# Fungsi untuk memindahkan aktivitas selesai yang sudah lama ke arsip
+def archive_closed_activities(min_age_days=None, now=None):
+    """
+    Aktivitas berstatus berhasil/gagal yang (beserta follow-up-nya) tidak
+    berubah selama min_age_days dipindahkan ke arsip bersama follow-up-nya.
+    Record ditulis ke arsip dulu, baru dihapus dari penyimpanan utama; jika
+    proses mati di antaranya, pengarsipan berikutnya mengulanginya tanpa
+    duplikat. Mengembalikan (jumlah aktivitas, jumlah follow-up) yang diarsipkan.
+    """
+    if min_age_days is None:
+        min_age_days = get_archive_settings()["min_age_days"]
+    cutoff = ((now or datetime.now()) - timedelta(days=min_age_days)).strftime("%Y-%m-%d %H:%M:%S")
+    storage = get_storage()
+    archive = get_archive()
+    with data_lock("activities", "followups", data_dir=storage.data_dir):
+        # Dibaca sebelum arsip ditambah: None berarti ringkasan harus dihitung ulang
+        previous_stats = archive.stored_stats()
+        activities = []
+        followups = []
+        for activity in storage.load("activities"):
+            if activity.get("status") not in CLOSED_STATUSES:
+                continue
+            activity_followups = storage.find("followups", "activity_id", activity["id"])
+            last_touched = _last_touched(activity, activity_followups)
+            if last_touched and last_touched < cutoff:
+                activities.append(activity)
+                followups.extend(activity_followups)
+        if not activities:
+            return 0, 0
+        archive.append("activities", activities)
+        archive.append("followups", followups)
+        storage.apply_many({
+            "activities": [delete_op(activity["id"]) for activity in activities],
+            "followups": [delete_op(followup["id"]) for followup in followups],
+        })
+        archive.write_stats(previous_stats, activities, followups)
+    return len(activities), len(followups)
+
+# Fungsi untuk menggabungkan record utama dan arsip (salinan utama diutamakan)
+def with_archived(records, archived):
+    ids = {record["id"] for record in records}
+    return list(records) + [record for record in archived if record["id"] not in ids]
+
+_merged = {}
+_merged_lock = threading.Lock()
+
+# Fungsi untuk mendapatkan agregat dashboard, termasuk aktivitas yang sudah diarsipkan
+def aggregates_with_archive(marketer_username=None):
+    """
+    Agregat data utama digabung dengan ringkasan arsip yang tersimpan,
+    sehingga deal yang sudah diarsipkan tetap terhitung tanpa membaca arsip.
+    Hasil gabungan di-cache sampai salah satu sumbernya berubah.
+    """
+    hot = get_activity_aggregates()
+    archived = get_archive().stats()["aggregates"]
+    with _merged_lock:
+        if _merged.get("hot") is not hot or _merged.get("archived") is not archived:
+            _merged.update(hot=hot, archived=archived, aggregates=hot.copy().merge(archived))
+        aggregates = _merged["aggregates"]
+    if marketer_username is not None:
+        return aggregates.for_marketer(marketer_username)
+    return aggregates
+
+# Fungsi untuk menghitung follow-up di penyimpanan utama dan arsip (opsional untuk satu marketing)
+def followup_count_with_archive(marketer_username=None):
+    storage = get_storage()
+    stats = get_archive().stats()
+    if marketer_username is None:
+        return len(storage.load("followups")) + stats["counts"]["followups"]
+    return len(storage.find("followups", "marketer_username", marketer_username)) + \
+        stats["followups_by_marketer"].get(marketer_username, 0)
+
+# Fungsi untuk mencari aktivitas di arsip (termasuk catatan follow-up-nya)
+def search_archived_activities(query):
+    """
+    Memakai aturan yang sama dengan indeks pencarian: setiap kata kunci harus
+    cocok dengan awalan salah satu kata. Arsip tidak diindeks, sehingga
+    pencarian ini memindai arsip dan hanya dipanggil jika arsip diminta.
+    Mengembalikan id aktivitas, terbaru lebih dulu.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return []
+    archive = get_archive()
+    tokens = {}
+    for activity in archive.load("activities"):
+        tokens[activity["id"]] = {
+            token for field in ACTIVITY_FIELDS for token in tokenize(activity.get(field))
+        }
+    for followup in archive.load("followups"):
+        activity_tokens = tokens.get(followup.get("activity_id"))
+        if activity_tokens is not None:
+            activity_tokens.update(token for field in FOLLOWUP_FIELDS for token in tokenize(followup.get(field)))
+    matches = [
+        activity for activity in archive.load("activities")
+        if all(any(token.startswith(term) for token in tokens[activity["id"]]) for term in terms)
+    ]
+    matches.sort(key=lambda activity: str(activity.get("created_at") or ""), reverse=True)
+    return [activity["id"] for activity in matches]
+
+# Fungsi untuk mengambil satu halaman dari gabungan penyimpanan utama dan arsip
+def query_with_archive(collection, ids=None, archived_ids=None, sort_by=None, descending=False,
+                       offset=0, limit=None, **query):
+    """
+    Parameter sama dengan Storage.query; ids berlaku untuk penyimpanan utama
+    dan archived_ids untuk arsip. Penyimpanan utama diambil sampai
+    offset+limit; arsip dicocokkan seluruhnya agar record yang masih ada di
+    penyimpanan utama tidak ikut dihitung. Keduanya digabung sesuai urutan
+    sort_by; tanpa sort_by, hasil utama lebih dulu.
+    """
+    storage = get_storage()
+    end = None if limit is None else offset + limit
+    hot, hot_total = [], 0
+    if ids is None or ids:
+        hot, hot_total = storage.query(collection, ids=ids, sort_by=sort_by, descending=descending, limit=end, **query)
+    cold, cold_total = [], 0
+    if archived_ids is None or archived_ids:
+        # Record arsip yang masih ada di penyimpanan utama (pengarsipan terputus) dibuang
+        # sebelum dihitung, sehingga total tidak menghitungnya dua kali
+        cold, _ = get_archive().query(collection, ids=archived_ids, sort_by=sort_by, descending=descending, **query)
+        cold = [record for record in cold if storage.get(collection, record["id"]) is None]
+        cold_total = len(cold)
+        cold = cold[:end]
+    if sort_by:
+        merged = list(heapq.merge(hot, cold, key=lambda record: str(record.get(sort_by) or ""), reverse=descending))
+    else:
+        merged = hot + cold
+    return merged[offset:end], hot_total + cold_total
+
+
+if __name__ == "__main__":
+    activity_count, followup_count = archive_closed_activities()
+    print(f"Pengarsipan selesai: {activity_count} aktivitas, {followup_count} follow-up")
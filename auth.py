@@ -0,0 +1,273 @@
+import os
+import hmac
+import time
+import bcrypt
+import hashlib
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from repository import read_cached_yaml, get_version
+from records import UserRecord
+
+# Nilai default security_settings di config.yaml
+DEFAULT_SECURITY_SETTINGS = {
+    "bcrypt_rounds": 12,
+    "credential_cache_ttl": 300,
+    "credential_cache_size": 256,
+    "password_workers": 2,
+    "password_queue_limit": 16,
+    "password_timeout": 30,
+}
+
+# Fungsi untuk membaca pengaturan keamanan dari config.yaml
+def get_security_settings(config_file=os.path.join("data", "config.yaml")):
+    config = read_cached_yaml(config_file) or {}
+    return {**DEFAULT_SECURITY_SETTINGS, **(config.get("security_settings") or {})}
+
+
+# Indeks pengguna: path file -> {"version", "users": {username: user}}
+_user_indexes = {}
+_user_index_lock = threading.Lock()
+
+# Fungsi untuk mendapatkan indeks username -> pengguna
+def get_user_index(users_file=os.path.join("data", "users.yaml")):
+    """
+    Dibangun sekali per versi users.yaml. add_user dan delete_user menulis
+    lewat write_yaml yang menaikkan versi cache, sehingga indeks otomatis
+    dibangun ulang; begitu juga jika file diubah proses lain.
+    """
+    version = get_version(users_file)
+    key = os.path.abspath(users_file)
+    with _user_index_lock:
+        entry = _user_indexes.get(key)
+        if entry is not None and entry["version"] == version:
+            return entry["users"]
+    users_data = read_cached_yaml(users_file) or {}
+    users = {user["username"]: UserRecord(user) for user in users_data.get("users") or []}
+    with _user_index_lock:
+        _user_indexes[key] = {"version": version, "users": users}
+    return users
+
+
+class CredentialCache:
+    """
+    Cache kredensial yang baru saja lolos verifikasi bcrypt, agar login ulang
+    dalam waktu singkat tidak menghitung bcrypt lagi. Kunci cache adalah
+    HMAC-SHA256 dari username, password dan hash tersimpan dengan kunci acak
+    per proses, sehingga isi cache tidak bisa dipakai untuk menebak password.
+    Hash yang berubah (ganti password) otomatis tidak lagi cocok.
+    Hanya verifikasi yang berhasil yang di-cache.
+    """
+
+    def __init__(self, max_size=DEFAULT_SECURITY_SETTINGS["credential_cache_size"],
+                 ttl=DEFAULT_SECURITY_SETTINGS["credential_cache_ttl"]):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._key = os.urandom(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, max_size, ttl):
+        with self._lock:
+            self.max_size = max_size
+            self.ttl = ttl
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _digest(self, username, password, password_hash):
+        message = "\0".join((username, password, password_hash)).encode("utf-8")
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def contains(self, username, password, password_hash):
+        digest = self._digest(username, password, password_hash)
+        with self._lock:
+            expires_at = self._entries.get(digest)
+            if expires_at is not None and expires_at > time.monotonic():
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return True
+            self._entries.pop(digest, None)
+            self.misses += 1
+            return False
+
+    def add(self, username, password, password_hash):
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        digest = self._digest(username, password, password_hash)
+        with self._lock:
+            self._entries[digest] = time.monotonic() + self.ttl
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Cache kredensial bersama untuk seluruh sesi di proses ini
+credential_cache = CredentialCache()
+
+
+class PasswordPoolBusy(Exception):
+    """Antrian hash/verifikasi password penuh atau terlalu lama menunggu."""
+
+
+# Fungsi yang dijalankan di proses worker (harus di level modul agar bisa di-pickle)
+def _bcrypt_hash(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+def _bcrypt_check(password, hashed_password):
+    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+# Fungsi untuk memilih cara memulai proses worker
+def _worker_context():
+    """
+    Server Streamlit berjalan dengan banyak thread, sedangkan fork hanya
+    menyalin thread pemanggil sehingga worker bisa mewarisi lock yang sedang
+    dipegang thread lain. Karena itu dipakai forkserver: worker di-fork dari
+    proses server yang masih satu thread. Worker mengimpor ulang script
+    aplikasi sebagai __mp_main__, sehingga script wajib melewati kode start
+    (misalnya lewat multiprocessing.parent_process()) di proses worker.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+class PasswordPool:
+    """
+    Menjalankan bcrypt di pool proses terbatas agar thread sesi Streamlit
+    tidak saling berebut CPU dan GIL. Jumlah permintaan yang menunggu dibatasi
+    password_queue_limit; permintaan berikutnya ditolak dengan PasswordPoolBusy.
+    Jika pool tidak bisa dipakai (password_workers 0 atau proses worker gagal),
+    bcrypt dijalankan langsung di thread pemanggil.
+    """
+
+    def __init__(self, settings=None):
+        # settings: pengganti security_settings dari config.yaml (misalnya saat pengujian)
+        self._settings = settings
+        self._executor = None
+        self._workers = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._metrics = {"rejected": 0, "fallbacks": 0, "max_pending": 0, "operations": {}}
+
+    def _get_executor(self, workers):
+        if self._executor is None or self._workers != workers:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=_worker_context())
+            self._workers = workers
+        return self._executor
+
+    def _discard_executor(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+                self._workers = None
+        executor.shutdown(wait=False)
+
+    def _record(self, operation, wait_seconds, run_seconds):
+        with self._lock:
+            metric = self._metrics["operations"].setdefault(operation, {
+                "count": 0,
+                "total_seconds": 0.0,
+                "max_seconds": 0.0,
+                "total_wait_seconds": 0.0
+            })
+            metric["count"] += 1
+            metric["total_seconds"] += run_seconds
+            metric["max_seconds"] = max(metric["max_seconds"], run_seconds)
+            metric["total_wait_seconds"] += wait_seconds
+
+    def _run(self, operation, func, *args):
+        settings = {**DEFAULT_SECURITY_SETTINGS, **self._settings} if self._settings else get_security_settings()
+        workers = settings["password_workers"]
+        start = time.perf_counter()
+        if workers <= 0:
+            result, run_seconds = _timed(func, *args)
+            self._record(operation, 0.0, run_seconds)
+            return result
+
+        with self._lock:
+            if self._pending >= settings["password_queue_limit"]:
+                self._metrics["rejected"] += 1
+                raise PasswordPoolBusy("Terlalu banyak permintaan password yang sedang diproses")
+            self._pending += 1
+            self._metrics["max_pending"] = max(self._metrics["max_pending"], self._pending)
+            executor = self._get_executor(workers)
+
+        # Slot antrian dilepas saat pekerjaan benar-benar selesai (atau batal),
+        # bukan saat pemanggil berhenti menunggu, agar batas antrian juga
+        # mencakup bcrypt yang masih berjalan setelah timeout
+        def release(_future=None):
+            with self._lock:
+                self._pending -= 1
+
+        try:
+            future = executor.submit(_timed, func, *args)
+        except (BrokenProcessPool, OSError, RuntimeError) as e:
+            release()
+            result, run_seconds = self._run_inline(executor, e, func, *args)
+        else:
+            future.add_done_callback(release)
+            try:
+                result, run_seconds = future.result(timeout=settings["password_timeout"])
+            except FutureTimeoutError:
+                future.cancel()
+                with self._lock:
+                    self._metrics["rejected"] += 1
+                raise PasswordPoolBusy("Permintaan password terlalu lama menunggu giliran")
+            except (BrokenProcessPool, OSError, RuntimeError) as e:
+                result, run_seconds = self._run_inline(executor, e, func, *args)
+        total_seconds = time.perf_counter() - start
+        self._record(operation, max(total_seconds - run_seconds, 0.0), run_seconds)
+        return result
+
+    # Menjalankan bcrypt langsung di thread pemanggil saat pool tidak bisa dipakai
+    def _run_inline(self, executor, error, func, *args):
+        print("⚠️ Pool password tidak bisa dipakai, bcrypt dijalankan langsung:", error)
+        self._discard_executor(executor)
+        with self._lock:
+            self._metrics["fallbacks"] += 1
+        return _timed(func, *args)
+
+    def hash(self, password, rounds):
+        return self._run("hash", _bcrypt_hash, password, rounds)
+
+    def verify(self, password, hashed_password):
+        return self._run("verify", _bcrypt_check, password, hashed_password)
+
+    def metrics(self):
+        with self._lock:
+            operations = {}
+            for operation, metric in self._metrics["operations"].items():
+                operations[operation] = dict(metric)
+                operations[operation]["avg_seconds"] = metric["total_seconds"] / metric["count"]
+                operations[operation]["avg_wait_seconds"] = metric["total_wait_seconds"] / metric["count"]
+            return {
+                "pending": self._pending,
+                "max_pending": self._metrics["max_pending"],
+                "rejected": self._metrics["rejected"],
+                "fallbacks": self._metrics["fallbacks"],
+                "operations": operations
+            }
+
+
+# Pool bcrypt bersama untuk seluruh sesi di proses ini
+password_pool = PasswordPool()
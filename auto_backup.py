@@ -1,34 +1,572 @@
+import os
+import time
+import threading
+import weakref
+from datetime import datetime
 import gspread
+from repository import read_cached_yaml
+from storage import get_storage
 from utils_with_edit_delete import get_all_marketing_activities
 
-def backup_data():
-    """Backup data ke Google Sheets"""
-    try:
-        # 1. Autentikasi
-        gc = gspread.service_account("service_account_key.json")
-        
-        # 2. Buka spreadsheet (ganti dengan ID Anda)
-        sheet = gc.open_by_key("1SdEX5TzMzKfKcE1oCuaez2ctxgIxwwipkk9NT0jOYtI").sheet1
-        
-        # 3. Ambil data terbaru
-        activities = get_all_marketing_activities()
-        
-        # 4. Format data
-        data = [[
-            a.get("id", ""),
-            a.get("prospect_name", ""),
-            a.get("prospect_location", ""),
-            a.get("activity_date", ""),
-            a.get("status", ""),
-            a.get("marketer_username", "")
-        ] for a in activities]
-        
-        # 5. Update sheet
-        sheet.clear()
-        sheet.update("A1", [["ID", "Nama Prospek", "Lokasi", "Tanggal", "Status", "Marketing"]])
-        sheet.update("A2", data)
-        
+# Nilai default sheets_settings di config.yaml
+DEFAULT_SHEETS_SETTINGS = {
+    "enabled": True,
+    "spreadsheet_key": "1SdEX5TzMzKfKcE1oCuaez2ctxgIxwwipkk9NT0jOYtI",
+    "credentials_file": "service_account_key.json",
+    "debounce_seconds": 2,
+    "max_delay_seconds": 30,
+    "max_retries": 5,
+    "backoff_seconds": 1,
+    "backoff_max_seconds": 60,
+    "client_max_age_seconds": 3600,
+}
+
+# Header dan kolom sheet backup (kolom A-F)
+SHEET_HEADER = ["ID", "Nama Prospek", "Lokasi", "Tanggal", "Status", "Marketing"]
+SHEET_FIELDS = ["id", "prospect_name", "prospect_location", "activity_date", "status", "marketer_username"]
+
+# Fungsi untuk membaca pengaturan sinkronisasi Google Sheets dari config.yaml
+def get_sheets_settings(config_file=os.path.join("data", "config.yaml")):
+    config = read_cached_yaml(config_file) or {}
+    return {**DEFAULT_SHEETS_SETTINGS, **(config.get("sheets_settings") or {})}
+
+# Fungsi untuk memuat aktivitas yang disalin ke sheet (aktivitas arsip tetap ada di sheet)
+def load_sheet_activities():
+    return get_all_marketing_activities(include_archived=True)
+
+# Fungsi untuk mengubah aktivitas menjadi satu baris sheet
+def activity_row(activity):
+    # Nilai dibandingkan sebagai teks, sama seperti yang dikembalikan get_all_values
+    return ["" if activity.get(field) is None else str(activity.get(field)) for field in SHEET_FIELDS]
+
+# Fungsi untuk mendapatkan penanda perubahan aktivitas
+def record_token(activity):
+    # version naik di setiap transaksi; updated_at membedakan record lama yang belum punya version
+    return (activity.get("version"), activity.get("updated_at"))
+
+# Fungsi untuk membuat range A1 satu baris
+def _row_range(row_number):
+    return f"A{row_number}:F{row_number}"
+
+
+class SheetClient:
+    """
+    Client gspread dan worksheet yang di-cache per proses, agar setiap
+    sinkronisasi tidak membaca kredensial, menukar token dan mengambil
+    metadata spreadsheet lagi. Token yang kedaluwarsa diperbarui sebelum
+    worksheet diberikan; koneksi dibuat ulang setelah client_max_age_seconds
+    atau setelah invalidate() (misalnya karena error 401 atau koneksi putus).
+    """
+
+    def __init__(self, client_factory, spreadsheet_key,
+                 max_age_seconds=DEFAULT_SHEETS_SETTINGS["client_max_age_seconds"]):
+        self.client_factory = client_factory
+        self.spreadsheet_key = spreadsheet_key
+        self.max_age_seconds = max_age_seconds
+        self._client = None
+        self._spreadsheet = None
+        self._worksheet = None
+        self._connected_at = None
+        self._lock = threading.Lock()
+        self._metrics = {"connects": 0, "token_refreshes": 0, "invalidations": 0, "last_health_check": None}
+
+    def _connect(self):
+        client = self.client_factory()
+        spreadsheet = client.open_by_key(self.spreadsheet_key)
+        self._client, self._spreadsheet, self._worksheet = client, spreadsheet, spreadsheet.sheet1
+        self._connected_at = time.monotonic()
+        self._metrics["connects"] += 1
+
+    # Memperbarui token akses jika kredensial sudah kedaluwarsa
+    def _refresh_token(self):
+        credentials = getattr(getattr(self._client, "http_client", None), "auth", None)
+        if credentials is None or getattr(credentials, "valid", True):
+            return
+        from google.auth.transport.requests import Request
+        credentials.refresh(Request())
+        self._metrics["token_refreshes"] += 1
+
+    # Mendapatkan worksheet (sheet1) dari cache, terhubung ulang jika perlu
+    def worksheet(self):
+        with self._lock:
+            expired = (self._connected_at is not None
+                       and time.monotonic() - self._connected_at >= self.max_age_seconds)
+            if self._worksheet is None or expired:
+                self._connect()
+            else:
+                self._refresh_token()
+            return self._worksheet
+
+    # Membuang koneksi agar pemakaian berikutnya terhubung ulang
+    def invalidate(self):
+        with self._lock:
+            if self._worksheet is not None:
+                self._metrics["invalidations"] += 1
+            self._client = self._spreadsheet = self._worksheet = None
+            self._connected_at = None
+
+    # Mengecek koneksi dengan permintaan metadata yang ringan
+    def health_check(self):
+        """
+        Mengembalikan (ok, pesan, durasi dalam detik). Jika gagal, koneksi
+        dibuang sehingga sinkronisasi berikutnya terhubung ulang.
+        """
+        start = time.perf_counter()
+        try:
+            self.worksheet()
+            with self._lock:
+                spreadsheet = self._spreadsheet
+            spreadsheet.fetch_sheet_metadata({"fields": "spreadsheetId"})
+            ok, message = True, "Koneksi Google Sheets sehat"
+        except Exception as e:
+            self.invalidate()
+            ok, message = False, f"Koneksi Google Sheets gagal: {str(e)}"
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._metrics["last_health_check"] = {
+                "ok": ok,
+                "message": message,
+                "seconds": elapsed,
+                "checked_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+        return ok, message, elapsed
+
+    def metrics(self):
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["connected"] = self._worksheet is not None
+            metrics["connection_age_seconds"] = (
+                None if self._connected_at is None else time.monotonic() - self._connected_at
+            )
+            return metrics
+
+
+# Client per (file kredensial, spreadsheet) yang dipakai bersama di proses ini
+_clients = {}
+_clients_lock = threading.Lock()
+
+# Fungsi untuk mendapatkan SheetClient bersama dari pengaturan
+def get_sheet_client(settings=None):
+    settings = {**DEFAULT_SHEETS_SETTINGS, **(settings or get_sheets_settings())}
+    key = (os.path.abspath(settings["credentials_file"]), settings["spreadsheet_key"])
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            credentials_file = settings["credentials_file"]
+            client = _clients[key] = SheetClient(
+                lambda: gspread.service_account(credentials_file),
+                settings["spreadsheet_key"],
+                max_age_seconds=settings["client_max_age_seconds"]
+            )
+        return client
+
+
+class SheetSyncWorker:
+    """
+    Thread latar belakang yang menyalin aktivitas ke Google Sheets.
+    Permintaan sinkronisasi digabung: worker menunggu sampai tidak ada
+    permintaan baru selama debounce_seconds (paling lama max_delay_seconds),
+    lalu hanya mengirim delta, dikunci dengan id aktivitas.
+
+    Worker mengingat token (version, updated_at) aktivitas yang sudah
+    tersalin di setiap baris, sehingga delta cukup dihitung dengan
+    membandingkan token: baris aktivitas yang dihapus dibuang dalam satu
+    permintaan, baris yang berubah dikirim dalam satu batch_update dan
+    aktivitas baru ditambahkan dengan append_rows. Sinkronisasi penuh
+    (saat pertama kali, setelah gagal, atau diminta) membaca isi sheet dan
+    mencocokkan nilai barisnya; jika sheet tidak bisa dipakai, sheet
+    ditulis ulang. Kegagalan diulang dengan jeda eksponensial sampai max_retries.
+
+    sheet_client adalah SheetClient; saat pengujian client_factory-nya
+    bisa mengembalikan client gspread palsu.
+    """
+
+    def __init__(self, sheet_client, load_activities=load_sheet_activities,
+                 debounce_seconds=DEFAULT_SHEETS_SETTINGS["debounce_seconds"],
+                 max_delay_seconds=DEFAULT_SHEETS_SETTINGS["max_delay_seconds"],
+                 max_retries=DEFAULT_SHEETS_SETTINGS["max_retries"],
+                 backoff_seconds=DEFAULT_SHEETS_SETTINGS["backoff_seconds"],
+                 backoff_max_seconds=DEFAULT_SHEETS_SETTINGS["backoff_max_seconds"]):
+        self.sheet_client = sheet_client
+        self.load_activities = load_activities
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+
+        # Isi sheet yang diketahui: urutan id per baris (mulai baris 2) dan token per id
+        # (None berarti isi baris belum sesuai dengan aktivitasnya)
+        self._sheet_ids = None
+        self._sheet_tokens = None
+        self._sync_lock = threading.Lock()
+
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._requested_at = None
+        self._last_request_at = None
+        self._oldest_unsynced_at = None
+        self._full_resync_requested = False
+        self._syncing = False
+        self._status = {
+            "syncs": 0,
+            "failures": 0,
+            "retries": 0,
+            "last_success_at": None,
+            "last_error": None,
+            "last_sync": None,
+        }
+
+    # Memulai thread worker (aman dipanggil berkali-kali)
+    def start(self):
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="sheet-sync", daemon=True)
+                self._thread.start()
+        return self
+
+    # Menghentikan thread worker
+    def stop(self, timeout=None):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    # Meminta sinkronisasi; permintaan beruntun digabung menjadi satu
+    def request_sync(self, full_resync=False):
+        now = time.monotonic()
+        with self._cond:
+            self._full_resync_requested = self._full_resync_requested or full_resync
+            if self._requested_at is None:
+                self._requested_at = now
+            if self._oldest_unsynced_at is None:
+                self._oldest_unsynced_at = now
+            self._last_request_at = now
+            self._cond.notify_all()
+
+    # Menunggu sampai tidak ada permintaan yang tertunda atau sedang diproses
+    def wait_idle(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._requested_at is not None or self._syncing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._cond:
+                while self._requested_at is None and not self._stop.is_set():
+                    self._cond.wait()
+                # Debounce: tunggu sampai permintaan berhenti datang
+                while not self._stop.is_set():
+                    now = time.monotonic()
+                    remaining = min(
+                        self._last_request_at + self.debounce_seconds,
+                        self._requested_at + self.max_delay_seconds
+                    ) - now
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._stop.is_set():
+                    return
+                self._requested_at = None
+                full_resync, self._full_resync_requested = self._full_resync_requested, False
+                self._syncing = True
+            success = self._sync_with_retry(full_resync)
+            with self._cond:
+                self._syncing = False
+                if success:
+                    # Permintaan yang datang selama sinkronisasi tetap tertunda
+                    self._oldest_unsynced_at = self._requested_at
+                self._cond.notify_all()
+
+    def _sync_with_retry(self, full_resync=False):
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.sync_now(full_resync)
+                return True
+            except Exception as e:
+                print("⚠️ Sinkronisasi Google Sheets gagal:", e)
+                with self._cond:
+                    self._status["last_error"] = str(e)
+                    if attempt < self.max_retries:
+                        self._status["retries"] += 1
+                    else:
+                        self._status["failures"] += 1
+                # Koneksi dan isi sheet tidak lagi pasti; sambung dan baca ulang
+                self.sheet_client.invalidate()
+                with self._sync_lock:
+                    self._sheet_ids = None
+                    self._sheet_tokens = None
+                if attempt == self.max_retries:
+                    return False
+                delay = min(self.backoff_max_seconds, self.backoff_seconds * (2 ** attempt))
+                if self._stop.wait(delay):
+                    return False
+        return False
+
+    # Fungsi untuk menulis ulang seluruh sheet (fallback terakhir)
+    def _rewrite(self, worksheet, activities):
+        worksheet.clear()
+        rows = [activity_row(activity) for activity in activities.values()]
+        worksheet.update(values=[SHEET_HEADER] + rows, range_name="A1")
+        self._sheet_ids = list(activities)
+        self._sheet_tokens = {activity_id: record_token(activity) for activity_id, activity in activities.items()}
+
+    # Fungsi untuk mencocokkan isi sheet dengan aktivitas saat ini (sinkronisasi penuh)
+    def _reconcile(self, worksheet, activities):
+        """
+        Baris yang nilainya sama dengan aktivitasnya dianggap mutakhir, baris
+        lain ditandai usang agar dikirim ulang. Mengembalikan False jika sheet
+        kosong, header berbeda atau ada id ganda.
+        """
+        values = worksheet.get_all_values()
+        if not values or values[0][:len(SHEET_HEADER)] != SHEET_HEADER:
+            return False
+        sheet_ids = []
+        sheet_tokens = {}
+        for row in values[1:]:
+            row = (list(row) + [""] * len(SHEET_HEADER))[:len(SHEET_HEADER)]
+            if row[0] == "" or row[0] in sheet_tokens:
+                return False
+            activity = activities.get(row[0])
+            matches = activity is not None and activity_row(activity) == row
+            sheet_ids.append(row[0])
+            sheet_tokens[row[0]] = record_token(activity) if matches else None
+        self._sheet_ids = sheet_ids
+        self._sheet_tokens = sheet_tokens
+        return True
+
+    # Fungsi untuk membaca ulang posisi baris dari kolom ID sebelum menulis per posisi
+    def _refresh_positions(self, worksheet):
+        """
+        Proses lain, atau orang yang mengurutkan/menyisipkan baris, bisa
+        menggeser posisi baris. Baris baru dari luar dianggap usang (dikirim
+        ulang), id yang hilang dari sheet ditambahkan lagi. Mengembalikan
+        False jika kolom ID tidak bisa dipakai (header berbeda, id kosong
+        atau ganda), sehingga sheet dicocokkan penuh.
+        """
+        column = worksheet.col_values(1)
+        if not column or column[0] != SHEET_HEADER[0]:
+            return False
+        sheet_ids = column[1:]
+        if "" in sheet_ids or len(set(sheet_ids)) != len(sheet_ids):
+            return False
+        tokens = self._sheet_tokens
+        self._sheet_ids = sheet_ids
+        self._sheet_tokens = {activity_id: tokens.get(activity_id) for activity_id in sheet_ids}
         return True
-    except Exception as e:
-        print("⚠️ Backup gagal:", e)
-        return False
\ No newline at end of file
+
+    # Fungsi untuk menghitung delta antara aktivitas dan isi sheet
+    def _plan(self, worksheet, full_resync):
+        """
+        Mengembalikan (aktivitas per id, delta); delta None berarti sheet
+        harus ditulis ulang.
+        """
+        activities = {str(activity["id"]): activity for activity in self.load_activities()}
+        if full_resync or self._sheet_ids is None or not self._refresh_positions(worksheet):
+            if not self._reconcile(worksheet, activities):
+                return activities, None
+        tokens = self._sheet_tokens
+        delta = {
+            "deleted": [activity_id for activity_id in self._sheet_ids if activity_id not in activities],
+            "updated": [
+                activity_id for activity_id in self._sheet_ids
+                if activity_id in activities and tokens[activity_id] != record_token(activities[activity_id])
+            ],
+            "appended": [activity_id for activity_id in activities if activity_id not in tokens],
+        }
+        return activities, delta
+
+    # Fungsi untuk mengirim delta ke sheet
+    def _apply(self, worksheet, activities, delta):
+        # 1. Hapus baris aktivitas yang sudah tidak ada dalam satu permintaan (dari bawah)
+        deleted = set(delta["deleted"])
+        if deleted:
+            rows = [position + 2 for position, activity_id in enumerate(self._sheet_ids) if activity_id in deleted]
+            worksheet.spreadsheet.batch_update({"requests": [
+                {"deleteDimension": {"range": {
+                    "sheetId": worksheet.id,
+                    "dimension": "ROWS",
+                    "startIndex": start - 1,
+                    "endIndex": end
+                }}}
+                for start, end in reversed(_contiguous_ranges(rows))
+            ]})
+            self._sheet_ids = [activity_id for activity_id in self._sheet_ids if activity_id not in deleted]
+            for activity_id in deleted:
+                del self._sheet_tokens[activity_id]
+
+        # 2. Kirim baris yang berubah dalam satu batch_update
+        if delta["updated"]:
+            positions = {activity_id: position for position, activity_id in enumerate(self._sheet_ids)}
+            worksheet.batch_update([
+                {"range": _row_range(positions[activity_id] + 2), "values": [activity_row(activities[activity_id])]}
+                for activity_id in delta["updated"]
+            ])
+            for activity_id in delta["updated"]:
+                self._sheet_tokens[activity_id] = record_token(activities[activity_id])
+
+        # 3. Tambahkan aktivitas baru di akhir sheet
+        if delta["appended"]:
+            worksheet.append_rows([activity_row(activities[activity_id]) for activity_id in delta["appended"]])
+            for activity_id in delta["appended"]:
+                self._sheet_ids.append(activity_id)
+                self._sheet_tokens[activity_id] = record_token(activities[activity_id])
+
+    # Menjalankan satu kali sinkronisasi secara langsung
+    def sync_now(self, full_resync=False):
+        """
+        Mengembalikan ringkasan {"deleted", "updated", "appended", "rewritten", "seconds"}.
+        """
+        started = time.perf_counter()
+        with self._sync_lock:
+            worksheet = self.sheet_client.worksheet()
+            activities, delta = self._plan(worksheet, full_resync)
+            if delta is None:
+                self._rewrite(worksheet, activities)
+                summary = {"deleted": 0, "updated": 0, "appended": len(activities), "rewritten": True}
+            else:
+                self._apply(worksheet, activities, delta)
+                summary = {key: len(ids) for key, ids in delta.items()}
+                summary["rewritten"] = False
+        summary["full_resync"] = full_resync
+        summary["seconds"] = time.perf_counter() - started
+        with self._cond:
+            self._status["syncs"] += 1
+            self._status["last_success_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self._status["last_error"] = None
+            self._status["last_sync"] = summary
+        return summary
+
+    # Menghitung delta tanpa menulis ke sheet (dry run)
+    def diff(self, full_resync=False):
+        """
+        Mengembalikan {"rewrite", "deleted", "updated", "appended"} berisi
+        daftar id aktivitas yang akan dikirim pada sinkronisasi berikutnya.
+        Sheet hanya dibaca (saat sinkronisasi penuh), tidak pernah diubah.
+        """
+        with self._sync_lock:
+            worksheet = self.sheet_client.worksheet()
+            activities, delta = self._plan(worksheet, full_resync)
+        if delta is None:
+            return {"rewrite": True, "deleted": [], "updated": [], "appended": list(activities)}
+        return {"rewrite": False, **delta}
+
+    # Status worker untuk halaman diagnostik
+    def status(self):
+        """
+        lag_seconds adalah umur perubahan tertua yang belum tersalin ke sheet
+        (0 jika sheet sudah mutakhir).
+        """
+        with self._cond:
+            status = dict(self._status)
+            status["pending"] = self._requested_at is not None or self._syncing
+            status["running"] = self._thread is not None and self._thread.is_alive()
+            oldest = self._oldest_unsynced_at
+        status["lag_seconds"] = 0.0 if oldest is None else time.monotonic() - oldest
+        return status
+
+
+# Fungsi untuk mengelompokkan nomor baris terurut menjadi range (awal, akhir) berurutan
+def _contiguous_ranges(rows):
+    ranges = []
+    for row in rows:
+        if ranges and ranges[-1][1] == row - 1:
+            ranges[-1][1] = row
+        else:
+            ranges.append([row, row])
+    return [tuple(item) for item in ranges]
+
+
+# Worker bersama untuk proses ini
+_worker = None
+_worker_lock = threading.Lock()
+_registered = weakref.WeakSet()
+
+# Listener penyimpanan: setiap perubahan aktivitas memicu sinkronisasi
+def _on_change(storage, collection, changes, old_version, new_version):
+    if collection == "activities" and _worker is not None:
+        _worker.request_sync()
+
+# Fungsi untuk memulai worker sinkronisasi Google Sheets
+def start_sheet_sync(settings=None, sheet_client=None):
+    """
+    Mengembalikan worker yang berjalan, atau None jika sinkronisasi
+    dinonaktifkan atau file kredensial tidak ada. Worker didaftarkan sebagai
+    listener penyimpanan, sehingga tambah/edit/hapus aktivitas ikut tersalin.
+    """
+    global _worker
+    settings = {**DEFAULT_SHEETS_SETTINGS, **(settings or get_sheets_settings())}
+    if sheet_client is None:
+        if not settings["enabled"] or not os.path.exists(settings["credentials_file"]):
+            return None
+        sheet_client = get_sheet_client(settings)
+    storage = get_storage()
+    with _worker_lock:
+        if _worker is None:
+            _worker = SheetSyncWorker(
+                sheet_client,
+                debounce_seconds=settings["debounce_seconds"],
+                max_delay_seconds=settings["max_delay_seconds"],
+                max_retries=settings["max_retries"],
+                backoff_seconds=settings["backoff_seconds"],
+                backoff_max_seconds=settings["backoff_max_seconds"]
+            ).start()
+            # Sinkronisasi awal untuk membaca isi sheet dan menyalin perubahan yang tertinggal
+            _worker.request_sync()
+        if storage not in _registered:
+            storage.add_listener(_on_change)
+            _registered.add(storage)
+        return _worker
+
+# Fungsi untuk menghentikan worker sinkronisasi
+def stop_sheet_sync(timeout=None):
+    global _worker
+    with _worker_lock:
+        worker, _worker = _worker, None
+    if worker is not None:
+        worker.stop(timeout)
+
+# Fungsi untuk mendapatkan worker sinkronisasi yang aktif (atau None)
+def get_sheet_sync():
+    return _worker
+
+# Fungsi untuk meminta sinkronisasi tanpa menunggu hasilnya
+def request_sheet_sync(full_resync=False):
+    worker = start_sheet_sync()
+    if worker is None:
+        return False
+    worker.request_sync(full_resync)
+    return True
+
+def backup_data():
+    """Backup data ke Google Sheets (dijadwalkan di worker latar belakang)"""
+    return request_sheet_sync()
+
+
+if __name__ == "__main__":
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command in ("diff", "sync", "resync"):
+        worker = SheetSyncWorker(get_sheet_client())
+        if command == "diff":
+            delta = worker.diff(full_resync=True)
+            if delta["rewrite"]:
+                print(f"Sheet akan ditulis ulang: {len(delta['appended'])} aktivitas")
+            else:
+                for key, label in (("deleted", "dihapus"), ("updated", "diperbarui"), ("appended", "ditambahkan")):
+                    print(f"{len(delta[key])} baris {label}: {', '.join(delta[key][:20])}")
+        else:
+            summary = worker.sync_now(full_resync=command == "resync")
+            print(f"Sinkronisasi selesai: {summary}")
+    else:
+        print("Penggunaan: python auto_backup.py diff|sync|resync")
@@ -0,0 +1,376 @@
+import os
+import json
+import time
+import threading
+import weakref
+from datetime import datetime
+from repository import read_cached_yaml
+from storage import get_storage, COLLECTIONS
+from locking import data_lock
+from yaml_io import atomic_write
+
+# pyarrow bersifat opsional; tanpa pyarrow snapshot kolumnar tidak dipakai
+# dan DataFrame dibangun dari record seperti biasa
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Nilai default columnar_settings di config.yaml
+DEFAULT_COLUMNAR_SETTINGS = {
+    "enabled": True,
+    "debounce_seconds": 1,
+    "keep_versions": 2,
+}
+
+# Direktori snapshot di dalam direktori data
+SNAPSHOT_DIR = ".columnar"
+
+# Tabel Arrow yang sedang di-mmap per proses: path pointer -> (isi pointer, tabel)
+_tables = {}
+_tables_lock = threading.Lock()
+
+# Fungsi untuk membaca pengaturan snapshot kolumnar dari config.yaml
+def get_columnar_settings(config_file=os.path.join("data", "config.yaml")):
+    config = read_cached_yaml(config_file) or {}
+    return {**DEFAULT_COLUMNAR_SETTINGS, **(config.get("columnar_settings") or {})}
+
+# Fungsi untuk mengecek apakah snapshot kolumnar bisa dipakai
+def is_available():
+    return pa is not None
+
+# Fungsi untuk mendapatkan path pointer versi snapshot satu koleksi
+def pointer_path(collection, storage=None):
+    storage = storage or get_storage()
+    return os.path.join(storage.data_dir, SNAPSHOT_DIR, f"{collection}.current")
+
+# Fungsi untuk mendapatkan path file snapshot satu versi
+def snapshot_path(collection, sequence, storage=None):
+    storage = storage or get_storage()
+    return os.path.join(storage.data_dir, SNAPSHOT_DIR, f"{collection}.{sequence}.arrow")
+
+# Fungsi untuk mengubah token sumber menjadi teks yang bisa dibandingkan
+def _token_text(storage, collection):
+    return json.dumps(storage.source_token(collection))
+
+# Fungsi untuk membaca pointer versi snapshot (None jika belum ada)
+def _read_pointer(collection, storage):
+    try:
+        with open(pointer_path(collection, storage), 'r') as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+# Fungsi untuk mengubah DataFrame bertipe menjadi tabel Arrow
+def _to_table(frame):
+    """
+    Kolom object yang isinya bercampur tipe (misalnya angka dan teks)
+    tidak bisa dikonversi langsung, sehingga disimpan sebagai teks.
+    """
+    arrays = []
+    for column in frame.columns:
+        try:
+            arrays.append(pa.Array.from_pandas(frame[column]))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            arrays.append(pa.array(
+                [None if value is None or value != value else str(value) for value in frame[column]],
+                type=pa.string()
+            ))
+    table = pa.Table.from_arrays(arrays, names=[str(column) for column in frame.columns])
+    # Metadata pandas menjaga tipe kategori dan datetime saat dibaca ulang
+    return table.replace_schema_metadata(pa.Schema.from_pandas(frame.head(0), preserve_index=False).metadata)
+
+# Fungsi untuk menulis snapshot versi baru satu koleksi
+def write_snapshot(collection, storage=None, keep_versions=DEFAULT_COLUMNAR_SETTINGS["keep_versions"]):
+    """
+    Snapshot ditulis sebagai file Arrow IPC baru tanpa kompresi
+    (<koleksi>.<nomor>.arrow) agar bisa di-mmap tanpa decode, lalu pointer
+    <koleksi>.current diganti secara atomik. File versi lama tidak pernah
+    ditimpa, sehingga proses yang masih me-mmap-nya tetap membaca data
+    yang utuh; hanya keep_versions versi terbaru yang disimpan.
+
+    Record dan token sumbernya dibaca di bawah data_lock agar snapshot
+    tidak pernah diberi token dari versi data lain. Jika pointer sudah
+    menunjuk ke data yang sama (ditulis proses lain), tidak ada yang
+    ditulis. Mengembalikan path snapshot, atau None jika pyarrow tidak terpasang.
+    """
+    if pa is None:
+        return None
+    from frames import build_frame
+    storage = storage or get_storage()
+    os.makedirs(os.path.join(storage.data_dir, SNAPSHOT_DIR), exist_ok=True)
+    with data_lock(collection, data_dir=storage.data_dir):
+        token = _token_text(storage, collection)
+        records = storage.load(collection)
+    with data_lock("columnar", data_dir=storage.data_dir):
+        pointer = _read_pointer(collection, storage)
+        if pointer is not None and pointer["token"] == token:
+            return snapshot_path(collection, pointer["sequence"], storage)
+        sequence = (pointer["sequence"] if pointer is not None else 0) + 1
+        table = _to_table(build_frame(collection, records))
+        path = snapshot_path(collection, sequence, storage)
+        with atomic_write(path, 'wb') as file:
+            with pa.ipc.new_file(file, table.schema) as writer:
+                writer.write_table(table)
+        with atomic_write(pointer_path(collection, storage)) as file:
+            json.dump({"sequence": sequence, "token": token}, file)
+        _remove_old_versions(collection, storage, sequence - keep_versions)
+    return path
+
+# Fungsi untuk menghapus file snapshot dengan nomor versi <= batas
+def _remove_old_versions(collection, storage, last_removed):
+    directory = os.path.join(storage.data_dir, SNAPSHOT_DIR)
+    for filename in os.listdir(directory):
+        parts = filename.split(".")
+        if len(parts) == 3 and parts[0] == collection and parts[2] == "arrow" \
+                and parts[1].isdigit() and int(parts[1]) <= last_removed:
+            try:
+                # Proses yang masih me-mmap file ini tetap bisa membacanya (POSIX)
+                os.remove(os.path.join(directory, filename))
+            except OSError:
+                pass
+
+# Fungsi untuk mendapatkan tabel Arrow (di-mmap) jika snapshot masih sesuai dengan data
+def open_snapshot(collection, storage=None):
+    """
+    Tabel dibaca dari file lewat memory map tanpa salinan, sehingga semua
+    proses yang membuka versi yang sama berbagi halaman yang sama di page
+    cache sistem operasi. Tabel di-cache per proses sampai pointer menunjuk
+    versi lain. Mengembalikan None jika pyarrow tidak ada, snapshot belum
+    dibuat atau snapshot sudah tertinggal dari data.
+
+    Snapshot melayani jalur DataFrame (frames.py: label pilihan aktivitas,
+    tabel follow-up dan ekspor CSV) serta pembangunan agregat dashboard dan
+    indeks pencarian (iter_snapshot_rows); pembacaan record lewat Storage
+    (list, query, get_*) tidak memakainya.
+    """
+    if pa is None:
+        return None
+    storage = storage or get_storage()
+    pointer = _read_pointer(collection, storage)
+    if pointer is None or pointer["token"] != _token_text(storage, collection):
+        return None
+    key = os.path.abspath(pointer_path(collection, storage))
+    with _tables_lock:
+        cached = _tables.get(key)
+        if cached is not None and cached[0] == pointer:
+            return cached[1]
+    try:
+        source = pa.memory_map(snapshot_path(collection, pointer["sequence"], storage), 'r')
+        table = pa.ipc.open_file(source).read_all()
+    except (FileNotFoundError, pa.ArrowInvalid):
+        return None
+    with _tables_lock:
+        _tables[key] = (pointer, table)
+    return table
+
+# Fungsi untuk mengecek apakah snapshot koleksi sudah mutakhir
+def is_current(collection, storage=None):
+    if pa is None:
+        return False
+    storage = storage or get_storage()
+    pointer = _read_pointer(collection, storage)
+    return pointer is not None and pointer["token"] == _token_text(storage, collection)
+
+# Fungsi untuk membaca snapshot yang masih sesuai dengan data saat ini
+def read_snapshot(collection, columns=None, storage=None):
+    """
+    Hanya kolom yang diminta yang diubah menjadi DataFrame (column
+    projection). Kolom teks memakai tipe str pandas 3 yang disimpan di
+    Arrow, sehingga isi teksnya tetap menunjuk ke buffer yang di-mmap dan
+    tidak disalin per proses; yang disalin hanya kolom berukuran tetap
+    (tanggal, kode kategori) dan offset teks. Mengembalikan None jika
+    snapshot tidak bisa dipakai; pemanggil lalu membangun DataFrame dari record.
+    """
+    table = open_snapshot(collection, storage)
+    if table is None:
+        return None
+    if columns is not None:
+        available = set(table.column_names)
+        table = table.select([column for column in columns if column in available])
+    return table.to_pandas()
+
+# Fungsi untuk membaca sebagian kolom snapshot sebagai record dict per batch
+def iter_snapshot_rows(collection, columns, storage=None, batch_size=10000):
+    """
+    Dipakai untuk membangun struktur turunan (agregat, indeks pencarian)
+    tanpa memuat seluruh record koleksi lewat Storage.load: hanya kolom
+    yang diminta yang diubah menjadi objek Python, satu batch dalam satu
+    waktu. Kolom yang tidak ada di snapshot tidak muncul di record.
+    Mengembalikan None jika snapshot tidak bisa dipakai.
+    """
+    table = open_snapshot(collection, storage)
+    if table is None:
+        return None
+    available = set(table.column_names)
+    table = table.select([column for column in columns if column in available])
+    return (row for batch in table.to_batches(max_chunksize=batch_size) for row in batch.to_pylist())
+
+# Fungsi untuk melepas tabel yang di-mmap proses ini
+def release_snapshots():
+    with _tables_lock:
+        _tables.clear()
+
+class SnapshotWorker:
+    """
+    Thread latar belakang yang menulis snapshot versi baru setelah data
+    berubah. Permintaan untuk koleksi yang sama digabung: snapshot baru
+    ditulis setelah tidak ada perubahan selama debounce_seconds.
+    """
+
+    def __init__(self, storage, debounce_seconds=DEFAULT_COLUMNAR_SETTINGS["debounce_seconds"],
+                 keep_versions=DEFAULT_COLUMNAR_SETTINGS["keep_versions"]):
+        self.storage = storage
+        self.debounce_seconds = debounce_seconds
+        self.keep_versions = keep_versions
+        self._cond = threading.Condition()
+        self._pending = {}
+        self._writing = False
+        self._stop = threading.Event()
+        self._thread = None
+        self._status = {"writes": 0, "failures": 0, "last_error": None, "last_write": None}
+
+    # Memulai thread worker (aman dipanggil berkali-kali)
+    def start(self):
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="columnar-snapshot", daemon=True)
+                self._thread.start()
+        return self
+
+    # Menghentikan thread worker
+    def stop(self, timeout=None):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    # Meminta snapshot koleksi ditulis ulang
+    def request(self, collection):
+        with self._cond:
+            self._pending[collection] = time.monotonic()
+            self._cond.notify_all()
+
+    # Menunggu sampai semua snapshot yang diminta selesai ditulis
+    def wait_idle(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._writing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._cond:
+                while not self._pending and not self._stop.is_set():
+                    self._cond.wait()
+                # Debounce: tunggu sampai koleksi tidak berubah selama debounce_seconds
+                while not self._stop.is_set():
+                    ready = [
+                        collection for collection, requested_at in self._pending.items()
+                        if time.monotonic() - requested_at >= self.debounce_seconds
+                    ]
+                    if ready:
+                        break
+                    self._cond.wait(self.debounce_seconds)
+                if self._stop.is_set():
+                    return
+                for collection in ready:
+                    del self._pending[collection]
+                self._writing = True
+            for collection in ready:
+                self._write(collection)
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+    def _write(self, collection):
+        started = time.perf_counter()
+        try:
+            write_snapshot(collection, self.storage, self.keep_versions)
+        except Exception as e:
+            print(f"⚠️ Snapshot kolumnar {collection} gagal:", e)
+            with self._cond:
+                self._status["failures"] += 1
+                self._status["last_error"] = str(e)
+            return
+        with self._cond:
+            self._status["writes"] += 1
+            self._status["last_error"] = None
+            self._status["last_write"] = {
+                "collection": collection,
+                "seconds": time.perf_counter() - started,
+                "written_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+
+    # Status worker untuk halaman diagnostik
+    def status(self):
+        with self._cond:
+            status = dict(self._status)
+            status["pending"] = sorted(self._pending)
+            status["running"] = self._thread is not None and self._thread.is_alive()
+        return status
+
+
+# Worker bersama untuk proses ini
+_worker = None
+_worker_lock = threading.Lock()
+_registered = weakref.WeakSet()
+
+# Listener penyimpanan: setiap perubahan koleksi menjadwalkan snapshot baru
+def _on_change(storage, collection, changes, old_version, new_version):
+    if _worker is not None and _worker.storage is storage:
+        _worker.request(collection)
+
+# Fungsi untuk memulai worker snapshot kolumnar
+def start_columnar_snapshots(settings=None):
+    """
+    Mengembalikan worker yang berjalan, atau None jika snapshot dinonaktifkan
+    atau pyarrow tidak terpasang. Snapshot yang tertinggal dari data (misalnya
+    karena ditulis proses lain) langsung dijadwalkan ulang.
+    """
+    global _worker
+    settings = {**DEFAULT_COLUMNAR_SETTINGS, **(settings or get_columnar_settings())}
+    if not settings["enabled"] or pa is None:
+        return None
+    storage = get_storage()
+    with _worker_lock:
+        if _worker is None or _worker.storage is not storage:
+            if _worker is not None:
+                _worker.stop()
+            _worker = SnapshotWorker(
+                storage,
+                debounce_seconds=settings["debounce_seconds"],
+                keep_versions=settings["keep_versions"]
+            ).start()
+            for collection in COLLECTIONS:
+                if not is_current(collection, storage):
+                    _worker.request(collection)
+        if storage not in _registered:
+            storage.add_listener(_on_change)
+            _registered.add(storage)
+        return _worker
+
+# Fungsi untuk menghentikan worker snapshot
+def stop_columnar_snapshots(timeout=None):
+    global _worker
+    with _worker_lock:
+        worker, _worker = _worker, None
+    if worker is not None:
+        worker.stop(timeout)
+
+# Fungsi untuk menjadwalkan snapshot koleksi ditulis ulang jika worker berjalan
+def request_snapshot(collection):
+    worker = _worker
+    if worker is not None:
+        worker.request(collection)
+
+# Fungsi untuk mendapatkan worker snapshot yang aktif (atau None)
+def get_columnar_worker():
+    return _worker
@@ -1,65 +1,372 @@
 import os
-import yaml
+import json
+import zlib
+import hashlib
+from yaml_io import load_yaml, atomic_write
+from repository import read_cached_yaml
+from locking import data_lock, LOCK_ORDER
+from storage import COLLECTIONS, get_storage, create_storage, read_storage_settings, backend_name
 import shutil
 import datetime
 
+# Nilai default backup_settings di config.yaml
+DEFAULT_BACKUP_SETTINGS = {
+    "keep_last": 10,
+    "keep_hourly": 24,
+    "keep_daily": 30,
+}
+
+# File data bersama yang ikut di-backup (config, pengguna dan arsip); file
+# koleksi diambil dari backend penyimpanan aktif lewat Storage.backup_files
+BACKUP_EXTENSIONS = (".yaml", ".archive.gz")
+BACKUP_MANIFEST = "manifest.json"
+BACKUP_OBJECTS_DIR = "objects"
+
+# Batas chunk: baris yang CRC32-nya memenuhi mask (rata-rata 256 baris per chunk)
+CHUNK_MASK = 0xFF
+CHUNK_MAX_BYTES = 1024 * 1024
+
+# Fungsi untuk membaca pengaturan backup dari config.yaml
+def get_backup_settings(config_file=os.path.join("data", "config.yaml")):
+    config = read_cached_yaml(config_file) or {}
+    return {**DEFAULT_BACKUP_SETTINGS, **(config.get("backup_settings") or {})}
+
+# Fungsi untuk memecah isi file menjadi chunk yang batasnya ditentukan isi
+def split_chunks(data):
+    """
+    Batas chunk dipilih dari isi baris (bukan posisi byte), sehingga
+    menyisipkan atau mengubah record hanya mengubah chunk di sekitarnya;
+    chunk lain tetap sama dan tidak disimpan ulang.
+    """
+    chunks = []
+    start = position = 0
+    for line in data.splitlines(keepends=True):
+        position += len(line)
+        if (zlib.crc32(line) & CHUNK_MASK) == 0 or position - start >= CHUNK_MAX_BYTES:
+            chunks.append(data[start:position])
+            start = position
+    if start < len(data):
+        chunks.append(data[start:])
+    return chunks
+
+# Fungsi untuk menyimpan satu objek (chunk) berdasarkan hash isinya
+def _write_object(objects_dir, data):
+    digest = hashlib.sha256(data).hexdigest()
+    object_path = os.path.join(objects_dir, digest)
+    if not os.path.exists(object_path):
+        with atomic_write(object_path, 'wb') as file:
+            file.write(data)
+    return digest
+
+# Fungsi untuk membaca manifest backup (None untuk backup lama berupa salinan file)
+def _read_manifest(backup_folder):
+    manifest_path = os.path.join(backup_folder, BACKUP_MANIFEST)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, 'r') as file:
+        return json.load(file)
+
+# Fungsi untuk mendapatkan backend penyimpanan yang dipakai direktori data
+def _data_storage(data_dir):
+    settings = read_storage_settings(data_dir)
+    storage = get_storage()
+    if os.path.abspath(storage.data_dir) == os.path.abspath(data_dir) \
+            and backend_name(storage) == settings.get("backend", "yaml"):
+        return storage
+    return create_storage(settings, data_dir)
+
+# Fungsi untuk mendapatkan nama file data bersama (di luar file koleksi backend)
+def _shared_files(data_dir):
+    collection_files = {COLLECTIONS[collection][0] for collection in COLLECTIONS}
+    return [
+        filename for filename in sorted(os.listdir(data_dir))
+        if filename.endswith(BACKUP_EXTENSIONS) and filename not in collection_files
+        and os.path.isfile(os.path.join(data_dir, filename))
+    ]
+
+# Fungsi untuk mendapatkan daftar backup, terbaru lebih dulu
+def list_backups(backup_dir=None):
+    """
+    Setiap item: {"name", "path", "created_at", "incremental", "files", "size"}.
+    Backup lama (folder berisi salinan file YAML) ikut didaftarkan.
+    """
+    backup_dir = backup_dir or os.path.join(os.getcwd(), "backup")
+    if not os.path.isdir(backup_dir):
+        return []
+    backups = []
+    for name in os.listdir(backup_dir):
+        path = os.path.join(backup_dir, name)
+        if not name.startswith("backup_") or not os.path.isdir(path):
+            continue
+        manifest = _read_manifest(path)
+        if manifest is not None:
+            created_at = manifest["created_at"]
+            files = manifest["files"]
+            size = sum(entry["size"] for entry in files.values())
+        else:
+            files = [filename for filename in os.listdir(path) if filename.endswith(".yaml")]
+            if not files:
+                continue
+            try:
+                created_at = datetime.datetime.strptime(name[len("backup_"):], "%Y%m%d_%H%M%S").strftime("%Y-%m-%d %H:%M:%S")
+            except ValueError:
+                created_at = datetime.datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y-%m-%d %H:%M:%S")
+            size = sum(os.path.getsize(os.path.join(path, filename)) for filename in files)
+        backups.append({
+            "name": name,
+            "path": path,
+            "created_at": created_at,
+            "incremental": manifest is not None,
+            "files": len(files),
+            "size": size
+        })
+    backups.sort(key=lambda backup: (backup["created_at"], backup["name"]), reverse=True)
+    return backups
+
 # Fungsi untuk membuat backup data
-def backup_data():
+def backup_data(data_dir=None, backup_dir=None, settings=None):
     """
-    Membuat backup dari seluruh file database YAML
+    Membuat backup inkremental dari file data bersama dan file milik
+    backend penyimpanan aktif (misalnya database SQLite), dengan nama
+    backend dicatat di manifest.
+    Isi file dipecah menjadi chunk yang disimpan sekali di backup/objects
+    berdasarkan hash SHA-256; setiap backup hanya berupa manifest kecil
+    di backup/backup_<timestamp>/manifest.json. File yang ukuran dan waktu
+    ubahnya sama dengan backup terakhir tidak dibaca ulang. Setelah backup,
+    aturan retensi dijalankan dan chunk yang tidak dipakai lagi dihapus.
     """
     # Direktori data dan backup
-    data_dir = os.path.join(os.getcwd(), "data")
-    backup_dir = os.path.join(os.getcwd(), "backup")
+    data_dir = data_dir or os.path.join(os.getcwd(), "data")
+    backup_dir = backup_dir or os.path.join(os.getcwd(), "backup")
+    objects_dir = os.path.join(backup_dir, BACKUP_OBJECTS_DIR)
+    os.makedirs(objects_dir, exist_ok=True)
     
-    # Buat direktori backup jika belum ada
-    if not os.path.exists(backup_dir):
-        os.makedirs(backup_dir)
-    
-    # Timestamp untuk nama folder backup
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_folder = os.path.join(backup_dir, f"backup_{timestamp}")
-    os.makedirs(backup_folder)
-    
-    # Salin semua file YAML ke folder backup
-    for filename in os.listdir(data_dir):
-        if filename.endswith(".yaml"):
-            src_file = os.path.join(data_dir, filename)
-            dst_file = os.path.join(backup_folder, filename)
-            shutil.copy2(src_file, dst_file)
+    with data_lock("backup", data_dir=backup_dir):
+        # Entri file backup terakhir untuk melewati file yang tidak berubah
+        previous = {}
+        for backup in list_backups(backup_dir):
+            if backup["incremental"]:
+                previous = _read_manifest(backup["path"])["files"]
+                break
+        
+        now = datetime.datetime.now()
+        storage = _data_storage(data_dir)
+        files = {}
+        with data_lock(*LOCK_ORDER, data_dir=data_dir):
+            backend_files = [
+                name for name in storage.backup_files()
+                if os.path.exists(os.path.join(data_dir, *name.split("/")))
+            ]
+            for filename in _shared_files(data_dir) + backend_files:
+                if filename in backend_files:
+                    signature = storage.backup_signature(filename)
+                else:
+                    stat = os.stat(os.path.join(data_dir, filename))
+                    signature = (stat.st_size, stat.st_mtime_ns)
+                entry = previous.get(filename)
+                if signature is not None and entry is not None and (entry["size"], entry["mtime_ns"]) == signature \
+                        and all(os.path.exists(os.path.join(objects_dir, digest)) for digest in entry["chunks"]):
+                    files[filename] = entry
+                    continue
+                if filename in backend_files:
+                    data = storage.read_backup_file(filename)
+                else:
+                    with open(os.path.join(data_dir, filename), 'rb') as file:
+                        data = file.read()
+                files[filename] = {
+                    "size": len(data),
+                    "mtime_ns": signature[1] if signature is not None else None,
+                    "sha256": hashlib.sha256(data).hexdigest(),
+                    "chunks": [_write_object(objects_dir, chunk) for chunk in split_chunks(data)]
+                }
+        
+        # Folder backup dengan timestamp (mikrodetik agar aman dipanggil setiap penulisan)
+        backup_folder = os.path.join(backup_dir, f"backup_{now.strftime('%Y%m%d_%H%M%S_%f')}")
+        os.makedirs(backup_folder)
+        with atomic_write(os.path.join(backup_folder, BACKUP_MANIFEST)) as file:
+            json.dump({
+                "format": 2,
+                "created_at": now.strftime("%Y-%m-%d %H:%M:%S"),
+                "backend": backend_name(storage),
+                "backend_files": backend_files,
+                "files": files
+            }, file, indent=1)
+        
+        prune_backups(backup_dir, settings)
     
     return backup_folder
 
+# Fungsi untuk memilih backup yang dipertahankan aturan retensi
+def _retained_backups(backups, settings):
+    """
+    Mempertahankan keep_last backup terbaru, ditambah backup terbaru di
+    setiap jam (keep_hourly jam terakhir yang punya backup) dan di setiap
+    hari (keep_daily hari terakhir yang punya backup).
+    """
+    keep = {backup["name"] for backup in backups[:settings["keep_last"]]}
+    for bucket_length, limit in ((13, settings["keep_hourly"]), (10, settings["keep_daily"])):
+        buckets = set()
+        for backup in backups:
+            # created_at "YYYY-MM-DD HH:MM:SS": 13 karakter = jam, 10 karakter = hari
+            bucket = backup["created_at"][:bucket_length]
+            if bucket in buckets:
+                continue
+            if len(buckets) >= limit:
+                break
+            buckets.add(bucket)
+            keep.add(backup["name"])
+    return keep
+
+# Fungsi untuk menghapus backup lama sesuai retensi dan chunk yang tidak terpakai
+def prune_backups(backup_dir=None, settings=None):
+    """
+    Hanya backup inkremental yang dihapus; folder backup lama dibiarkan.
+    Mengembalikan (daftar backup yang dihapus, jumlah chunk yang dihapus).
+    """
+    backup_dir = backup_dir or os.path.join(os.getcwd(), "backup")
+    settings = {**DEFAULT_BACKUP_SETTINGS, **(settings or get_backup_settings())}
+    with data_lock("backup", data_dir=backup_dir):
+        backups = [backup for backup in list_backups(backup_dir) if backup["incremental"]]
+        keep = _retained_backups(backups, settings)
+        removed = []
+        for backup in backups:
+            if backup["name"] not in keep:
+                shutil.rmtree(backup["path"])
+                removed.append(backup["name"])
+        return removed, collect_garbage(backup_dir)
+
+# Fungsi untuk menghapus chunk yang tidak dirujuk manifest mana pun
+def collect_garbage(backup_dir=None):
+    backup_dir = backup_dir or os.path.join(os.getcwd(), "backup")
+    objects_dir = os.path.join(backup_dir, BACKUP_OBJECTS_DIR)
+    if not os.path.isdir(objects_dir):
+        return 0
+    with data_lock("backup", data_dir=backup_dir):
+        referenced = set()
+        for backup in list_backups(backup_dir):
+            if backup["incremental"]:
+                for entry in _read_manifest(backup["path"])["files"].values():
+                    referenced.update(entry["chunks"])
+        removed = 0
+        for name in os.listdir(objects_dir):
+            # File sementara dari penulisan yang terputus juga dibuang
+            if name not in referenced:
+                os.remove(os.path.join(objects_dir, name))
+                removed += 1
+        return removed
+
 # Fungsi untuk memulihkan data dari backup
 def restore_data(backup_folder):
     """
-    Memulihkan data dari folder backup yang ditentukan
+    Memulihkan data dari folder backup yang ditentukan. Backup inkremental
+    disusun ulang dari chunk-nya dan dicek dengan hash SHA-256 sebelum
+    ditulis; folder backup lama disalin apa adanya. Backup hanya bisa
+    dipulihkan ke backend penyimpanan yang sama dengan saat backup dibuat.
     """
     # Direktori data
     data_dir = os.path.join(os.getcwd(), "data")
     
     # Pastikan folder backup ada
-    if not os.path.exists(backup_folder):
+    if not os.path.isdir(backup_folder):
         return False, f"Folder backup {backup_folder} tidak ditemukan"
     
-    # Salin semua file YAML dari folder backup ke direktori data
-    for filename in os.listdir(backup_folder):
-        if filename.endswith(".yaml"):
-            src_file = os.path.join(backup_folder, filename)
-            dst_file = os.path.join(data_dir, filename)
-            shutil.copy2(src_file, dst_file)
+    manifest = _read_manifest(backup_folder)
+    storage = _data_storage(data_dir)
+    current_backend = backend_name(storage)
+    # Backup lama (sebelum backend dicatat) hanya berisi file YAML
+    backup_backend = manifest.get("backend", "yaml") if manifest is not None else "yaml"
+    if backup_backend != current_backend and not (
+        "backend" not in (manifest or {}) and current_backend in ("yaml", "journal")
+    ):
+        return False, (
+            f"Backup dibuat dengan backend penyimpanan '{backup_backend}', "
+            f"sedangkan backend aktif '{current_backend}'"
+        )
+    
+    if manifest is None:
+        # Salin semua file YAML dari folder backup ke direktori data
+        for filename in os.listdir(backup_folder):
+            if filename.endswith(".yaml"):
+                src_file = os.path.join(backup_folder, filename)
+                dst_file = os.path.join(data_dir, filename)
+                shutil.copy2(src_file, dst_file)
+        
+        return True, "Data berhasil dipulihkan"
+    
+    # Susun dan verifikasi seluruh file lebih dulu agar tidak ada pemulihan setengah jadi
+    objects_dir = os.path.join(os.path.dirname(os.path.abspath(backup_folder)), BACKUP_OBJECTS_DIR)
+    contents = {}
+    for filename, entry in manifest["files"].items():
+        try:
+            chunks = []
+            for digest in entry["chunks"]:
+                with open(os.path.join(objects_dir, digest), 'rb') as file:
+                    chunks.append(file.read())
+        except FileNotFoundError:
+            return False, f"Chunk backup untuk {filename} tidak ditemukan"
+        data = b"".join(chunks)
+        if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+            return False, f"Backup {filename} rusak (hash tidak cocok)"
+        contents[filename] = data
+    
+    # Backup lama tanpa daftar file backend: file koleksi YAML dan journal-nya
+    backend_files = manifest.get("backend_files") or [
+        filename for filename in contents
+        if filename.endswith(".journal") or filename in {COLLECTIONS[collection][0] for collection in COLLECTIONS}
+    ]
+    with data_lock(*LOCK_ORDER, data_dir=data_dir):
+        for filename, data in contents.items():
+            if filename not in backend_files:
+                with atomic_write(os.path.join(data_dir, filename), 'wb') as file:
+                    file.write(data)
+        storage.restore_backup_files({filename: contents[filename] for filename in backend_files})
     
     return True, "Data berhasil dipulihkan"
 
+# Nama data yang bisa diekspor langsung: nama -> nama file CSV
+EXPORT_COLLECTIONS = {
+    "activities": "marketing_activities",
+    "followups": "followups",
+    "users": "users",
+}
+
+# Kolom pengguna yang boleh diekspor (hash password tidak pernah ikut)
+USER_EXPORT_COLUMNS = ["username", "name", "role", "email", "created_at"]
+
 # Fungsi untuk ekspor data ke CSV
-def export_to_csv(data, filename):
+def export_to_csv(data, filename=None, columns=None):
     """
-    Mengekspor data ke file CSV
+    Mengekspor data ke file CSV. data berupa daftar record (mengembalikan
+    path file CSV), atau nama data di EXPORT_COLLECTIONS (mengembalikan
+    (success, message, path)). Aktivitas dan follow-up dibaca dari DataFrame
+    kolumnar, dengan columns membatasi kolom yang dimuat; pengguna hanya
+    diekspor dengan kolom USER_EXPORT_COLUMNS.
     """
     import pandas as pd
     
+    if isinstance(data, str):
+        if data not in EXPORT_COLLECTIONS:
+            return False, f"Data {data} tidak dikenal", None
+        try:
+            if data == "users":
+                from utils_with_edit_delete import get_all_users
+                allowed = [column for column in (columns or USER_EXPORT_COLUMNS) if column in USER_EXPORT_COLUMNS]
+                df = pd.DataFrame(
+                    [{column: user.get(column) for column in allowed} for user in get_all_users()],
+                    columns=allowed
+                )
+            else:
+                from frames import get_activities_frame, get_followups_frame
+                get_frame = get_activities_frame if data == "activities" else get_followups_frame
+                df = get_frame(columns=columns)
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            csv_file = export_to_csv(df, filename or f"{EXPORT_COLLECTIONS[data]}_{timestamp}.csv")
+        except Exception as e:
+            return False, f"Gagal mengekspor data: {str(e)}", None
+        return True, f"{len(df)} baris berhasil diekspor", csv_file
+    
     # Konversi data ke DataFrame
-    df = pd.DataFrame(data)
+    df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
     
     # Simpan ke file CSV
     csv_file = os.path.join(os.getcwd(), "exports", filename)
@@ -73,6 +380,117 @@ def export_to_csv(data, filename):
     
     return csv_file
 
+# Kolom yang diterima pada file import aktivitas: field aktivitas -> label kolom
+ACTIVITY_IMPORT_COLUMNS = {
+    "prospect_name": "Nama Prospek",
+    "prospect_location": "Lokasi Prospek",
+    "contact_person": "Nama Kontak Person",
+    "contact_position": "Jabatan Kontak Person",
+    "contact_phone": "Nomor Telepon Kontak",
+    "contact_email": "Email Kontak",
+    "activity_date": "Tanggal Aktivitas",
+    "activity_type": "Jenis Aktivitas",
+    "description": "Deskripsi Aktivitas",
+    "status": "Status",
+    "marketer_username": "Marketing"
+}
+
+# Kolom yang wajib diisi pada file import aktivitas
+ACTIVITY_IMPORT_REQUIRED = [
+    "prospect_name", "prospect_location", "contact_person",
+    "activity_date", "activity_type", "description"
+]
+
+# Fungsi untuk membaca file CSV/Excel yang diupload
+def read_import_file(uploaded_file):
+    """
+    Membaca file import menjadi DataFrame berdasarkan ekstensi nama file.
+    File Excel membutuhkan paket openpyxl.
+    """
+    import pandas as pd
+    
+    filename = getattr(uploaded_file, "name", str(uploaded_file)).lower()
+    if filename.endswith((".xlsx", ".xls")):
+        return pd.read_excel(uploaded_file, dtype=object)
+    return pd.read_csv(uploaded_file, dtype=str, keep_default_na=False)
+
+# Fungsi untuk memvalidasi dan menyiapkan data import aktivitas
+def prepare_activity_import(df, marketer_username, allow_marketer_column=False, known_usernames=None):
+    """
+    Memvalidasi seluruh baris sekaligus dengan operasi kolom pandas.
+    Mengembalikan (records, errors): records siap diberikan ke
+    add_marketing_activities_bulk, errors berisi pesan per baris yang ditolak.
+    """
+    import pandas as pd
+    from utils_with_edit_delete import ACTIVITY_TYPES, ACTIVITY_STATUSES
+    
+    # Terima nama field maupun label kolom (tanpa membedakan huruf besar/kecil)
+    column_lookup = {}
+    for field, label in ACTIVITY_IMPORT_COLUMNS.items():
+        column_lookup[field.lower()] = field
+        column_lookup[label.lower()] = field
+    df = df.rename(columns=lambda c: column_lookup.get(str(c).strip().lower(), c)).reset_index(drop=True)
+    
+    missing = [ACTIVITY_IMPORT_COLUMNS[c] for c in ACTIVITY_IMPORT_REQUIRED if c not in df.columns]
+    if missing:
+        return [], [f"Kolom wajib tidak ditemukan: {', '.join(missing)}"]
+    
+    data = pd.DataFrame(index=df.index)
+    for field in ACTIVITY_IMPORT_COLUMNS:
+        if field in df.columns:
+            data[field] = df[field].fillna("").astype(str).str.strip()
+        else:
+            data[field] = ""
+    
+    errors = pd.Series("", index=df.index)
+    
+    def flag(mask, message):
+        errors[mask] = errors[mask] + message + "; "
+    
+    for field in ACTIVITY_IMPORT_REQUIRED:
+        flag(data[field] == "", f"{ACTIVITY_IMPORT_COLUMNS[field]} kosong")
+    
+    # Tanggal aktivitas: format ISO (YYYY-MM-DD) dibaca apa adanya, format lain hari lebih dulu (DD/MM/YYYY)
+    activity_dates = pd.to_datetime(data["activity_date"], errors="coerce", format="ISO8601")
+    non_iso = activity_dates.isna()
+    activity_dates[non_iso] = pd.to_datetime(
+        data.loc[non_iso, "activity_date"], errors="coerce", format="mixed", dayfirst=True
+    )
+    flag(activity_dates.isna() & (data["activity_date"] != ""), "Tanggal Aktivitas tidak valid")
+    data["activity_date"] = activity_dates.dt.strftime("%Y-%m-%d %H:%M:%S")
+    
+    # Jenis aktivitas
+    type_lookup = {t.lower(): t for t in ACTIVITY_TYPES}
+    activity_types = data["activity_type"].str.lower().map(type_lookup)
+    flag(activity_types.isna() & (data["activity_type"] != ""), "Jenis Aktivitas tidak dikenal")
+    data["activity_type"] = activity_types
+    
+    # Status (boleh kosong, default baru)
+    statuses = data["status"].str.lower().str.replace(" ", "_", regex=False).replace("", "baru")
+    flag(~statuses.isin(ACTIVITY_STATUSES), "Status tidak dikenal")
+    data["status"] = statuses
+    
+    # Email kontak (boleh kosong)
+    invalid_email = (data["contact_email"] != "") & ~data["contact_email"].str.match(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+    flag(invalid_email, "Email Kontak tidak valid")
+    
+    # Marketing pemilik aktivitas
+    if allow_marketer_column:
+        data["marketer_username"] = data["marketer_username"].where(data["marketer_username"] != "", marketer_username)
+        if known_usernames is not None:
+            flag(~data["marketer_username"].isin(list(known_usernames)), "Marketing tidak dikenal")
+    else:
+        data["marketer_username"] = marketer_username
+    
+    valid = errors == ""
+    records = data[valid].to_dict("records")
+    error_messages = [
+        f"Baris {index + 2}: {message.rstrip('; ')}"
+        for index, message in errors[~valid].items()
+    ]
+    
+    return records, error_messages
+
 # Fungsi untuk validasi integritas data
 def validate_data_integrity():
     """
@@ -99,7 +517,7 @@ def validate_data_integrity():
         # Users
         users_file = os.path.join(data_dir, "users.yaml")
         with open(users_file, 'r') as file:
-            users_data = yaml.safe_load(file)
+            users_data = load_yaml(file)
         
         if not users_data or "users" not in users_data:
             return False, "Struktur data users.yaml tidak valid"
@@ -107,7 +525,7 @@ def validate_data_integrity():
         # Activities
         activities_file = os.path.join(data_dir, "marketing_activities.yaml")
         with open(activities_file, 'r') as file:
-            activities_data = yaml.safe_load(file)
+            activities_data = load_yaml(file)
         
         if not activities_data or "activities" not in activities_data:
             return False, "Struktur data marketing_activities.yaml tidak valid"
@@ -115,7 +533,7 @@ def validate_data_integrity():
         # Followups
         followups_file = os.path.join(data_dir, "followups.yaml")
         with open(followups_file, 'r') as file:
-            followups_data = yaml.safe_load(file)
+            followups_data = load_yaml(file)
         
         if not followups_data or "followups" not in followups_data:
             return False, "Struktur data followups.yaml tidak valid"
@@ -123,7 +541,7 @@ def validate_data_integrity():
         # Config
         config_file = os.path.join(data_dir, "config.yaml")
         with open(config_file, 'r') as file:
-            config_data = yaml.safe_load(file)
+            config_data = load_yaml(file)
         
         if not config_data or "app_settings" not in config_data or "notification_settings" not in config_data:
             return False, "Struktur data config.yaml tidak valid"
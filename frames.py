@@ -0,0 +1,157 @@
+import threading
+import pandas as pd
+import columnar
+from storage import get_storage
+
+# Kolom bertipe kategori dan tanggal per koleksi
+FRAME_SCHEMAS = {
+    "activities": {
+        "categorical": ["status", "activity_type", "marketer_username"],
+        "datetime": ["activity_date", "created_at", "updated_at"],
+    },
+    "followups": {
+        "categorical": ["status_update", "marketer_username"],
+        "datetime": ["followup_date", "next_followup_date", "created_at"],
+    },
+}
+
+# Kolom minimal agar halaman tetap berjalan saat koleksi masih kosong
+FRAME_COLUMNS = {
+    "activities": [
+        "id", "marketer_username", "prospect_name", "prospect_location", "contact_person",
+        "contact_position", "contact_phone", "contact_email", "activity_date", "activity_type",
+        "description", "status", "created_at", "updated_at"
+    ],
+    "followups": [
+        "id", "activity_id", "marketer_username", "followup_date", "notes", "next_action",
+        "next_followup_date", "interest_level", "status_update", "created_at"
+    ],
+}
+
+# Cache DataFrame per proses: koleksi -> {"storage", "token", "frames", "by_marketer", "labels"};
+# frames berisi DataFrame per daftar kolom (None = semua kolom)
+_frames = {}
+_lock = threading.Lock()
+
+# Fungsi untuk membangun DataFrame bertipe dari daftar record
+def build_frame(collection, records):
+    frame = pd.DataFrame.from_records(records) if records else pd.DataFrame(columns=FRAME_COLUMNS[collection])
+    schema = FRAME_SCHEMAS[collection]
+    for column in schema["datetime"]:
+        if column in frame.columns:
+            frame[column] = pd.to_datetime(frame[column], errors="coerce", format="mixed")
+    for column in schema["categorical"]:
+        if column in frame.columns:
+            frame[column] = frame[column].astype("category")
+    return frame
+
+# Fungsi untuk mendapatkan entri cache koleksi untuk versi data saat ini
+def _current_entry(collection):
+    # source_token hanya memeriksa file/versi di disk, sehingga data tidak
+    # perlu di-parse jika DataFrame bisa dibaca dari snapshot kolumnar
+    storage = get_storage()
+    token = storage.source_token(collection)
+    with _lock:
+        entry = _frames.get(collection)
+        if entry is not None and entry["storage"] is storage and entry["token"] == token:
+            return entry
+    entry = {
+        "storage": storage,
+        "token": token,
+        "frames": {},
+        "by_marketer": {},
+        "labels": {}
+    }
+    with _lock:
+        _frames[collection] = entry
+    return entry
+
+# Fungsi untuk mendapatkan DataFrame (opsional hanya beberapa kolom) untuk entri cache
+def _projected_frame(collection, entry, columns=None):
+    """
+    Jika snapshot kolumnar mutakhir, DataFrame dibuat dari tabel Arrow yang
+    di-mmap dan hanya kolom yang diminta yang dimuat. Jika tidak, DataFrame lengkap
+    dibangun dari record dan snapshot baru dijadwalkan.
+    """
+    key = None if columns is None else tuple(columns)
+    with _lock:
+        frame = entry["frames"].get(key)
+        full = entry["frames"].get(None)
+    if frame is not None:
+        return frame
+    if full is None:
+        frame = columnar.read_snapshot(collection, columns, storage=entry["storage"])
+        if frame is None:
+            full = build_frame(collection, entry["storage"].load(collection))
+            columnar.request_snapshot(collection)
+            with _lock:
+                entry["frames"][None] = full
+    if frame is None:
+        frame = full if key is None else full[[column for column in columns if column in full.columns]]
+    with _lock:
+        entry["frames"][key] = frame
+    return frame
+
+# Fungsi untuk mendapatkan DataFrame koleksi yang di-cache per versi data
+def _cached_frame(collection, marketer_username=None, columns=None):
+    """
+    DataFrame hanya dibangun ulang jika versi data koleksi berubah. Hasilnya
+    adalah salinan dangkal: dengan Copy-on-Write pandas (selalu aktif sejak
+    pandas 3.0, versi minimum di requirements.txt), mengubah kolom pada
+    salinan tidak mengubah DataFrame di cache. columns membatasi kolom yang
+    dimuat (kolom yang tidak ada diabaikan).
+    """
+    entry = _current_entry(collection)
+    if marketer_username is None:
+        return _projected_frame(collection, entry, columns).copy(deep=False)
+
+    key = (marketer_username, None if columns is None else tuple(columns))
+    with _lock:
+        frame = entry["by_marketer"].get(key)
+    if frame is None:
+        source_columns = None if columns is None else list(dict.fromkeys([*columns, "marketer_username"]))
+        source = _projected_frame(collection, entry, source_columns)
+        frame = source[source["marketer_username"] == marketer_username].reset_index(drop=True)
+        if columns is not None:
+            frame = frame[[column for column in columns if column in frame.columns]]
+        for column in FRAME_SCHEMAS[collection]["categorical"]:
+            if column in frame.columns:
+                frame[column] = frame[column].cat.remove_unused_categories()
+        with _lock:
+            entry["by_marketer"][key] = frame
+    return frame.copy(deep=False)
+
+# Fungsi untuk mendapatkan DataFrame aktivitas (opsional untuk satu marketing dan sebagian kolom)
+def get_activities_frame(marketer_username=None, columns=None):
+    return _cached_frame("activities", marketer_username, columns)
+
+# Fungsi untuk mendapatkan DataFrame follow-up (opsional untuk satu marketing dan sebagian kolom)
+def get_followups_frame(marketer_username=None, columns=None):
+    return _cached_frame("followups", marketer_username, columns)
+
+# Fungsi untuk mendapatkan label pilihan aktivitas per versi data
+def get_activity_labels(marketer_username=None):
+    """
+    Mengembalikan (labels, ids): dict id -> "id - nama prospek" dan daftar
+    id sesuai urutan data. Dibangun sekali per versi data sehingga format_func cukup labels.get.
+    Hasilnya dipakai bersama dan tidak boleh diubah.
+    """
+    entry = _current_entry("activities")
+    with _lock:
+        cached = entry["labels"].get(marketer_username)
+    if cached is None:
+        frame = _cached_frame("activities", marketer_username, ["id", "prospect_name"])
+        ids = frame["id"].tolist()
+        labels = {
+            activity_id: f"{activity_id} - {prospect_name}"
+            for activity_id, prospect_name in zip(ids, frame["prospect_name"].tolist())
+        }
+        cached = (labels, ids)
+        with _lock:
+            entry["labels"][marketer_username] = cached
+    return cached
+
+# Fungsi untuk membuang seluruh cache DataFrame
+def clear_frame_cache():
+    with _lock:
+        _frames.clear()
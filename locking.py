@@ -0,0 +1,111 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+# fcntl hanya tersedia di sistem POSIX; tanpa fcntl lock hanya berlaku
+# antar-thread di dalam satu proses
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Urutan tetap pengambilan lock agar beberapa lock sekaligus tidak saling deadlock
+LOCK_ORDER = ["activities", "followups", "users", "config"]
+
+_locks = {}
+_locks_guard = threading.Lock()
+_metrics = {}
+_metrics_guard = threading.Lock()
+
+
+class FileLock:
+    """
+    Lock reentrant yang berlaku antar-thread (threading.RLock) dan antar-proses
+    (flock pada file .lock). flock hanya diambil oleh pemegang terluar; lock
+    bersarang di thread yang sama cukup menaikkan hitungan kedalaman.
+    """
+
+    def __init__(self, lock_path):
+        self.lock_path = lock_path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        if self._depth == 0 and fcntl is not None:
+            try:
+                os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+                self._file = open(self.lock_path, 'a')
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            except Exception:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0 and self._file is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        self._thread_lock.release()
+
+
+# Fungsi untuk mendapatkan objek lock untuk satu nama data
+def get_lock(name, data_dir="data"):
+    lock_path = os.path.abspath(os.path.join(data_dir, f".{name}.lock"))
+    with _locks_guard:
+        if lock_path not in _locks:
+            _locks[lock_path] = FileLock(lock_path)
+        return _locks[lock_path]
+
+# Fungsi untuk mencatat waktu tunggu lock
+def _record_wait(name, wait_seconds):
+    with _metrics_guard:
+        metric = _metrics.setdefault(name, {
+            "acquisitions": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "last_wait_seconds": 0.0
+        })
+        metric["acquisitions"] += 1
+        metric["total_wait_seconds"] += wait_seconds
+        metric["max_wait_seconds"] = max(metric["max_wait_seconds"], wait_seconds)
+        metric["last_wait_seconds"] = wait_seconds
+
+# Context manager untuk mengunci satu atau beberapa data selama read-modify-write
+@contextmanager
+def data_lock(*names, data_dir="data"):
+    """
+    Contoh: with data_lock("activities", "followups"): ...
+    Lock diambil mengikuti LOCK_ORDER dan waktu tunggunya dicatat per nama.
+    """
+    ordered = sorted(set(names), key=lambda n: (LOCK_ORDER.index(n) if n in LOCK_ORDER else len(LOCK_ORDER), n))
+    acquired = []
+    try:
+        for name in ordered:
+            lock = get_lock(name, data_dir)
+            start = time.perf_counter()
+            lock.acquire()
+            acquired.append(lock)
+            _record_wait(name, time.perf_counter() - start)
+        yield
+    finally:
+        for lock in reversed(acquired):
+            lock.release()
+
+# Fungsi untuk mendapatkan metrik waktu tunggu lock
+def get_lock_metrics():
+    with _metrics_guard:
+        metrics = {}
+        for name, metric in _metrics.items():
+            metrics[name] = dict(metric)
+            metrics[name]["avg_wait_seconds"] = (
+                metric["total_wait_seconds"] / metric["acquisitions"] if metric["acquisitions"] else 0.0
+            )
+        return metrics
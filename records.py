@@ -0,0 +1,145 @@
+import sys
+from collections.abc import MutableMapping
+
+# Penanda field yang tidak ada di record (berbeda dari field bernilai None)
+_MISSING = object()
+
+
+class Record(MutableMapping):
+    """
+    Record ber-__slots__ yang bisa dipakai seperti dict: r["status"],
+    r.get(...), dict(r), {**r}, iterasi key dan perbandingan dengan dict.
+    Field yang dikenal disimpan di slot, sehingga tidak ada dict dan salinan
+    string key per record; field lain (misalnya dari versi data lama atau
+    baru) masuk ke _extra. Nilai teks di CATEGORICAL di-intern, sehingga
+    nilai yang sama (username, status, jenis, lokasi) hanya disimpan sekali
+    per proses.
+    """
+
+    __slots__ = ("_extra",)
+
+    # Field yang disimpan di slot, dalam urutan iterasi
+    FIELDS = ()
+    # Field bernilai kategori yang teksnya di-intern
+    CATEGORICAL = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.FIELDS)
+        cls._categorical_set = frozenset(cls.CATEGORICAL)
+
+    def __init__(self, data=(), **kwargs):
+        self._extra = None
+        for field in self.FIELDS:
+            setattr(self, field, _MISSING)
+        for key, value in (data.items() if hasattr(data, "items") else data):
+            self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            value = getattr(self, key)
+            if value is not _MISSING:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._field_set:
+            if key in self._categorical_set and type(value) is str:
+                value = sys.intern(value)
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._field_set and getattr(self, key) is not _MISSING:
+            setattr(self, key, _MISSING)
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        for field in self.FIELDS:
+            if getattr(self, field) is not _MISSING:
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        count = sum(1 for field in self.FIELDS if getattr(self, field) is not _MISSING)
+        return count + (len(self._extra) if self._extra else 0)
+
+    def __contains__(self, key):
+        if key in self._field_set:
+            return getattr(self, key) is not _MISSING
+        return self._extra is not None and key in self._extra
+
+    # Versi cepat dari Mapping.get (tanpa menangkap KeyError)
+    def get(self, key, default=None):
+        if key in self._field_set:
+            value = getattr(self, key)
+            return default if value is _MISSING else value
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def copy(self):
+        return type(self)(self)
+
+    # Pickle dan copy lewat dict, karena penanda _MISSING tidak bisa dipickle
+    def __reduce__(self):
+        return (type(self), (self.to_dict(),))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class ActivityRecord(Record):
+    FIELDS = (
+        "id", "marketer_username", "prospect_name", "prospect_location", "contact_person",
+        "contact_position", "contact_phone", "contact_email", "activity_date", "activity_type",
+        "description", "status", "created_at", "updated_at", "version"
+    )
+    CATEGORICAL = ("marketer_username", "prospect_location", "activity_type", "status")
+    __slots__ = FIELDS
+
+
+class FollowupRecord(Record):
+    FIELDS = (
+        "id", "activity_id", "marketer_username", "followup_date", "notes", "next_action",
+        "next_followup_date", "interest_level", "status_update", "created_at"
+    )
+    CATEGORICAL = ("marketer_username", "interest_level", "status_update")
+    __slots__ = FIELDS
+
+
+class UserRecord(Record):
+    FIELDS = ("username", "password_hash", "name", "role", "email", "created_at")
+    CATEGORICAL = ("role",)
+    __slots__ = FIELDS
+
+
+# Tipe record per koleksi
+RECORD_TYPES = {
+    "activities": ActivityRecord,
+    "followups": FollowupRecord,
+    "users": UserRecord,
+}
+
+# Fungsi untuk mendapatkan tipe record koleksi (dict untuk koleksi lain)
+def record_type(collection):
+    return RECORD_TYPES.get(collection, dict)
+
+# Fungsi untuk mengubah daftar dict menjadi record ber-slot
+def to_records(collection, records):
+    cls = record_type(collection)
+    return [record if type(record) is cls else cls(record) for record in records]
@@ -0,0 +1,85 @@
+import os
+import itertools
+import threading
+from yaml_io import load_yaml
+
+# Cache proses untuk isi file YAML yang sudah di-parse.
+# Streamlit menjalankan ulang script pada setiap interaksi widget, tetapi modul
+# hanya diimpor sekali per proses, sehingga cache ini dipakai bersama oleh
+# semua sesi dan semua rerun.
+_cache = {}
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+# Nomor versi global agar versi tidak berulang meskipun cache di-invalidate
+_versions = itertools.count(1)
+
+# Fungsi untuk mendapatkan tanda tangan file yang murah dicek lewat os.stat
+def file_signature(file_path):
+    """
+    Mengembalikan (inode, mtime_ns, ctime_ns, ukuran) atau None jika file
+    tidak ada. Inode ikut dicek karena penulisan lewat rename mengganti
+    inode meskipun mtime dan ukuran kebetulan sama.
+    """
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_ctime_ns, stat.st_size)
+
+# Fungsi untuk membaca file YAML dengan cache
+def read_cached_yaml(file_path):
+    """
+    Mengembalikan isi file YAML yang sudah di-parse. File hanya di-parse ulang
+    jika tanda tangannya berubah (misalnya ditulis oleh proses lain).
+    Data yang dikembalikan dipakai bersama; pemanggil yang mengubahnya wajib
+    menyimpannya kembali lewat store_cached_yaml (atau write_yaml di utils).
+    """
+    key = os.path.abspath(file_path)
+    signature = file_signature(key)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry["signature"] == signature:
+            _stats["hits"] += 1
+            return entry["data"]
+
+    if signature is None:
+        data = None
+    else:
+        with open(key, 'r') as file:
+            data = load_yaml(file)
+
+    with _lock:
+        _stats["misses"] += 1
+        _cache[key] = {"signature": signature, "data": data, "version": next(_versions)}
+    return data
+
+# Fungsi untuk menyimpan data yang baru ditulis ke cache tanpa parse ulang
+def store_cached_yaml(file_path, data):
+    key = os.path.abspath(file_path)
+    with _lock:
+        _cache[key] = {"signature": file_signature(key), "data": data, "version": next(_versions)}
+
+# Fungsi untuk membuang cache satu file (atau semua file)
+def invalidate(file_path=None):
+    with _lock:
+        if file_path is None:
+            _cache.clear()
+        else:
+            _cache.pop(os.path.abspath(file_path), None)
+
+# Fungsi untuk mendapatkan versi data file yang sedang di-cache
+def get_version(file_path):
+    """
+    Nomor versi naik setiap kali isi cache untuk file diganti dan tidak pernah
+    dipakai ulang, juga setelah invalidate. Struktur turunan
+    (indeks, DataFrame, agregat) bisa memakainya sebagai kunci cache.
+    """
+    read_cached_yaml(file_path)
+    with _lock:
+        entry = _cache.get(os.path.abspath(file_path))
+        return entry["version"] if entry is not None else 0
+
+# Fungsi untuk mendapatkan statistik cache
+def get_cache_stats():
+    with _lock:
+        return {"entries": len(_cache), **_stats}
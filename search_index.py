@@ -0,0 +1,189 @@
+import re
+import bisect
+import heapq
+import threading
+import unicodedata
+import weakref
+from collections import Counter
+import columnar
+from storage import get_storage
+
+# Field yang diindeks beserta bobotnya untuk peringkat hasil pencarian
+ACTIVITY_FIELDS = {
+    "prospect_name": 3,
+    "prospect_location": 2,
+    "contact_person": 2,
+    "description": 1,
+}
+FOLLOWUP_FIELDS = {
+    "notes": 1,
+}
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Fungsi untuk menormalkan teks: huruf kecil dan tanpa tanda diakritik
+def fold(text):
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+# Fungsi untuk memecah teks menjadi token yang sudah dinormalkan
+def tokenize(text):
+    return _TOKEN_PATTERN.findall(fold(text)) if text else []
+
+
+class SearchIndex:
+    """
+    Indeks terbalik token -> {id aktivitas: bobot}. Follow-up ikut diindeks
+    atas nama aktivitasnya, sehingga catatan follow-up membuat aktivitasnya
+    ditemukan. Daftar token terurut dipakai untuk pencocokan awalan (bisect).
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.terms = []
+        self.documents = {}
+
+    # Menambah atau mengganti dokumen (record aktivitas/follow-up)
+    def add(self, collection, record):
+        self.remove(collection, record["id"])
+        if collection == "activities":
+            activity_id, fields = record["id"], ACTIVITY_FIELDS
+        else:
+            activity_id, fields = record.get("activity_id"), FOLLOWUP_FIELDS
+        if activity_id is None:
+            return
+        weights = Counter()
+        for field, weight in fields.items():
+            for token in tokenize(record.get(field)):
+                weights[token] += weight
+        self.documents[(collection, record["id"])] = (activity_id, weights)
+        for token, weight in weights.items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = {}
+                bisect.insort(self.terms, token)
+            posting[activity_id] = posting.get(activity_id, 0) + weight
+
+    # Menghapus dokumen dari indeks
+    def remove(self, collection, record_id):
+        document = self.documents.pop((collection, record_id), None)
+        if document is None:
+            return
+        activity_id, weights = document
+        for token, weight in weights.items():
+            posting = self.postings[token]
+            remaining = posting.get(activity_id, 0) - weight
+            if remaining > 0:
+                posting[activity_id] = remaining
+            else:
+                posting.pop(activity_id, None)
+            if not posting:
+                del self.postings[token]
+                del self.terms[bisect.bisect_left(self.terms, token)]
+
+    # Mencari aktivitas yang memuat semua token kueri
+    def search(self, query, limit=None):
+        """
+        Setiap token kueri dicocokkan sebagai awalan token di indeks; token
+        yang cocok persis mendapat bobot dua kali lipat. Mengembalikan daftar
+        (id aktivitas, skor) terurut dari skor tertinggi.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        groups = []
+        for token in tokens:
+            start = bisect.bisect_left(self.terms, token)
+            terms = self.terms[start:bisect.bisect_left(self.terms, token + "\U0010ffff", start)]
+            if not terms:
+                return []
+            groups.append((sum(len(self.postings[term]) for term in terms), token, terms))
+        # Token paling selektif diproses lebih dulu; token berikutnya cukup
+        # dicek untuk kandidat yang tersisa jika itu lebih murah
+        groups.sort(key=lambda group: group[0])
+
+        scores = None
+        for size, token, terms in groups:
+            if scores is None or size <= len(scores) * len(terms):
+                token_scores = {}
+                for term in terms:
+                    factor = 2 if term == token else 1
+                    for activity_id, weight in self.postings[term].items():
+                        token_scores[activity_id] = token_scores.get(activity_id, 0) + weight * factor
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {
+                        activity_id: score + token_scores[activity_id]
+                        for activity_id, score in scores.items() if activity_id in token_scores
+                    }
+            else:
+                narrowed = {}
+                for activity_id, score in scores.items():
+                    gained = 0
+                    for term in terms:
+                        weight = self.postings[term].get(activity_id)
+                        if weight:
+                            gained += weight * (2 if term == token else 1)
+                    if gained:
+                        narrowed[activity_id] = score + gained
+                scores = narrowed
+            if not scores:
+                return []
+        if limit is not None:
+            return heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+# Indeks aktif: {"storage", "versions", "index"}
+_state = {}
+_lock = threading.Lock()
+_registered = weakref.WeakSet()
+
+# Listener penyimpanan: perbarui dokumen yang berubah saja
+def _on_change(storage, collection, changes, old_version, new_version):
+    with _lock:
+        if _state.get("storage") is not storage or _state["versions"].get(collection) != old_version:
+            return
+        index = _state["index"]
+        for before, after in changes:
+            if after is not None:
+                index.add(collection, after)
+            elif before is not None:
+                index.remove(collection, before["id"])
+        _state["versions"][collection] = new_version
+
+# Fungsi untuk membangun ulang indeks pencarian dari data penyimpanan
+def rebuild_search_index(storage=None):
+    storage = storage or get_storage()
+    with _lock:
+        if storage not in _registered:
+            storage.add_listener(_on_change)
+            _registered.add(storage)
+    versions = {collection: storage.version(collection) for collection in ("activities", "followups")}
+    index = SearchIndex()
+    for collection in versions:
+        # Kolom yang diindeks dibaca dari snapshot kolumnar jika mutakhir
+        columns = ["id", *ACTIVITY_FIELDS] if collection == "activities" else ["id", "activity_id", *FOLLOWUP_FIELDS]
+        records = columnar.iter_snapshot_rows(collection, columns, storage)
+        for record in records if records is not None else storage.load(collection):
+            index.add(collection, record)
+    with _lock:
+        _state.update({"storage": storage, "versions": versions, "index": index})
+    return index
+
+# Fungsi untuk mencari aktivitas lewat indeks pencarian
+def search_activities(query, limit=None):
+    """
+    Mengembalikan daftar id aktivitas terurut dari yang paling relevan.
+    Indeks diperbarui oleh listener penyimpanan setiap kali proses ini
+    menulis; jika data diubah proses lain, indeks dibangun ulang.
+    """
+    storage = get_storage()
+    versions = {collection: storage.version(collection) for collection in ("activities", "followups")}
+    with _lock:
+        current = _state.get("storage") is storage and _state.get("versions") == versions
+    if not current:
+        rebuild_search_index(storage)
+    with _lock:
+        return [activity_id for activity_id, _ in _state["index"].search(query, limit)]
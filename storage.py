@@ -0,0 +1,1351 @@
+import os
+import json
+import heapq
+import sqlite3
+import threading
+import uuid
+from collections.abc import Mapping
+from contextlib import contextmanager
+from yaml_io import read_yaml_file, iter_yaml_records, write_yaml_records, atomic_write
+from repository import read_cached_yaml, store_cached_yaml, invalidate, get_version, file_signature
+from locking import data_lock
+from records import record_type, to_records
+
+# Direktori data default (relatif terhadap direktori kerja aplikasi)
+DEFAULT_DATA_DIR = "data"
+
+# Koleksi yang dikelola backend penyimpanan: nama koleksi -> (nama file, key root YAML)
+COLLECTIONS = {
+    "activities": ("marketing_activities.yaml", "activities"),
+    "followups": ("followups.yaml", "followups"),
+}
+
+# Koleksi yang record-nya diberi nomor versi per record (field "version")
+VERSIONED_COLLECTIONS = ("activities",)
+
+# Fungsi untuk membuat mutasi insert
+def insert_op(record):
+    return {"op": "insert", "record": record}
+
+# Fungsi untuk membuat mutasi update (hanya field yang berubah)
+def update_op(record_id, fields):
+    return {"op": "update", "id": record_id, "fields": fields}
+
+# Fungsi untuk membuat mutasi delete
+def delete_op(record_id):
+    return {"op": "delete", "id": record_id}
+
+# Fungsi untuk serialisasi JSON nilai non-standar (record ber-slot, tanggal)
+def _json_default(value):
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
+
+# Fungsi untuk menerapkan daftar mutasi ke dict id -> record
+def apply_ops_to_index(index, ops, record_cls=dict):
+    """
+    Menerapkan mutasi secara berurutan. Setiap mutasi bersifat idempoten
+    (insert menimpa, update menggabungkan field, delete mengabaikan id yang
+    tidak ada), sehingga memutar ulang journal di atas snapshot yang sudah
+    memuat sebagian mutasi tetap menghasilkan state yang sama.
+    Record tidak pernah diubah di tempat agar record yang sudah dibagikan
+    ke pemanggil tidak ikut berubah.
+    Record hasil insert/update dibuat dengan record_cls (misalnya
+    ActivityRecord). Mengembalikan daftar perubahan (record sebelum, record
+    sesudah); None berarti record belum ada atau sudah dihapus.
+    """
+    changes = []
+    for op in ops:
+        kind = op["op"]
+        if kind == "insert":
+            record = record_cls(op["record"])
+            changes.append((index.get(record["id"]), record))
+            index[record["id"]] = record
+        elif kind == "update":
+            record = index.get(op["id"])
+            if record is not None:
+                updated = record_cls({**record, **op["fields"]})
+                index[op["id"]] = updated
+                changes.append((record, updated))
+        elif kind == "delete":
+            record = index.pop(op["id"], None)
+            if record is not None:
+                changes.append((record, None))
+        else:
+            raise ValueError(f"Jenis mutasi tidak dikenal: {kind}")
+    return changes
+
+# Fungsi untuk mengecek nilai field berada di rentang [awal, akhir)
+def _in_range(value, start, end):
+    if value is None:
+        return False
+    value = str(value)
+    return (start is None or value >= start) and (end is None or value < end)
+
+
+# Fungsi untuk membuang filter dan rentang yang kosong dari parameter query
+def _normalize_query(filters, ranges):
+    filters = {field: value for field, value in (filters or {}).items() if value is not None}
+    ranges = {field: bounds for field, bounds in (ranges or {}).items() if bounds != (None, None)}
+    return filters, ranges
+
+# Fungsi untuk memfilter, mengurutkan dan memotong record menjadi satu halaman
+def _select_page(records, filters, ranges, search, search_fields, sort_by, descending, offset, limit, ids):
+    term = search.casefold() if search else None
+    positions = None
+    if ids is not None:
+        positions = {record_id: position for position, record_id in enumerate(ids)}
+        records = [record for record in records if record["id"] in positions]
+
+    matches = []
+    for record in records:
+        if any(record.get(field) != value for field, value in filters.items()):
+            continue
+        if not all(_in_range(record.get(field), start, end) for field, (start, end) in ranges.items()):
+            continue
+        if term and not any(term in str(record.get(field) or "").casefold() for field in search_fields):
+            continue
+        matches.append(record)
+
+    total = len(matches)
+    end = None if limit is None else offset + limit
+    if sort_by:
+        key = lambda record: str(record.get(sort_by) or "")
+        if end is not None:
+            # Hanya offset+limit record teratas yang perlu diurutkan
+            matches = (heapq.nlargest if descending else heapq.nsmallest)(end, matches, key=key)
+        else:
+            matches = sorted(matches, key=key, reverse=descending)
+    elif positions is not None:
+        matches.sort(key=lambda record: positions[record["id"]])
+    return matches[offset:end], total
+
+
+class Storage:
+    """
+    Antarmuka dasar backend penyimpanan untuk koleksi aktivitas dan follow-up.
+    Backend wajib mengimplementasikan load(), apply() dan version(); get()
+    dan find() memakai indeks sekunder di memori, keduanya boleh
+    dioptimalkan oleh backend turunan.
+
+    Setelah menulis, backend memanggil _notify() dengan daftar perubahan
+    (sebelum, sesudah) beserta versi lama dan baru. Indeks sekunder dan
+    listener lain memakainya untuk memperbarui diri secara inkremental;
+    jika versi lamanya tidak cocok, struktur itu dibangun ulang saat dipakai.
+    """
+
+    # Field yang punya indeks sekunder di memori: nilai field -> {id: record}
+    SECONDARY_INDEXES = {
+        "activities": ("marketer_username",),
+        "followups": ("activity_id", "marketer_username"),
+    }
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR):
+        self.data_dir = data_dir
+        self._indexes = {}
+        self._index_lock = threading.RLock()
+        self._listeners = []
+
+    def file_path(self, collection):
+        return os.path.join(self.data_dir, COLLECTIONS[collection][0])
+
+    def root_key(self, collection):
+        return COLLECTIONS[collection][1]
+
+    def load(self, collection):
+        raise NotImplementedError
+
+    def apply(self, collection, ops):
+        raise NotImplementedError
+
+    # Token versi data koleksi; berubah setiap kali isi koleksi berubah
+    def version(self, collection):
+        raise NotImplementedError
+
+    # Token data koleksi di disk yang sama di semua proses (dipakai snapshot turunan)
+    def source_token(self, collection):
+        return [file_signature(self.file_path(collection))]
+
+    def get(self, collection, record_id):
+        # Indeks id -> record dibangun sekali per versi dan diperbarui inkremental oleh _notify
+        bucket = self.secondary_index(collection, "id").get(record_id)
+        return next(iter(bucket.values())) if bucket else None
+
+    def find(self, collection, field, value):
+        if field in self.SECONDARY_INDEXES.get(collection, ()):
+            return list(self.secondary_index(collection, field).get(value, {}).values())
+        return [record for record in self.load(collection) if record.get(field) == value]
+
+    # Fungsi untuk mengambil satu halaman record yang difilter dan diurutkan
+    def query(self, collection, filters=None, ranges=None, search=None, search_fields=(),
+              sort_by=None, descending=False, offset=0, limit=None, ids=None):
+        """
+        filters: {field: nilai} (nilai None diabaikan); ranges: {field: (awal,
+        akhir)} dengan awal inklusif dan akhir eksklusif, dibandingkan sebagai
+        string; search: potongan teks (tanpa beda huruf besar/kecil) yang dicari
+        di search_fields; ids: daftar id yang boleh muncul (misalnya hasil indeks
+        pencarian), sekaligus urutan hasil jika sort_by kosong.
+        Mengembalikan (record pada halaman, jumlah total cocok).
+        """
+        filters, ranges = _normalize_query(filters, ranges)
+        indexed = [field for field in filters if field in self.SECONDARY_INDEXES.get(collection, ())]
+        records = self.find(collection, indexed[0], filters[indexed[0]]) if indexed else self.load(collection)
+        return _select_page(records, filters, ranges, search, search_fields, sort_by, descending, offset, limit, ids)
+
+    # Fungsi untuk mendapatkan indeks sekunder, dibangun sekali per versi data
+    def secondary_index(self, collection, field):
+        version = self.version(collection)
+        with self._index_lock:
+            entry = self._indexes.get((collection, field))
+            if entry is not None and entry["version"] == version:
+                return entry["map"]
+        index_map = {}
+        for record in self.load(collection):
+            index_map.setdefault(record.get(field), {})[record["id"]] = record
+        with self._index_lock:
+            self._indexes[(collection, field)] = {"version": version, "map": index_map}
+        return index_map
+
+    # Fungsi untuk mendaftarkan listener perubahan data
+    def add_listener(self, listener):
+        """
+        listener(storage, collection, changes, old_version, new_version)
+        dipanggil setelah setiap penulisan yang dilakukan proses ini.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, collection, changes, old_version, new_version):
+        with self._index_lock:
+            for (index_collection, field), entry in self._indexes.items():
+                if index_collection != collection or entry["version"] != old_version:
+                    continue
+                index_map = entry["map"]
+                for before, after in changes:
+                    if before is not None:
+                        bucket = index_map.get(before.get(field))
+                        if bucket is not None:
+                            bucket.pop(before["id"], None)
+                            if not bucket:
+                                del index_map[before.get(field)]
+                    if after is not None:
+                        index_map.setdefault(after.get(field), {})[after["id"]] = after
+                entry["version"] = new_version
+        for listener in self._listeners:
+            try:
+                listener(self, collection, changes, old_version, new_version)
+            except Exception as e:
+                print("⚠️ Listener penyimpanan gagal:", e)
+
+    def transactions_dir(self):
+        return os.path.join(self.data_dir, ".transactions")
+
+    # Menerapkan mutasi ke beberapa koleksi sebagai satu kesatuan
+    def apply_many(self, changes):
+        """
+        changes: dict koleksi -> daftar mutasi; setiap koleksi ditulis sekali.
+        Jika lebih dari satu koleksi berubah, mutasi dicatat dulu ke file
+        intent. Bila proses mati sebelum semua koleksi ditulis, intent itu
+        diterapkan ulang oleh recover_pending_transactions().
+        Pemanggil wajib memegang data_lock untuk semua koleksi.
+        """
+        changes = {collection: ops for collection, ops in changes.items() if ops}
+        if len(changes) <= 1:
+            for collection, ops in changes.items():
+                self.apply(collection, ops)
+            return
+        os.makedirs(self.transactions_dir(), exist_ok=True)
+        intent_path = os.path.join(self.transactions_dir(), f"{uuid.uuid4().hex}.json")
+        with atomic_write(intent_path) as file:
+            json.dump(changes, file, ensure_ascii=False, default=_json_default)
+        for collection, ops in changes.items():
+            self.apply(collection, ops)
+        os.remove(intent_path)
+
+    # Menerapkan ulang transaksi yang terputus karena proses mati
+    def recover_pending_transactions(self):
+        """
+        Aman karena semua mutasi idempoten. Dipanggil sambil memegang lock
+        seluruh koleksi, sehingga intent yang tersisa pasti milik proses yang
+        sudah mati (transaksi aktif selalu menghapus intent sebelum melepas lock).
+        """
+        directory = self.transactions_dir()
+        if not os.path.isdir(directory):
+            return 0
+        pending = sorted(
+            (entry for entry in os.scandir(directory) if entry.name.endswith(".json")),
+            key=lambda entry: entry.stat().st_mtime_ns
+        )
+        for entry in pending:
+            with open(entry.path, 'r') as file:
+                changes = json.load(file)
+            for collection, ops in changes.items():
+                self.apply(collection, ops)
+            os.remove(entry.path)
+        return len(pending)
+
+    # Nama file data milik backend (relatif terhadap data_dir, pemisah "/") yang ikut di-backup
+    def backup_files(self):
+        return [COLLECTIONS[collection][0] for collection in COLLECTIONS]
+
+    # Tanda file untuk melewati file yang tidak berubah sejak backup terakhir
+    # ((ukuran, mtime_ns), atau None jika isi harus selalu dibaca ulang)
+    def backup_signature(self, name):
+        stat = os.stat(os.path.join(self.data_dir, *name.split("/")))
+        return (stat.st_size, stat.st_mtime_ns)
+
+    # Membaca isi satu file backend untuk backup; dipanggil sambil memegang data_lock
+    def read_backup_file(self, name):
+        with open(os.path.join(self.data_dir, *name.split("/")), 'rb') as file:
+            return file.read()
+
+    # Menulis ulang file backend dari backup (nama -> isi); file backend yang
+    # tidak ada di backup dihapus. Dipanggil sambil memegang data_lock
+    def restore_backup_files(self, contents):
+        stale = [name for name in self.backup_files() if name not in contents]
+        for name, data in contents.items():
+            path = os.path.join(self.data_dir, *name.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with atomic_write(path, 'wb') as file:
+                file.write(data)
+        for name in stale:
+            path = os.path.join(self.data_dir, *name.split("/"))
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class YamlStorage(Storage):
+    """
+    Backend bawaan: setiap koleksi disimpan utuh dalam satu file YAML.
+    Hasil parse di-cache per proses oleh repository.py; daftar dict hasil
+    parse diganti sekali dengan record ber-slot di cache yang sama.
+    """
+
+    def load(self, collection):
+        data = read_cached_yaml(self.file_path(collection))
+        key = self.root_key(collection)
+        if not data or key not in data:
+            return []
+        records = data[key]
+        if records and type(records[0]) is not record_type(collection):
+            records = data[key] = to_records(collection, records)
+        return records
+
+    def apply(self, collection, ops):
+        if not ops:
+            return
+        with data_lock(collection, data_dir=self.data_dir):
+            file_path = self.file_path(collection)
+            old_version = self.version(collection)
+            index = {record["id"]: record for record in self.load(collection)}
+            changes = apply_ops_to_index(index, ops, record_type(collection))
+            key = self.root_key(collection)
+            data = {key: list(index.values())}
+            try:
+                write_yaml_records(file_path, key, data[key])
+            except Exception:
+                invalidate(file_path)
+                raise
+            store_cached_yaml(file_path, data)
+            self._notify(collection, changes, old_version, self.version(collection))
+
+    def version(self, collection):
+        return get_version(self.file_path(collection))
+
+
+class JournalStorage(Storage):
+    """
+    Backend append-only. File YAML koleksi menjadi snapshot, sedangkan setiap
+    mutasi ditambahkan sebagai satu baris JSON ke file .journal. Saat pertama
+    kali dibaca, snapshot dimuat lalu journal diputar ulang ke memori; setelah
+    itu hanya bagian journal yang baru yang dibaca. Jika journal melewati
+    compact_threshold entri, snapshot dipadatkan ulang di thread background.
+    Penulisan file memakai data_lock (antar-proses) lalu self._lock (state
+    di memori), selalu dengan urutan itu agar tidak terjadi deadlock.
+    """
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR, compact_threshold=1000):
+        super().__init__(data_dir)
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()
+        self._states = {}
+        self._versions = {}
+        self._compacting = set()
+
+    def journal_path(self, collection):
+        return os.path.splitext(self.file_path(collection))[0] + ".journal"
+
+    def source_token(self, collection):
+        return [file_signature(self.file_path(collection)), file_signature(self.journal_path(collection))]
+
+    # Snapshot YAML beserta journal-nya; journal yang lebih baru dari backup
+    # dihapus saat restore agar tidak diputar ulang di atas snapshot lama
+    def backup_files(self):
+        names = super().backup_files()
+        return names + [os.path.splitext(name)[0] + ".journal" for name in names]
+
+    # Memuat snapshot lalu memutar ulang seluruh journal
+    def _replay(self, collection):
+        snapshot_path = self.file_path(collection)
+        records = iter_yaml_records(snapshot_path, self.root_key(collection))
+        state = {
+            "snapshot": file_signature(snapshot_path),
+            "index": {record["id"]: record for record in to_records(collection, records)},
+            "offset": 0,
+            "entries": 0,
+            "records": None,
+        }
+        self._replay_tail(collection, state, notify=False)
+        return state
+
+    # Membaca baris journal setelah offset terakhir; baris terakhir yang belum
+    # lengkap (tulisan terpotong saat crash) diabaikan
+    def _replay_tail(self, collection, state, notify=True):
+        journal_path = self.journal_path(collection)
+        if not os.path.exists(journal_path):
+            return
+        ops = []
+        with open(journal_path, 'rb') as file:
+            file.seek(state["offset"])
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                ops.append(json.loads(line))
+                state["offset"] += len(line)
+        if ops:
+            changes = apply_ops_to_index(state["index"], ops, record_type(collection))
+            state["entries"] += len(ops)
+            state["records"] = None
+            # Saat replay penuh versi baru dinaikkan oleh _state() setelahnya
+            if notify:
+                old_version = self._versions.get(collection, 0)
+                self._bump_version(collection)
+                self._notify(collection, changes, old_version, self._versions[collection])
+
+    # Mendapatkan state koleksi di memori, disegarkan jika file berubah
+    def _state(self, collection):
+        state = self._states.get(collection)
+        journal_size = file_signature(self.journal_path(collection))
+        journal_size = journal_size[3] if journal_size else 0
+        if (state is None
+                or state["snapshot"] != file_signature(self.file_path(collection))
+                or journal_size < state["offset"]):
+            state = self._replay(collection)
+            self._states[collection] = state
+            self._bump_version(collection)
+        elif journal_size > state["offset"]:
+            self._replay_tail(collection, state)
+        return state
+
+    def load(self, collection):
+        with self._lock:
+            state = self._state(collection)
+            if state["records"] is None:
+                state["records"] = list(state["index"].values())
+            return state["records"]
+
+    def get(self, collection, record_id):
+        with self._lock:
+            return self._state(collection)["index"].get(record_id)
+
+    def _bump_version(self, collection):
+        self._versions[collection] = self._versions.get(collection, 0) + 1
+
+    def version(self, collection):
+        with self._lock:
+            self._state(collection)
+            return self._versions[collection]
+
+    def apply(self, collection, ops):
+        if not ops:
+            return
+        payload = "".join(
+            json.dumps(op, ensure_ascii=False, default=_json_default) + "\n" for op in ops
+        ).encode("utf-8")
+        with data_lock(collection, data_dir=self.data_dir), self._lock:
+            state = self._state(collection)
+            with open(self.journal_path(collection), 'ab') as file:
+                # Buang sisa tulisan terpotong sebelum menambahkan mutasi baru
+                if file.tell() != state["offset"]:
+                    file.truncate(state["offset"])
+                file.write(payload)
+                file.flush()
+                os.fsync(file.fileno())
+            state["offset"] += len(payload)
+            state["entries"] += len(ops)
+            old_version = self._versions[collection]
+            changes = apply_ops_to_index(state["index"], ops, record_type(collection))
+            state["records"] = None
+            self._bump_version(collection)
+            self._notify(collection, changes, old_version, self._versions[collection])
+            if state["entries"] >= self.compact_threshold and collection not in self._compacting:
+                self._compacting.add(collection)
+                threading.Thread(
+                    target=self._compact_in_background, args=(collection,), daemon=True
+                ).start()
+
+    def _compact_in_background(self, collection):
+        try:
+            self.compact(collection)
+        except Exception as e:
+            print(f"⚠️ Pemadatan journal {collection} gagal:", e)
+        finally:
+            with self._lock:
+                self._compacting.discard(collection)
+
+    # Fungsi untuk memadatkan journal menjadi snapshot YAML baru
+    def compact(self, collection):
+        """
+        Menulis snapshot tanpa menahan lock selama serialisasi. Mutasi yang
+        masuk selama snapshot ditulis dipindahkan ke journal baru. Jika proses
+        mati di antara dua rename, journal lama diputar ulang di atas snapshot
+        baru, yang aman karena mutasi bersifat idempoten.
+        """
+        snapshot_path = self.file_path(collection)
+        journal_path = self.journal_path(collection)
+        with self._lock:
+            state = self._state(collection)
+            records = list(state["index"].values())
+            offset = state["offset"]
+            snapshot_signature = state["snapshot"]
+
+        temp_snapshot = f"{snapshot_path}.compact"
+        write_yaml_records(temp_snapshot, self.root_key(collection), records)
+
+        with data_lock(collection, data_dir=self.data_dir), self._lock:
+            state = self._state(collection)
+            if state["snapshot"] != snapshot_signature or state["offset"] < offset:
+                # Snapshot sudah diganti pihak lain; batalkan pemadatan ini
+                os.remove(temp_snapshot)
+                return False
+            tail = b""
+            if state["offset"] > offset:
+                with open(journal_path, 'rb') as file:
+                    file.seek(offset)
+                    tail = file.read(state["offset"] - offset)
+            temp_journal = f"{journal_path}.compact"
+            with open(temp_journal, 'wb') as file:
+                file.write(tail)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_snapshot, snapshot_path)
+            os.replace(temp_journal, journal_path)
+            state["snapshot"] = file_signature(snapshot_path)
+            state["offset"] = len(tail)
+            state["entries"] = tail.count(b"\n")
+        return True
+
+
+class SqliteStorage(Storage):
+    """
+    Backend SQLite. Setiap record disimpan utuh sebagai JSON di kolom data,
+    sedangkan field yang sering dipakai untuk pencarian disalin ke kolom
+    terindeks sehingga get() dan find() menjadi query berindeks.
+    """
+
+    # Pencarian memakai indeks SQLite, bukan indeks sekunder di memori
+    SECONDARY_INDEXES = {}
+
+    # Kolom terindeks per koleksi (selain id yang menjadi primary key)
+    INDEXED_COLUMNS = {
+        "activities": ("marketer_username", "status", "created_at"),
+        "followups": ("activity_id", "marketer_username", "next_followup_date", "created_at"),
+    }
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR, db_file="marketing_tracker.db"):
+        super().__init__(data_dir)
+        self.db_path = os.path.join(data_dir, db_file)
+        self._local = threading.local()
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        self._create_schema()
+
+    # Koneksi terpisah per thread karena setiap sesi Streamlit berjalan di thread sendiri
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        conn = self._connection()
+        with conn:
+            # Penghitung versi per koleksi, dinaikkan di setiap transaksi tulis
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS data_versions "
+                "(collection TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+            for collection, columns in self.INDEXED_COLUMNS.items():
+                conn.execute(
+                    "INSERT OR IGNORE INTO data_versions (collection, version) VALUES (?, 0)",
+                    (collection,)
+                )
+                column_defs = "".join(f", {column} TEXT" for column in columns)
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {collection} "
+                    f"(id TEXT PRIMARY KEY{column_defs}, data TEXT NOT NULL)"
+                )
+                for column in columns:
+                    conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS idx_{collection}_{column} "
+                        f"ON {collection} ({column})"
+                    )
+
+    def _row_values(self, collection, record):
+        columns = self.INDEXED_COLUMNS[collection]
+        values = [record["id"]]
+        values.extend(None if record.get(c) is None else str(record.get(c)) for c in columns)
+        values.append(json.dumps(record, ensure_ascii=False, default=_json_default))
+        return values
+
+    def _select(self, collection, where="", params=()):
+        rows = self._connection().execute(
+            f"SELECT data FROM {collection} {where} ORDER BY rowid", params
+        )
+        return to_records(collection, (json.loads(row[0]) for row in rows))
+
+    def version(self, collection):
+        row = self._connection().execute(
+            "SELECT version FROM data_versions WHERE collection = ?", (collection,)
+        ).fetchone()
+        return row[0]
+
+    # Nomor versi di data_versions sudah persisten dan sama di semua proses
+    def source_token(self, collection):
+        return [self.db_path, self.version(collection)]
+
+    def backup_files(self):
+        return [os.path.basename(self.db_path)]
+
+    # Isi WAL yang belum di-checkpoint tidak terlihat dari ukuran/mtime file database
+    def backup_signature(self, name):
+        return None
+
+    # Salinan konsisten lewat backup API SQLite (termasuk isi WAL)
+    def read_backup_file(self, name):
+        temp_path = f"{self.db_path}.backup"
+        try:
+            target = sqlite3.connect(temp_path)
+            try:
+                self._connection().backup(target)
+            finally:
+                target.close()
+            with open(temp_path, 'rb') as file:
+                return file.read()
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    # Isi backup disalin ke database aktif lewat backup API, sehingga koneksi
+    # yang terbuka (dan file WAL-nya) tetap valid
+    def restore_backup_files(self, contents):
+        name = os.path.basename(self.db_path)
+        if name not in contents:
+            raise ValueError(f"Backup tidak berisi database {name}")
+        conn = self._connection()
+        versions = dict(conn.execute("SELECT collection, version FROM data_versions"))
+        temp_path = f"{self.db_path}.restore"
+        with open(temp_path, 'wb') as file:
+            file.write(contents[name])
+        try:
+            source = sqlite3.connect(temp_path)
+            try:
+                source.backup(conn)
+            finally:
+                source.close()
+        finally:
+            os.remove(temp_path)
+        # Versi dinaikkan melewati versi sebelum restore agar cache di semua proses dibuang
+        with conn:
+            for collection, version in versions.items():
+                conn.execute(
+                    "UPDATE data_versions SET version = MAX(version, ?) + 1 WHERE collection = ?",
+                    (version, collection)
+                )
+
+    # Seluruh koleksi di-cache per proses dan hanya dibaca ulang jika versinya berubah
+    def load(self, collection):
+        version = self.version(collection)
+        with self._cache_lock:
+            cached = self._cache.get(collection)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+        records = self._select(collection)
+        with self._cache_lock:
+            self._cache[collection] = (version, records)
+        return records
+
+    def get(self, collection, record_id):
+        records = self._select(collection, "WHERE id = ?", (record_id,))
+        return records[0] if records else None
+
+    def find(self, collection, field, value):
+        if field not in self.INDEXED_COLUMNS[collection]:
+            return super().find(collection, field, value)
+        return self._select(collection, f"WHERE {field} = ?", (str(value),))
+
+    # Filter, urutan dan halaman dikerjakan oleh SQLite; hanya satu halaman yang di-parse
+    def query(self, collection, filters=None, ranges=None, search=None, search_fields=(),
+              sort_by=None, descending=False, offset=0, limit=None, ids=None):
+        clauses = []
+        params = []
+        source = collection
+        if ids is not None:
+            # Daftar id dikirim sebagai satu array JSON; urutannya dipakai jika sort_by kosong
+            source = f"{collection} JOIN json_each(?) AS selected ON selected.value = {collection}.id"
+            params.append(json.dumps(list(ids)))
+        for field, value in (filters or {}).items():
+            if value is not None:
+                clauses.append(f"{self._column(collection, field)} = ?")
+                params.append(str(value) if field in self.INDEXED_COLUMNS[collection] else value)
+        for field, (start, end) in (ranges or {}).items():
+            if start is not None:
+                clauses.append(f"{self._column(collection, field)} >= ?")
+                params.append(start)
+            if end is not None:
+                clauses.append(f"{self._column(collection, field)} < ?")
+                params.append(end)
+        if search and search_fields:
+            pattern = "%" + search.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            clauses.append("(" + " OR ".join(
+                f"lower(coalesce({self._column(collection, field)}, '')) LIKE ? ESCAPE '\\'" for field in search_fields
+            ) + ")")
+            params.extend(pattern for _ in search_fields)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        conn = self._connection()
+        total = conn.execute(f"SELECT COUNT(*) FROM {source} {where}", params).fetchone()[0]
+        if sort_by:
+            order = f"{self._column(collection, sort_by)} {'DESC' if descending else 'ASC'}, "
+        else:
+            order = "selected.key, " if ids is not None else ""
+        rows = conn.execute(
+            f"SELECT {collection}.data FROM {source} {where} ORDER BY {order}{collection}.rowid LIMIT ? OFFSET ?",
+            params + [-1 if limit is None else limit, offset]
+        )
+        return to_records(collection, (json.loads(row[0]) for row in rows)), total
+
+    # Ekspresi kolom SQL untuk sebuah field: kolom terindeks atau json_extract dari data
+    def _column(self, collection, field):
+        if not field.isidentifier():
+            raise ValueError(f"Nama field tidak valid: {field}")
+        if field == "id" or field in self.INDEXED_COLUMNS[collection]:
+            return f"{collection}.{field}"
+        return f"json_extract({collection}.data, '$.{field}')"
+
+    def _apply_ops(self, conn, collection, ops):
+        record_cls = record_type(collection)
+        columns = self.INDEXED_COLUMNS[collection]
+        all_columns = ("id",) + columns + ("data",)
+        placeholders = ", ".join("?" for _ in all_columns)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in all_columns[1:])
+        upsert_sql = (
+            f"INSERT INTO {collection} ({', '.join(all_columns)}) VALUES ({placeholders}) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}"
+        )
+        changes = []
+        for op in ops:
+            kind = op["op"]
+            record_id = op["record"]["id"] if kind == "insert" else op.get("id")
+            row = conn.execute(
+                f"SELECT data FROM {collection} WHERE id = ?", (record_id,)
+            ).fetchone()
+            before = record_cls(json.loads(row[0])) if row is not None else None
+            if kind == "insert":
+                after = record_cls(op["record"])
+                conn.execute(upsert_sql, self._row_values(collection, after))
+                changes.append((before, after))
+            elif kind == "update":
+                if before is not None:
+                    after = record_cls({**before, **op["fields"]})
+                    conn.execute(upsert_sql, self._row_values(collection, after))
+                    changes.append((before, after))
+            elif kind == "delete":
+                if before is not None:
+                    conn.execute(f"DELETE FROM {collection} WHERE id = ?", (record_id,))
+                    changes.append((before, None))
+            else:
+                raise ValueError(f"Jenis mutasi tidak dikenal: {kind}")
+        conn.execute(
+            "UPDATE data_versions SET version = version + 1 WHERE collection = ?",
+            (collection,)
+        )
+        return changes
+
+    def apply(self, collection, ops):
+        if ops:
+            self.apply_many({collection: ops})
+
+    # Semua koleksi ditulis dalam satu transaksi SQLite, tanpa file intent
+    def apply_many(self, changes):
+        changes = {collection: ops for collection, ops in changes.items() if ops}
+        old_versions = {collection: self.version(collection) for collection in changes}
+        applied = {}
+        conn = self._connection()
+        with conn:
+            for collection, ops in changes.items():
+                applied[collection] = self._apply_ops(conn, collection, ops)
+        for collection, collection_changes in applied.items():
+            self._notify(collection, collection_changes, old_versions[collection], self.version(collection))
+
+
+# Fungsi untuk memindahkan data dari file YAML ke database SQLite (sekali jalan)
+def migrate_yaml_to_sqlite(data_dir=DEFAULT_DATA_DIR, db_file="marketing_tracker.db"):
+    """
+    Menyalin seluruh aktivitas dan follow-up dari file YAML di data_dir ke
+    database SQLite. Aman dijalankan ulang karena insert bersifat upsert.
+    """
+    source = YamlStorage(data_dir)
+    target = SqliteStorage(data_dir, db_file)
+    counts = {}
+    for collection in COLLECTIONS:
+        records = source.load(collection)
+        target.apply(collection, [insert_op(record) for record in records])
+        counts[collection] = len(records)
+    return True, f"Migrasi selesai: {counts['activities']} aktivitas, {counts['followups']} follow-up", counts
+
+
+# Partisi untuk record tanpa created_at yang valid
+UNDATED_PARTITION = "undated"
+
+# Fungsi untuk mendapatkan nama partisi (bulan created_at, format YYYY-MM) sebuah record
+def partition_name(record):
+    value = str(record.get("created_at") or "")
+    if len(value) >= 7 and value[:4].isdigit() and value[4] == "-" and value[5:7].isdigit():
+        return value[:7]
+    return UNDATED_PARTITION
+
+
+class PartitionedStorage(Storage):
+    """
+    Backend terpartisi waktu: setiap koleksi dipecah menjadi satu file YAML
+    per bulan created_at di <data_dir>/<directory>/<koleksi>/<YYYY-MM>.yaml.
+    Penulisan hanya menulis ulang partisi yang disentuh, dan file lokasi
+    append-only (id -> partisi) membuat get(), update dan delete cukup
+    membuka satu partisi.
+
+    manifest.json per koleksi menyimpan, untuk setiap partisi, jumlah record,
+    rentang min/maks field tanggal (ZONE_FIELDS) dan jumlah record per nilai
+    COUNTED_FIELDS (misalnya per marketer). query() memakainya untuk
+    melewati partisi yang pasti tidak cocok, dan untuk "N terbaru" hanya
+    membuka partisi dari bulan terbaru sampai halaman terisi.
+
+    Urutan tulis saat record pindah partisi: partisi tujuan, file lokasi,
+    lalu partisi asal, dan manifest paling akhir. Record hanya dibaca dari
+    partisi yang tercatat di file lokasi, sehingga salinan lama yang
+    tertinggal karena crash tidak pernah terlihat.
+    """
+
+    # Field tanggal yang rentang min/maks-nya dicatat per partisi
+    ZONE_FIELDS = {
+        "activities": ("created_at", "activity_date", "updated_at"),
+        "followups": ("created_at", "followup_date", "next_followup_date"),
+    }
+    # Field yang jumlah record per nilainya dicatat per partisi
+    COUNTED_FIELDS = {
+        "activities": ("marketer_username", "status"),
+        "followups": ("marketer_username",),
+    }
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR, directory="partitions"):
+        super().__init__(data_dir)
+        self.directory = directory
+        self._lock = threading.RLock()
+        self._states = {}
+        self._versions = {}
+
+    def collection_dir(self, collection):
+        return os.path.join(self.data_dir, self.directory, collection)
+
+    def partition_path(self, collection, name):
+        return os.path.join(self.collection_dir(collection), f"{name}.yaml")
+
+    def manifest_path(self, collection):
+        return os.path.join(self.collection_dir(collection), "manifest.json")
+
+    def locations_path(self, collection):
+        return os.path.join(self.collection_dir(collection), "locations.log")
+
+    # Manifest ditulis paling akhir pada setiap penulisan, sehingga cukup sebagai token
+    def source_token(self, collection):
+        return [file_signature(self.manifest_path(collection))]
+
+    # Seluruh isi direktori koleksi (partisi, locations.log dan manifest.json);
+    # manifest diurutkan paling akhir agar saat restore juga ditulis paling akhir
+    def backup_files(self):
+        names = []
+        for collection in COLLECTIONS:
+            directory = self.collection_dir(collection)
+            if not os.path.isdir(directory):
+                continue
+            filenames = sorted(
+                filename for filename in os.listdir(directory)
+                if filename.endswith(".yaml") or filename in ("locations.log", "manifest.json")
+            )
+            filenames.sort(key=lambda filename: filename == "manifest.json")
+            names += [f"{self.directory}/{collection}/{filename}" for filename in filenames]
+        return names
+
+    def restore_backup_files(self, contents):
+        ordered = sorted(contents, key=lambda name: name.endswith("/manifest.json"))
+        with self._lock:
+            super().restore_backup_files({name: contents[name] for name in ordered})
+
+    # Mendapatkan state koleksi di memori, disegarkan jika proses lain menulis
+    def _state(self, collection):
+        state = self._states.get(collection)
+        manifest_path = self.manifest_path(collection)
+        signature = file_signature(manifest_path)
+        if state is not None and state["manifest"] == signature:
+            return state
+        manifest = {}
+        if signature is not None:
+            with open(manifest_path, 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+        if state is None:
+            state = {"partitions": {}, "locations": {}, "log": None, "offset": 0, "entries": 0}
+        else:
+            # Partisi yang ditulis proses lain dimuat ulang saat dibutuhkan
+            state["partitions"] = {
+                name: partition for name, partition in state["partitions"].items()
+                if partition["signature"] == file_signature(self.partition_path(collection, name))
+            }
+        state.update(manifest=signature, stats=manifest.get("partitions", {}), records=None)
+        self._read_locations(collection, state)
+        self._states[collection] = state
+        self._bump_version(collection)
+        return state
+
+    # Membaca baris file lokasi setelah offset terakhir ("id<TAB>partisi",
+    # partisi kosong berarti record dihapus); dibaca ulang dari awal jika
+    # file dipadatkan (inode berganti) atau menyusut
+    def _read_locations(self, collection, state):
+        path = self.locations_path(collection)
+        signature = file_signature(path)
+        previous = state["log"]
+        if signature is None or previous is None or signature[0] != previous[0] or signature[3] < state["offset"]:
+            state.update(locations={}, offset=0, entries=0)
+        if signature is None:
+            state["log"] = None
+            return
+        locations = state["locations"]
+        with open(path, 'rb') as file:
+            file.seek(state["offset"])
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                record_id, _, name = line.decode("utf-8").rstrip("\n").partition("\t")
+                if name:
+                    locations[record_id] = name
+                else:
+                    locations.pop(record_id, None)
+                state["offset"] += len(line)
+                state["entries"] += 1
+        state["log"] = file_signature(path)
+
+    # Memuat satu partisi (sekali per proses sampai file-nya berubah)
+    def _partition(self, collection, state, name):
+        partition = state["partitions"].get(name)
+        if partition is None:
+            path = self.partition_path(collection, name)
+            records = to_records(collection, iter_yaml_records(path, self.root_key(collection)))
+            partition = {"signature": file_signature(path), "index": {record["id"]: record for record in records}}
+            state["partitions"][name] = partition
+        return partition
+
+    # Nama partisi terurut kronologis; partisi tanpa tanggal paling awal
+    def _ordered_names(self, state):
+        return sorted(state["stats"], key=lambda name: (name != UNDATED_PARTITION, name))
+
+    # Record milik partisi yang tercatat di file lokasi
+    def _partition_records(self, collection, state, name):
+        locations = state["locations"]
+        return [
+            record for record_id, record in self._partition(collection, state, name)["index"].items()
+            if locations.get(record_id) == name
+        ]
+
+    def load(self, collection):
+        with self._lock:
+            state = self._state(collection)
+            if state["records"] is None:
+                state["records"] = [
+                    record for name in self._ordered_names(state)
+                    for record in self._partition_records(collection, state, name)
+                ]
+            return state["records"]
+
+    def get(self, collection, record_id):
+        with self._lock:
+            state = self._state(collection)
+            name = state["locations"].get(record_id)
+            if name is None:
+                return None
+            return self._partition(collection, state, name)["index"].get(record_id)
+
+    def _bump_version(self, collection):
+        self._versions[collection] = self._versions.get(collection, 0) + 1
+
+    def version(self, collection):
+        with self._lock:
+            self._state(collection)
+            return self._versions[collection]
+
+    # Mengecek apakah partisi mungkin berisi record yang cocok dengan filter dan rentang
+    def _may_match(self, collection, stats, filters, ranges):
+        for field, value in filters.items():
+            if field in self.COUNTED_FIELDS.get(collection, ()) and not stats["counts"][field].get(str(value)):
+                return False
+        for field, (start, end) in ranges.items():
+            bounds = stats["ranges"].get(field) if field in self.ZONE_FIELDS.get(collection, ()) else ()
+            if bounds is None:
+                # Tidak ada record di partisi ini yang punya nilai field tersebut
+                return False
+            if bounds and ((end is not None and bounds[0] >= end) or (start is not None and bounds[1] < start)):
+                return False
+        return True
+
+    def query(self, collection, filters=None, ranges=None, search=None, search_fields=(),
+              sort_by=None, descending=False, offset=0, limit=None, ids=None):
+        filters, ranges = _normalize_query(filters, ranges)
+        counted = self.COUNTED_FIELDS.get(collection, ())
+        with self._lock:
+            state = self._state(collection)
+            names = [
+                name for name in self._ordered_names(state)
+                if self._may_match(collection, state["stats"][name], filters, ranges)
+            ]
+            # "N terbaru/terlama": partisi dibuka berurutan sampai halaman terisi,
+            # jumlah total diambil dari hitungan di manifest
+            if (sort_by == "created_at" and limit is not None and ids is None and not search
+                    and not ranges and len(filters) <= 1 and set(filters) <= set(counted)):
+                total = 0
+                for name in names:
+                    stats = state["stats"][name]
+                    total += sum(stats["counts"][field].get(str(value), 0) for field, value in filters.items()) \
+                        if filters else stats["count"]
+                # Record tanpa tanggal valid bisa berada di posisi mana pun, jadi selalu ikut
+                records = []
+                if UNDATED_PARTITION in names:
+                    records = self._partition_records(collection, state, UNDATED_PARTITION)
+                dated = [name for name in names if name != UNDATED_PARTITION]
+                found = 0
+                for name in (reversed(dated) if descending else dated):
+                    matches = [
+                        record for record in self._partition_records(collection, state, name)
+                        if all(record.get(field) == value for field, value in filters.items())
+                    ]
+                    records.extend(matches)
+                    found += len(matches)
+                    if found >= offset + limit:
+                        break
+                page, _ = _select_page(records, filters, ranges, None, (), sort_by, descending, offset, limit, None)
+                return page, total
+            records = [record for name in names for record in self._partition_records(collection, state, name)]
+        return _select_page(records, filters, ranges, search, search_fields, sort_by, descending, offset, limit, ids)
+
+    # Ringkasan partisi untuk manifest: jumlah, rentang field tanggal, jumlah per nilai
+    def _partition_stats(self, collection, records):
+        ranges = {}
+        for field in self.ZONE_FIELDS.get(collection, ()):
+            values = [str(record.get(field)) for record in records if record.get(field) not in (None, "")]
+            ranges[field] = [min(values), max(values)] if values else None
+        counts = {}
+        for field in self.COUNTED_FIELDS.get(collection, ()):
+            field_counts = counts[field] = {}
+            for record in records:
+                key = str(record.get(field))
+                field_counts[key] = field_counts.get(key, 0) + 1
+        return {"count": len(records), "ranges": ranges, "counts": counts}
+
+    def _write_partition(self, collection, state, name):
+        path = self.partition_path(collection, name)
+        partition = state["partitions"][name]
+        write_yaml_records(path, self.root_key(collection), list(partition["index"].values()))
+        partition["signature"] = file_signature(path)
+
+    def apply(self, collection, ops):
+        if not ops:
+            return
+        record_cls = record_type(collection)
+        with data_lock(collection, data_dir=self.data_dir), self._lock:
+            state = self._state(collection)
+            locations = state["locations"]
+            changes = []
+            touched = set()
+            moved = []
+            lines = []
+            for op in ops:
+                kind = op["op"]
+                record_id = op["record"]["id"] if kind == "insert" else op["id"]
+                current = locations.get(record_id)
+                before = self._partition(collection, state, current)["index"].get(record_id) if current else None
+                if kind == "insert":
+                    after = record_cls(op["record"])
+                elif kind == "update":
+                    if before is None:
+                        continue
+                    after = record_cls({**before, **op["fields"]})
+                elif kind == "delete":
+                    if before is None:
+                        continue
+                    after = None
+                else:
+                    raise ValueError(f"Jenis mutasi tidak dikenal: {kind}")
+                name = partition_name(after) if after is not None else None
+                if after is not None:
+                    self._partition(collection, state, name)["index"][record_id] = after
+                    touched.add(name)
+                if current and current != name:
+                    if after is None:
+                        del state["partitions"][current]["index"][record_id]
+                        touched.add(current)
+                    else:
+                        # Salinan lama dihapus setelah lokasi baru tercatat
+                        moved.append((current, record_id))
+                if current != name:
+                    lines.append(f"{record_id}\t{name or ''}\n")
+                    if name:
+                        locations[record_id] = name
+                    else:
+                        locations.pop(record_id, None)
+                changes.append((before, after))
+            if not changes:
+                return
+
+            os.makedirs(self.collection_dir(collection), exist_ok=True)
+            for name in touched:
+                self._write_partition(collection, state, name)
+            if lines:
+                self._append_locations(collection, state, lines)
+            for name, record_id in moved:
+                if locations.get(record_id) != name:
+                    state["partitions"][name]["index"].pop(record_id, None)
+            for name in {name for name, _ in moved}:
+                self._write_partition(collection, state, name)
+                touched.add(name)
+
+            for name in touched:
+                index = state["partitions"][name]["index"]
+                if index:
+                    state["stats"][name] = self._partition_stats(collection, list(index.values()))
+                else:
+                    state["stats"].pop(name, None)
+                    del state["partitions"][name]
+                    os.remove(self.partition_path(collection, name))
+            manifest_path = self.manifest_path(collection)
+            with atomic_write(manifest_path) as file:
+                json.dump({"partitions": state["stats"]}, file, ensure_ascii=False)
+            state["manifest"] = file_signature(manifest_path)
+
+            state["records"] = None
+            old_version = self._versions[collection]
+            self._bump_version(collection)
+            self._notify(collection, changes, old_version, self._versions[collection])
+
+    # Menambahkan baris ke file lokasi; dipadatkan jika sebagian besar barisnya usang
+    def _append_locations(self, collection, state, lines):
+        path = self.locations_path(collection)
+        locations = state["locations"]
+        if state["entries"] + len(lines) > 2 * len(locations) + 1000:
+            with atomic_write(path) as file:
+                file.write("".join(f"{record_id}\t{name}\n" for record_id, name in locations.items()))
+            state["entries"] = len(locations)
+        else:
+            payload = "".join(lines).encode("utf-8")
+            with open(path, 'ab') as file:
+                # Buang sisa tulisan terpotong sebelum menambahkan baris baru
+                if file.tell() != state["offset"]:
+                    file.truncate(state["offset"])
+                file.write(payload)
+                file.flush()
+                os.fsync(file.fileno())
+            state["entries"] += len(lines)
+        state["log"] = file_signature(path)
+        state["offset"] = state["log"][3]
+
+
+# Fungsi untuk memindahkan data dari file YAML ke partisi bulanan (sekali jalan)
+def migrate_yaml_to_partitions(data_dir=DEFAULT_DATA_DIR, directory="partitions"):
+    """
+    Menyalin seluruh aktivitas dan follow-up dari file YAML di data_dir ke
+    partisi per bulan created_at. Aman dijalankan ulang karena insert
+    bersifat upsert.
+    """
+    source = YamlStorage(data_dir)
+    target = PartitionedStorage(data_dir, directory)
+    counts = {}
+    for collection in COLLECTIONS:
+        records = source.load(collection)
+        target.apply(collection, [insert_op(record) for record in records])
+        counts[collection] = len(records)
+    return True, f"Migrasi selesai: {counts['activities']} aktivitas, {counts['followups']} follow-up", counts
+
+
+class Transaction:
+    """
+    Unit of work: mutasi untuk beberapa koleksi dikumpulkan lalu ditulis
+    bersama saat commit(), satu kali tulis per koleksi. Pembacaan lewat
+    get() sudah memperhitungkan mutasi yang belum di-commit.
+
+    Record di VERSIONED_COLLECTIONS mendapat field "version" yang naik satu
+    setiap transaksi yang mengubahnya (record baru mulai dari 1). Nilainya
+    ditulis eksplisit di mutasi, sehingga pemutaran ulang journal tetap idempoten.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.changes = {}
+        self._record_versions = {}
+
+    def _stage(self, collection, op):
+        self.changes.setdefault(collection, []).append(op)
+
+    # Nomor versi record setelah transaksi ini (sekali naik per transaksi)
+    def _next_version(self, collection, record_id, current=None):
+        key = (collection, record_id)
+        version = self._record_versions.get(key)
+        if version is None:
+            version = ((current or {}).get("version") or 0) + 1
+            self._record_versions[key] = version
+        return version
+
+    def insert(self, collection, record):
+        if collection in VERSIONED_COLLECTIONS:
+            record = {**record, "version": self._next_version(collection, record["id"])}
+        self._stage(collection, insert_op(record))
+
+    def update(self, collection, record_id, fields):
+        if collection in VERSIONED_COLLECTIONS:
+            current = None
+            if (collection, record_id) not in self._record_versions:
+                current = self.storage.get(collection, record_id)
+            fields = {**fields, "version": self._next_version(collection, record_id, current)}
+        self._stage(collection, update_op(record_id, fields))
+
+    def delete(self, collection, record_id):
+        self._stage(collection, delete_op(record_id))
+
+    def get(self, collection, record_id):
+        record = self.storage.get(collection, record_id)
+        staged = [op for op in self.changes.get(collection, [])
+                  if op.get("id", op.get("record", {}).get("id")) == record_id]
+        if not staged:
+            return record
+        index = {record_id: record} if record is not None else {}
+        apply_ops_to_index(index, staged, record_type(collection))
+        return index.get(record_id)
+
+    def find(self, collection, field, value):
+        return self.storage.find(collection, field, value)
+
+    def load(self, collection):
+        return self.storage.load(collection)
+
+    def commit(self):
+        self.storage.apply_many(self.changes)
+        self.changes = {}
+        self._record_versions = {}
+
+    def rollback(self):
+        self.changes = {}
+        self._record_versions = {}
+
+
+# Context manager untuk menjalankan unit of work pada backend aktif
+@contextmanager
+def transaction(storage=None):
+    """
+    Contoh:
+        with transaction() as txn:
+            txn.insert("followups", followup)
+            txn.update("activities", activity_id, {"status": status})
+    Seluruh koleksi dikunci selama blok berjalan. Commit dilakukan saat blok
+    selesai normal (termasuk lewat return); jika terjadi exception semua
+    mutasi dibuang.
+    """
+    storage = storage or get_storage()
+    with data_lock(*COLLECTIONS, data_dir=storage.data_dir):
+        storage.recover_pending_transactions()
+        txn = Transaction(storage)
+        try:
+            yield txn
+        except BaseException:
+            txn.rollback()
+            raise
+        txn.commit()
+
+
+# Backend yang tersedia, dipilih lewat storage_settings.backend di config.yaml
+STORAGE_BACKENDS = {
+    "yaml": YamlStorage,
+    "journal": JournalStorage,
+    "sqlite": SqliteStorage,
+    "partitioned": PartitionedStorage,
+}
+
+# Fungsi untuk mendapatkan nama backend (key STORAGE_BACKENDS) dari instance penyimpanan
+# (subkelas backend terdaftar memakai nama backend induknya)
+def backend_name(storage):
+    names = {backend: name for name, backend in STORAGE_BACKENDS.items()}
+    name = next((names[cls] for cls in type(storage).__mro__ if cls in names), None)
+    if name is None:
+        raise ValueError(f"{type(storage).__name__} bukan backend penyimpanan yang terdaftar")
+    return name
+
+_storage = None
+_storage_lock = threading.Lock()
+
+# Fungsi untuk membuat backend penyimpanan dari pengaturan
+def create_storage(settings=None, data_dir=DEFAULT_DATA_DIR):
+    """
+    settings berasal dari storage_settings di config.yaml, misalnya
+    {"backend": "journal", "journal": {"compact_threshold": 1000}}.
+    Opsi khusus backend dibaca dari key dengan nama backend tersebut.
+    """
+    settings = settings or {}
+    backend = settings.get("backend", "yaml")
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Backend penyimpanan tidak dikenal: {backend}")
+    options = settings.get(backend) or {}
+    return STORAGE_BACKENDS[backend](data_dir, **options)
+
+# Fungsi untuk membaca storage_settings dari config.yaml
+def read_storage_settings(data_dir=DEFAULT_DATA_DIR):
+    config = read_yaml_file(os.path.join(data_dir, "config.yaml"))
+    if not config:
+        return {}
+    return config.get("storage_settings") or {}
+
+# Fungsi untuk mendapatkan backend penyimpanan yang dipakai proses ini
+def get_storage():
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            _storage = create_storage(read_storage_settings())
+            with data_lock(*COLLECTIONS, data_dir=_storage.data_dir):
+                _storage.recover_pending_transactions()
+        return _storage
+
+# Fungsi untuk mengganti backend penyimpanan (dipakai saat pengujian)
+def set_storage(storage):
+    global _storage
+    with _storage_lock:
+        _storage = storage
+
+
+if __name__ == "__main__":
+    import sys
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "migrate-sqlite":
+        success, message, _ = migrate_yaml_to_sqlite()
+        print(message)
+        print("Ubah storage_settings.backend menjadi 'sqlite' di data/config.yaml untuk memakainya.")
+    elif len(sys.argv) > 1 and sys.argv[1] == "migrate-partitions":
+        success, message, _ = migrate_yaml_to_partitions()
+        print(message)
+        print("Ubah storage_settings.backend menjadi 'partitioned' di data/config.yaml untuk memakainya.")
+    else:
+        print("Penggunaan: python storage.py [migrate-sqlite | migrate-partitions]")
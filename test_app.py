@@ -204,6 +204,1569 @@ def test_data_backup_restore():
     print("Semua test backup dan restore data berhasil!")
     return True
 
+def test_incremental_backup():
+    """
+    Menguji backup inkremental berbasis hash isi, retensi dan garbage collection
+    """
+    print("Menguji backup inkremental...")
+    
+    import json
+    import tempfile
+    from data_utils import (
+        backup_data, restore_data, list_backups, prune_backups, split_chunks, BACKUP_OBJECTS_DIR
+    )
+    from storage import SqliteStorage, PartitionedStorage, insert_op, delete_op
+    from utils_with_edit_delete import write_yaml
+    
+    previous_dir = os.getcwd()
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            os.chdir(work_dir)
+            os.makedirs("data")
+            lines = [f"- id: '{i}'\n  prospect_name: Prospek {i}\n".encode() for i in range(3000)]
+            with open(os.path.join("data", "marketing_activities.yaml"), "wb") as file:
+                file.write(b"".join(lines))
+            with open(os.path.join("data", "users.yaml"), "wb") as file:
+                file.write(b"- username: admin\n")
+            objects_dir = os.path.join("backup", BACKUP_OBJECTS_DIR)
+            settings = {"keep_last": 2, "keep_hourly": 0, "keep_daily": 0}
+            
+            # Test case 1: Backup pertama menyimpan seluruh chunk sekali
+            print("Test case 1: Backup pertama")
+            first = backup_data(settings=settings)
+            assert os.listdir(first) == ["manifest.json"], "Backup tidak berupa manifest"
+            first_objects = set(os.listdir(objects_dir))
+            assert len(split_chunks(b"".join(lines))) > 1, "File tidak dipecah menjadi beberapa chunk"
+            print("✓ Backup pertama berhasil")
+            
+            # Test case 2: Backup tanpa perubahan tidak menambah chunk
+            print("Test case 2: Backup tanpa perubahan")
+            backup_data(settings=settings)
+            assert set(os.listdir(objects_dir)) == first_objects, "Chunk ditulis ulang meskipun data tidak berubah"
+            print("✓ Backup tanpa perubahan berhasil")
+            
+            # Test case 3: Mengubah satu record hanya menambah sedikit chunk
+            print("Test case 3: Backup setelah satu record berubah")
+            lines[1500] = b"- id: '1500'\n  prospect_name: Prospek Diubah\n"
+            with open(os.path.join("data", "marketing_activities.yaml"), "wb") as file:
+                file.write(b"".join(lines))
+            third = backup_data(settings=settings)
+            new_objects = set(os.listdir(objects_dir)) - first_objects
+            assert 0 < len(new_objects) <= 2, f"Terlalu banyak chunk baru: {len(new_objects)}"
+            print("✓ Backup setelah perubahan berhasil")
+            
+            # Test case 4: Retensi menghapus backup lama dan chunk yang tidak terpakai
+            print("Test case 4: Retensi dan garbage collection")
+            backups = list_backups()
+            assert [backup["path"] for backup in backups][0] == third, "Backup terbaru tidak di urutan pertama"
+            assert len(backups) == 2 and first not in [backup["path"] for backup in backups], "Retensi tidak dijalankan"
+            removed, _ = prune_backups(settings={"keep_last": 1, "keep_hourly": 0, "keep_daily": 0})
+            with open(os.path.join(third, "manifest.json")) as file:
+                referenced = {digest for entry in json.load(file)["files"].values() for digest in entry["chunks"]}
+            assert len(removed) == 1, "Backup lama tidak dihapus"
+            assert set(os.listdir(objects_dir)) == referenced, "Chunk yang tidak terpakai tidak dihapus"
+            print("✓ Retensi dan garbage collection berhasil")
+            
+            # Test case 5: Restore menyusun ulang file dari chunk
+            print("Test case 5: Restore dari backup inkremental")
+            os.remove(os.path.join("data", "users.yaml"))
+            with open(os.path.join("data", "marketing_activities.yaml"), "wb") as file:
+                file.write(b"[]\n")
+            success, message = restore_data(third)
+            assert success, message
+            with open(os.path.join("data", "marketing_activities.yaml"), "rb") as file:
+                assert file.read() == b"".join(lines), "Isi file hasil restore tidak sama"
+            assert os.path.exists(os.path.join("data", "users.yaml")), "File yang dihapus tidak dipulihkan"
+            print("✓ Restore dari backup inkremental berhasil")
+
+            # Test case 6: Backend SQLite ikut di-backup dan backup backend lain ditolak
+            print("Test case 6: Backup dan restore backend SQLite")
+            write_yaml(os.path.join("data", "config.yaml"), {"storage_settings": {"backend": "sqlite"}})
+            success, message = restore_data(third)
+            assert not success and "sqlite" in message, "Backup YAML dipulihkan ke backend SQLite"
+            storage = SqliteStorage("data")
+            storage.apply("activities", [insert_op({"id": "act-1", "status": "baru"})])
+            sqlite_backup = backup_data(settings=settings)
+            with open(os.path.join(sqlite_backup, "manifest.json")) as file:
+                manifest = json.load(file)
+            assert manifest["backend"] == "sqlite", "Backend tidak dicatat di manifest"
+            assert manifest["backend_files"] == ["marketing_tracker.db"], "Database SQLite tidak di-backup"
+            storage.apply("activities", [delete_op("act-1")])
+            assert storage.get("activities", "act-1") is None
+            success, message = restore_data(sqlite_backup)
+            assert success, message
+            assert storage.get("activities", "act-1")["status"] == "baru", "Isi database tidak dipulihkan"
+            print("✓ Backup dan restore backend SQLite berhasil")
+
+            # Test case 7: Direktori partisi ikut di-backup dan dipulihkan
+            print("Test case 7: Backup dan restore backend terpartisi")
+            write_yaml(os.path.join("data", "config.yaml"), {"storage_settings": {"backend": "partitioned"}})
+            storage = PartitionedStorage("data")
+            storage.apply("activities", [
+                insert_op({"id": "act-1", "status": "baru", "created_at": "2024-01-05 10:00:00"}),
+                insert_op({"id": "act-2", "status": "baru", "created_at": "2024-02-05 10:00:00"}),
+            ])
+            partitioned_backup = backup_data(settings=settings)
+            with open(os.path.join(partitioned_backup, "manifest.json")) as file:
+                backend_files = json.load(file)["backend_files"]
+            assert backend_files == [
+                "partitions/activities/2024-01.yaml", "partitions/activities/2024-02.yaml",
+                "partitions/activities/locations.log", "partitions/activities/manifest.json",
+            ], f"File partisi yang di-backup tidak sesuai: {backend_files}"
+            storage.apply("activities", [
+                delete_op("act-1"),
+                insert_op({"id": "act-3", "status": "baru", "created_at": "2024-03-05 10:00:00"}),
+            ])
+            success, message = restore_data(partitioned_backup)
+            assert success, message
+            assert sorted(record["id"] for record in storage.load("activities")) == ["act-1", "act-2"], \
+                "Isi partisi tidak dipulihkan"
+            assert not os.path.exists(storage.partition_path("activities", "2024-03")), \
+                "Partisi yang tidak ada di backup tidak dihapus"
+            print("✓ Backup dan restore backend terpartisi berhasil")
+    finally:
+        os.chdir(previous_dir)
+    
+    print("Semua test backup inkremental berhasil!")
+    return True
+
+def test_journal_storage():
+    """
+    Menguji backend penyimpanan journal (append-only)
+    """
+    print("Menguji backend penyimpanan journal...")
+    
+    import tempfile
+    from storage import JournalStorage, insert_op, update_op, delete_op
+    
+    with tempfile.TemporaryDirectory() as data_dir:
+        storage = JournalStorage(data_dir, compact_threshold=1000)
+        
+        # Test case 1: Mutasi ditambahkan ke journal tanpa menulis snapshot
+        print("Test case 1: Mutasi ditambahkan ke journal")
+        storage.apply("activities", [
+            insert_op({"id": "act-1", "marketer_username": "m1", "status": "baru"}),
+            insert_op({"id": "act-2", "marketer_username": "m2", "status": "baru"}),
+        ])
+        storage.apply("activities", [update_op("act-1", {"status": "berhasil"}), delete_op("act-2")])
+        assert os.path.exists(storage.journal_path("activities")), "File journal tidak dibuat"
+        assert not os.path.exists(storage.file_path("activities")), "Snapshot seharusnya belum ditulis"
+        print("✓ Mutasi tersimpan di journal")
+        
+        # Test case 2: Journal diputar ulang oleh instance baru
+        print("Test case 2: Journal diputar ulang saat startup")
+        replayed = JournalStorage(data_dir)
+        activities = replayed.load("activities")
+        assert [a["id"] for a in activities] == ["act-1"], "Hasil replay journal tidak sesuai"
+        assert replayed.get("activities", "act-1")["status"] == "berhasil", "Update tidak diputar ulang"
+        print("✓ Replay journal berhasil")
+        
+        # Test case 3: Pemadatan menulis snapshot dan mengosongkan journal
+        print("Test case 3: Pemadatan journal menjadi snapshot")
+        assert storage.compact("activities"), "Pemadatan gagal"
+        assert os.path.getsize(storage.journal_path("activities")) == 0, "Journal tidak dikosongkan"
+        assert JournalStorage(data_dir).get("activities", "act-1")["status"] == "berhasil", "Snapshot tidak sesuai"
+        print("✓ Pemadatan journal berhasil")
+        
+        # Test case 4: Tulisan terpotong di akhir journal diabaikan
+        print("Test case 4: Tulisan terpotong diabaikan")
+        with open(storage.journal_path("activities"), "ab") as file:
+            file.write(b'{"op": "delete", "id": "act-1"')
+        assert JournalStorage(data_dir).get("activities", "act-1") is not None, "Baris terpotong ikut diterapkan"
+        print("✓ Tulisan terpotong diabaikan")
+    
+    print("Semua test backend journal berhasil!")
+    return True
+
+def test_sqlite_storage():
+    """
+    Menguji backend penyimpanan SQLite dan migrasi dari YAML
+    """
+    print("Menguji backend penyimpanan SQLite...")
+    
+    import tempfile
+    from storage import YamlStorage, SqliteStorage, migrate_yaml_to_sqlite, backend_name, insert_op, update_op
+    from archive import ArchiveStore
+    
+    with tempfile.TemporaryDirectory() as data_dir:
+        # Test case 1: Migrasi data YAML ke SQLite
+        print("Test case 1: Migrasi data YAML ke SQLite")
+        YamlStorage(data_dir).apply("activities", [
+            insert_op({"id": "act-1", "marketer_username": "m1", "status": "baru"}),
+            insert_op({"id": "act-2", "marketer_username": "m2", "status": "baru"}),
+        ])
+        YamlStorage(data_dir).apply("followups", [
+            insert_op({"id": "fu-1", "activity_id": "act-1", "marketer_username": "m1", "interest_level": 4}),
+        ])
+        success, message, counts = migrate_yaml_to_sqlite(data_dir)
+        assert success, f"Migrasi gagal: {message}"
+        assert counts == {"activities": 2, "followups": 1}, "Jumlah data migrasi tidak sesuai"
+        print("✓ Migrasi data berhasil")
+        
+        # Test case 2: Pencarian berindeks
+        print("Test case 2: Pencarian berindeks")
+        storage = SqliteStorage(data_dir)
+        assert [a["id"] for a in storage.find("activities", "marketer_username", "m2")] == ["act-2"], "Pencarian username tidak sesuai"
+        followups = storage.find("followups", "activity_id", "act-1")
+        assert followups[0]["interest_level"] == 4, "Tipe data follow-up berubah"
+        print("✓ Pencarian berindeks berhasil")
+        
+        # Test case 3: Update memperbarui kolom terindeks
+        print("Test case 3: Update memperbarui kolom terindeks")
+        storage.apply("activities", [update_op("act-1", {"status": "berhasil"})])
+        assert [a["id"] for a in storage.find("activities", "status", "berhasil")] == ["act-1"], "Kolom status tidak diperbarui"
+        assert [a["id"] for a in storage.load("activities")] == ["act-1", "act-2"], "Urutan data berubah"
+        print("✓ Update kolom terindeks berhasil")
+        
+        # Test case 4: Nama backend dari instance (termasuk subkelas)
+        print("Test case 4: Nama backend")
+        assert backend_name(storage) == "sqlite", "Nama backend tidak sesuai"
+        assert backend_name(type("TestSqlite", (SqliteStorage,), {})(data_dir)) == "sqlite", "Subkelas backend tidak dikenali"
+        try:
+            backend_name(ArchiveStore(data_dir))
+            assert False, "Penyimpanan yang tidak terdaftar diterima"
+        except ValueError:
+            pass
+        print("✓ Nama backend berhasil")
+    
+    print("Semua test backend SQLite berhasil!")
+    return True
+
+def test_partitioned_storage():
+    """
+    Menguji backend penyimpanan terpartisi per bulan dan pemangkasan partisi
+    """
+    print("Menguji backend penyimpanan terpartisi...")
+    
+    import tempfile
+    from storage import YamlStorage, PartitionedStorage, migrate_yaml_to_partitions, insert_op, update_op, delete_op
+    
+    with tempfile.TemporaryDirectory() as data_dir:
+        # Test case 1: Migrasi membuat satu file per bulan created_at
+        print("Test case 1: Migrasi data YAML ke partisi bulanan")
+        YamlStorage(data_dir).apply("activities", [
+            insert_op({"id": f"act-{i}", "marketer_username": "m1" if i % 2 else "m2", "status": "baru",
+                       "created_at": f"2024-{i % 6 + 1:02d}-{i + 1:02d} 10:00:00"})
+            for i in range(12)
+        ])
+        YamlStorage(data_dir).apply("followups", [
+            insert_op({"id": "fu-1", "activity_id": "act-1", "marketer_username": "m1",
+                       "created_at": "2024-02-02 11:00:00", "next_followup_date": "2024-02-09 00:00:00"}),
+            insert_op({"id": "fu-2", "activity_id": "act-2", "marketer_username": "m2",
+                       "created_at": "2024-03-03 11:00:00", "next_followup_date": "2024-03-10 00:00:00"}),
+        ])
+        success, message, counts = migrate_yaml_to_partitions(data_dir)
+        assert success and counts == {"activities": 12, "followups": 2}, f"Migrasi gagal: {message}"
+        storage = PartitionedStorage(data_dir)
+        partition_dir = storage.collection_dir("activities")
+        assert sorted(name for name in os.listdir(partition_dir) if name.endswith(".yaml")) == [
+            f"2024-{month:02d}.yaml" for month in range(1, 7)
+        ], "File partisi tidak sesuai"
+        assert len(storage.load("activities")) == 12, "Jumlah data partisi tidak sesuai"
+        print("✓ Migrasi ke partisi berhasil")
+        
+        # Test case 2: Query terbaru hanya membuka partisi terbaru
+        print("Test case 2: Pemangkasan partisi pada query")
+        storage = PartitionedStorage(data_dir)
+        page, total = storage.query("activities", filters={"marketer_username": "m1"}, sort_by="created_at",
+                                    descending=True, limit=2)
+        assert [a["id"] for a in page] == ["act-11", "act-5"], "Urutan aktivitas terbaru tidak sesuai"
+        assert total == 6, "Jumlah total dari manifest tidak sesuai"
+        assert sorted(storage._states["activities"]["partitions"]) == ["2024-06"], "Partisi lama ikut dibuka"
+        page, total = storage.query("followups", ranges={"next_followup_date": ("2024-03-01", "2024-03-31")})
+        assert [f["id"] for f in page] == ["fu-2"] and total == 1, "Filter rentang tanggal tidak sesuai"
+        assert sorted(storage._states["followups"]["partitions"]) == ["2024-03"], "Zone map tidak dipakai"
+        print("✓ Pemangkasan partisi berhasil")
+        
+        # Test case 3: Update hanya menulis partisi yang berisi record
+        print("Test case 3: Penulisan hanya menyentuh partisi terkait")
+        untouched = os.stat(os.path.join(partition_dir, "2024-01.yaml")).st_mtime_ns
+        storage.apply("activities", [update_op("act-3", {"status": "berhasil"})])
+        assert os.stat(os.path.join(partition_dir, "2024-01.yaml")).st_mtime_ns == untouched, "Partisi lain ikut ditulis"
+        assert sorted(storage._states["activities"]["partitions"]) == ["2024-04", "2024-06"], "Partisi lain ikut dibuka"
+        print("✓ Penulisan per partisi berhasil")
+        
+        # Test case 4: Record yang pindah bulan dan dihapus terlihat oleh proses lain
+        print("Test case 4: Perpindahan partisi dan penghapusan")
+        storage.apply("activities", [
+            update_op("act-0", {"created_at": "2025-01-01 08:00:00"}),
+            delete_op("act-6"),
+        ])
+        other = PartitionedStorage(data_dir)
+        assert other.get("activities", "act-0")["created_at"] == "2025-01-01 08:00:00", "Record pindahan tidak ditemukan"
+        assert other.get("activities", "act-6") is None, "Record terhapus masih ada"
+        assert not os.path.exists(os.path.join(partition_dir, "2024-01.yaml")), "Partisi kosong tidak dihapus"
+        assert len(other.load("activities")) == 11, "Salinan lama record pindahan ikut terbaca"
+        other.apply("activities", [update_op("act-4", {"status": "gagal"})])
+        assert storage.get("activities", "act-4")["status"] == "gagal", "Perubahan proses lain tidak terlihat"
+        print("✓ Perpindahan partisi dan penghapusan berhasil")
+    
+    print("Semua test backend terpartisi berhasil!")
+    return True
+
+def test_yaml_cache():
+    """
+    Menguji cache YAML per proses dan invalidasinya
+    """
+    print("Menguji cache YAML...")
+    
+    import tempfile
+    from repository import read_cached_yaml, get_version
+    from utils_with_edit_delete import write_yaml
+    
+    with tempfile.TemporaryDirectory() as data_dir:
+        file_path = os.path.join(data_dir, "users.yaml")
+        write_yaml(file_path, {"users": [{"username": "a"}]})
+        
+        # Test case 1: Pembacaan berulang memakai objek yang sama
+        print("Test case 1: Pembacaan berulang memakai cache")
+        first = read_cached_yaml(file_path)
+        assert read_cached_yaml(file_path) is first, "Data seharusnya diambil dari cache"
+        print("✓ Cache dipakai untuk pembacaan berulang")
+        
+        # Test case 2: Perubahan file dari luar terdeteksi lewat tanda tangan file
+        print("Test case 2: Perubahan file dari luar terdeteksi")
+        version = get_version(file_path)
+        with open(file_path, "w") as file:
+            file.write("users:\n- username: b\n- username: c\n")
+        assert [u["username"] for u in read_cached_yaml(file_path)["users"]] == ["b", "c"], "Cache tidak diinvalidasi"
+        assert get_version(file_path) > version, "Versi cache tidak naik"
+        print("✓ Perubahan file terdeteksi")
+    
+    print("Semua test cache YAML berhasil!")
+    return True
+
+def test_yaml_streaming_io():
+    """
+    Menguji pembacaan dan penulisan YAML bertahap (streaming)
+    """
+    print("Menguji streaming YAML...")
+    
+    import tempfile
+    from yaml_io import (dump_yaml, read_yaml_file, iter_yaml_records,
+                         write_yaml_records, generate_synthetic_activities)
+    
+    with tempfile.TemporaryDirectory() as data_dir:
+        file_path = os.path.join(data_dir, "marketing_activities.yaml")
+        data = generate_synthetic_activities(25)
+        data["activities"][3]["description"] = "baris pertama\n- bukan item baru\n\nbaris ketiga"
+        
+        # Test case 1: Penulisan bertahap menghasilkan teks yang sama dengan dump biasa
+        print("Test case 1: Penulisan bertahap")
+        write_yaml_records(file_path, "activities", iter(data["activities"]), batch_size=4)
+        with open(file_path) as file:
+            assert file.read() == dump_yaml(data), "Hasil penulisan bertahap berbeda"
+        print("✓ Penulisan bertahap sesuai")
+        
+        # Test case 2: Pembacaan bertahap menghasilkan record yang sama
+        print("Test case 2: Pembacaan bertahap")
+        records = list(iter_yaml_records(file_path, "activities", batch_size=4))
+        assert records == read_yaml_file(file_path)["activities"], "Hasil pembacaan bertahap berbeda"
+        print("✓ Pembacaan bertahap sesuai")
+        
+        # Test case 3: Koleksi kosong
+        print("Test case 3: Koleksi kosong")
+        write_yaml_records(file_path, "activities", [])
+        assert read_yaml_file(file_path) == {"activities": []}, "Koleksi kosong tidak sesuai"
+        assert list(iter_yaml_records(file_path, "activities")) == [], "Pembacaan koleksi kosong tidak sesuai"
+        print("✓ Koleksi kosong sesuai")
+    
+    print("Semua test streaming YAML berhasil!")
+    return True
+
+def test_concurrent_writes():
+    """
+    Menguji penulisan bersamaan dari beberapa thread tidak kehilangan data
+    """
+    print("Menguji penulisan bersamaan...")
+    
+    import tempfile
+    import threading
+    from storage import YamlStorage, get_storage, set_storage
+    from locking import get_lock_metrics
+    from utils_with_edit_delete import add_marketing_activity, get_all_marketing_activities
+    
+    previous_storage = get_storage()
+    with tempfile.TemporaryDirectory() as data_dir:
+        set_storage(YamlStorage(data_dir))
+        try:
+            # Test case 1: 4 thread masing-masing menambahkan 10 aktivitas
+            print("Test case 1: Penambahan aktivitas dari beberapa thread")
+            def worker(n):
+                for i in range(10):
+                    add_marketing_activity(
+                        f"marketing_{n}", f"PT {n}-{i}", "Jakarta", "Kontak", "Manager",
+                        "0812", "kontak@test.com", "2025-05-24 10:00:00", "Email", "Deskripsi"
+                    )
+            threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert len(get_all_marketing_activities()) == 40, "Ada aktivitas yang hilang"
+            print("✓ Tidak ada aktivitas yang hilang")
+            
+            # Test case 2: Waktu tunggu lock tercatat
+            print("Test case 2: Metrik waktu tunggu lock")
+            metrics = get_lock_metrics()
+            assert metrics["activities"]["acquisitions"] >= 40, "Metrik lock tidak tercatat"
+            print("✓ Metrik lock tercatat")
+        finally:
+            set_storage(previous_storage)
+    
+    print("Semua test penulisan bersamaan berhasil!")
+    return True
+
+def test_bulk_import():
+    """
+    Menguji import aktivitas dan follow-up sekaligus
+    """
+    print("Menguji import aktivitas dan follow-up sekaligus...")
+    
+    import tempfile
+    import pandas as pd
+    from storage import YamlStorage, get_storage, set_storage
+    from data_utils import prepare_activity_import
+    from utils_with_edit_delete import (add_marketing_activities_bulk, add_followups_bulk,
+                                        get_all_marketing_activities, get_activity_by_id)
+    
+    previous_storage = get_storage()
+    with tempfile.TemporaryDirectory() as data_dir:
+        set_storage(YamlStorage(data_dir))
+        try:
+            # Test case 1: Validasi baris import
+            print("Test case 1: Validasi baris import")
+            import_df = pd.DataFrame({
+                "Nama Prospek": ["PT A", "", "PT C"],
+                "Lokasi Prospek": ["Jakarta", "Bandung", "Surabaya"],
+                "Nama Kontak Person": ["Andi", "Budi", "Citra"],
+                "Tanggal Aktivitas": ["2025-05-24", "2025-05-25", "bukan tanggal"],
+                "Jenis Aktivitas": ["email", "Meeting", "Demo Produk"],
+                "Deskripsi Aktivitas": ["Kirim brosur", "Rapat", "Demo"],
+            })
+            records, errors = prepare_activity_import(import_df, "marketing_test")
+            assert len(records) == 1, "Jumlah baris valid tidak sesuai"
+            assert records[0]["activity_type"] == "Email", "Jenis aktivitas tidak dinormalisasi"
+            assert len(errors) == 2 and errors[0].startswith("Baris 3"), "Pesan error tidak sesuai"
+            date_df = import_df.iloc[[0, 0, 0]].assign(
+                **{"Tanggal Aktivitas": ["2025-05-06", "06/05/2025 08:30", " 2024-03-04 "]}
+            )
+            date_records, _ = prepare_activity_import(date_df, "marketing_test")
+            assert [r["activity_date"] for r in date_records] == [
+                "2025-05-06 00:00:00", "2025-05-06 08:30:00", "2024-03-04 00:00:00"
+            ], \
+                "Tanggal ISO atau format hari-bulan tertukar"
+            print("✓ Validasi baris import berhasil")
+            
+            # Test case 2: Import banyak aktivitas dalam satu kali tulis
+            print("Test case 2: Import banyak aktivitas")
+            success, message, activity_ids = add_marketing_activities_bulk(records * 50)
+            assert success and len(activity_ids) == 50, f"Import aktivitas gagal: {message}"
+            assert len(get_all_marketing_activities()) == 50, "Jumlah aktivitas tersimpan tidak sesuai"
+            print("✓ Import aktivitas berhasil")
+            
+            # Test case 3: Import follow-up memperbarui status aktivitas
+            print("Test case 3: Import follow-up")
+            followup = {
+                "activity_id": activity_ids[0], "marketer_username": "marketing_test",
+                "followup_date": "2025-05-26 10:00:00", "notes": "Tertarik", "next_action": "Kirim proposal",
+                "next_followup_date": "2025-05-30 10:00:00", "interest_level": 4, "status_update": "dalam_proses"
+            }
+            success, message = add_followups_bulk([followup, {**followup, "status_update": "berhasil"}])
+            assert success, f"Import follow-up gagal: {message}"
+            assert get_activity_by_id(activity_ids[0])["status"] == "berhasil", "Status aktivitas tidak diperbarui"
+            success, message = add_followups_bulk([{**followup, "activity_id": "act-tidak-ada"}])
+            assert not success, "Follow-up untuk aktivitas yang tidak ada seharusnya ditolak"
+            print("✓ Import follow-up berhasil")
+        finally:
+            set_storage(previous_storage)
+    
+    print("Semua test import sekaligus berhasil!")
+    return True
+
+def test_transaction():
+    """
+    Menguji unit of work untuk beberapa koleksi sekaligus
+    """
+    print("Menguji transaksi penyimpanan...")
+    
+    import json
+    import tempfile
+    from storage import YamlStorage, transaction, insert_op, update_op
+    
+    with tempfile.TemporaryDirectory() as data_dir:
+        storage = YamlStorage(data_dir)
+        storage.apply("activities", [insert_op({"id": "act-1", "status": "baru"})])
+        
+        # Test case 1: Commit menulis setiap koleksi satu kali
+        print("Test case 1: Commit satu kali tulis per koleksi")
+        applied = []
+        original_apply = storage.apply
+        storage.apply = lambda collection, ops: (applied.append(collection), original_apply(collection, ops))
+        with transaction(storage) as txn:
+            txn.insert("followups", {"id": "fu-1", "activity_id": "act-1"})
+            txn.insert("followups", {"id": "fu-2", "activity_id": "act-1"})
+            txn.update("activities", "act-1", {"status": "dalam_proses"})
+            assert txn.get("activities", "act-1")["status"] == "dalam_proses", "Perubahan belum terlihat di transaksi"
+        assert sorted(applied) == ["activities", "followups"], "Jumlah penulisan per koleksi tidak sesuai"
+        assert storage.get("activities", "act-1")["status"] == "dalam_proses", "Status tidak tersimpan"
+        assert not os.listdir(storage.transactions_dir()), "File intent tidak dihapus"
+        storage.apply = original_apply
+        print("✓ Commit berhasil")
+        
+        # Test case 2: Exception membatalkan transaksi
+        print("Test case 2: Rollback saat exception")
+        try:
+            with transaction(storage) as txn:
+                txn.delete("activities", "act-1")
+                raise RuntimeError("gagal")
+        except RuntimeError:
+            pass
+        assert storage.get("activities", "act-1") is not None, "Mutasi seharusnya dibatalkan"
+        print("✓ Rollback berhasil")
+        
+        # Test case 3: Intent yang tertinggal (proses mati) diterapkan ulang
+        print("Test case 3: Pemulihan transaksi terputus")
+        with open(os.path.join(storage.transactions_dir(), "crash.json"), "w") as file:
+            json.dump({
+                "activities": [update_op("act-1", {"status": "berhasil"})],
+                "followups": [insert_op({"id": "fu-3", "activity_id": "act-1"})]
+            }, file)
+        with transaction(storage):
+            pass
+        assert storage.get("activities", "act-1")["status"] == "berhasil", "Intent tidak diterapkan"
+        assert storage.get("followups", "fu-3") is not None, "Intent follow-up tidak diterapkan"
+        print("✓ Pemulihan transaksi berhasil")
+    
+    print("Semua test transaksi berhasil!")
+    return True
+
+def test_secondary_indexes():
+    """
+    Menguji indeks sekunder follow-up dan aktivitas di memori
+    """
+    print("Menguji indeks sekunder...")
+    
+    import tempfile
+    from storage import YamlStorage, JournalStorage, insert_op, update_op, delete_op
+    
+    with tempfile.TemporaryDirectory() as data_dir:
+        storage = YamlStorage(data_dir)
+        storage.apply("followups", [
+            insert_op({"id": f"fu-{i}", "activity_id": f"act-{i % 3}", "marketer_username": "m1"})
+            for i in range(9)
+        ])
+        
+        # Test case 1: Pencarian lewat indeks
+        print("Test case 1: Pencarian lewat indeks")
+        assert [f["id"] for f in storage.find("followups", "activity_id", "act-1")] == ["fu-1", "fu-4", "fu-7"], "Hasil indeks tidak sesuai"
+        index_map = storage.secondary_index("followups", "activity_id")
+        print("✓ Pencarian lewat indeks berhasil")
+        
+        # Test case 2: Indeks diperbarui secara inkremental saat menulis
+        print("Test case 2: Pembaruan indeks inkremental")
+        storage.apply("followups", [
+            update_op("fu-1", {"activity_id": "act-2"}),
+            delete_op("fu-4"),
+            insert_op({"id": "fu-9", "activity_id": "act-1", "marketer_username": "m2"}),
+        ])
+        assert storage.secondary_index("followups", "activity_id") is index_map, "Indeks dibangun ulang, bukan diperbarui"
+        assert [f["id"] for f in storage.find("followups", "activity_id", "act-1")] == ["fu-7", "fu-9"], "Indeks tidak diperbarui"
+        assert "fu-1" in {f["id"] for f in storage.find("followups", "activity_id", "act-2")}, "Record yang dipindah tidak ditemukan"
+        print("✓ Pembaruan indeks inkremental berhasil")
+        
+        # Test case 3: Penulisan dari proses lain terlihat di indeks
+        print("Test case 3: Penulisan dari instance lain")
+        journal = JournalStorage(data_dir)
+        assert len(journal.find("followups", "marketer_username", "m1")) == 8, "Indeks journal tidak sesuai"
+        JournalStorage(data_dir).apply("followups", [insert_op({"id": "fu-10", "activity_id": "act-0", "marketer_username": "m1"})])
+        assert len(journal.find("followups", "marketer_username", "m1")) == 9, "Penulisan instance lain tidak terlihat"
+        print("✓ Penulisan dari instance lain terlihat")
+    
+    print("Semua test indeks sekunder berhasil!")
+    return True
+
+def test_dataframe_cache():
+    """
+    Menguji cache DataFrame bertipe per versi data
+    """
+    print("Menguji cache DataFrame...")
+    
+    import tempfile
+    import pandas as pd
+    import frames
+    from storage import YamlStorage, get_storage, set_storage, insert_op, update_op
+    from frames import get_activities_frame, get_followups_frame
+    
+    previous_storage = get_storage()
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            storage = YamlStorage(data_dir)
+            set_storage(storage)
+            storage.apply("activities", [
+                insert_op({"id": f"act-{i}", "marketer_username": f"m{i % 2}", "prospect_name": f"PT {i}",
+                           "activity_type": "Presentasi", "status": "baru",
+                           "created_at": f"2025-05-{i + 1:02d} 10:00:00"})
+                for i in range(4)
+            ])
+            
+            # Test case 1: Kolom bertipe kategori dan datetime
+            print("Test case 1: Tipe kolom")
+            frame = get_activities_frame()
+            assert isinstance(frame["status"].dtype, pd.CategoricalDtype), "Status bukan kategori"
+            assert pd.api.types.is_datetime64_any_dtype(frame["created_at"]), "created_at bukan datetime"
+            assert list(get_activities_frame("m1")["id"]) == ["act-1", "act-3"], "Filter marketing tidak sesuai"
+            assert list(get_activities_frame("m1")["marketer_username"].cat.categories) == ["m1"], "Kategori tidak dipangkas"
+            print("✓ Tipe kolom sesuai")
+            
+            # Test case 2: DataFrame dipakai ulang selama versi data sama
+            print("Test case 2: Cache per versi")
+            cached = frames._frames["activities"]["frames"][None]
+            frame["status"] = "gagal"
+            assert (get_activities_frame()["status"] == "baru").all(), "Perubahan pada salinan bocor ke cache"
+            assert frames._frames["activities"]["frames"][None] is cached, "DataFrame dibangun ulang tanpa perubahan data"
+            print("✓ Cache dipakai ulang")
+            
+            # Test case 3: Penulisan membuat DataFrame dibangun ulang
+            print("Test case 3: Invalidasi setelah penulisan")
+            storage.apply("activities", [update_op("act-0", {"status": "berhasil"})])
+            assert get_activities_frame().set_index("id").loc["act-0", "status"] == "berhasil", "DataFrame tidak diperbarui"
+            assert get_followups_frame().empty, "DataFrame follow-up kosong tidak sesuai"
+            print("✓ DataFrame diperbarui setelah penulisan")
+    finally:
+        set_storage(previous_storage)
+    
+    print("Semua test cache DataFrame berhasil!")
+    return True
+
+def test_columnar_snapshot():
+    """
+    Menguji snapshot kolumnar Arrow untuk halaman analitik
+    """
+    print("Menguji snapshot kolumnar...")
+    
+    import tempfile
+    import pandas as pd
+    import columnar
+    import frames
+    from storage import YamlStorage, JournalStorage, get_storage, set_storage, insert_op, update_op
+    from frames import get_activities_frame
+    from aggregates import rebuild_aggregates, build_aggregates
+    from data_utils import export_to_csv
+    from utils_with_edit_delete import write_yaml
+    
+    if not columnar.is_available():
+        print("pyarrow tidak terpasang, test snapshot kolumnar dilewati")
+        return True
+    import pyarrow as pa
+    
+    previous_storage = get_storage()
+    previous_dir = os.getcwd()
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            storage = YamlStorage(data_dir)
+            set_storage(storage)
+            storage.apply("activities", [
+                insert_op({"id": f"act-{i}", "marketer_username": f"m{i % 2}", "prospect_name": f"PT {i}",
+                           "activity_type": "Presentasi", "status": "baru", "interest_level": i if i % 2 else "tinggi",
+                           "created_at": f"2025-05-{i + 1:02d} 10:00:00"})
+                for i in range(4)
+            ])
+            
+            # Test case 1: Snapshot ditulis dan dibaca dengan column projection
+            print("Test case 1: Tulis dan baca snapshot")
+            assert columnar.read_snapshot("activities", storage=storage) is None, "Snapshot dianggap ada sebelum ditulis"
+            columnar.write_snapshot("activities", storage)
+            frame = columnar.read_snapshot("activities", ["id", "status", "created_at"], storage=storage)
+            assert list(frame.columns) == ["id", "status", "created_at"], "Column projection tidak sesuai"
+            assert isinstance(frame["status"].dtype, pd.CategoricalDtype), "Status bukan kategori"
+            assert pd.api.types.is_datetime64_any_dtype(frame["created_at"]), "created_at bukan datetime"
+            mapped = columnar.open_snapshot("activities", storage).column("id").chunk(0).buffers()[2]
+            shared = pa.array(frame["id"].array).buffers()[2]
+            assert shared.address == mapped.address, "Isi kolom teks disalin dari snapshot yang di-mmap"
+            print("✓ Snapshot ditulis dan dibaca")
+            
+            # Test case 2: DataFrame dimuat dari snapshot tanpa membaca record
+            print("Test case 2: DataFrame dari snapshot")
+            frames.clear_frame_cache()
+            loads = []
+            original_load = storage.load
+            storage.load = lambda collection: loads.append(collection) or original_load(collection)
+            frame = get_activities_frame("m1", columns=["id", "status"])
+            assert list(frame.columns) == ["id", "status"] and list(frame["id"]) == ["act-1", "act-3"], "Filter marketing tidak sesuai"
+            assert list(frame["status"].cat.categories) == ["baru"], "Kategori tidak dipangkas"
+            assert loads == [], "Record dibaca meskipun snapshot mutakhir"
+            aggregates = rebuild_aggregates(storage)
+            assert loads == [], "Agregat dibangun dari record meskipun snapshot mutakhir"
+            storage.load = original_load
+            assert aggregates.to_dict() == build_aggregates(storage.load("activities")).to_dict(), \
+                "Agregat dari snapshot berbeda dengan agregat dari record"
+            print("✓ DataFrame dan agregat dimuat dari snapshot")
+            
+            # Test case 3: Snapshot usang diabaikan, lalu ditulis ulang oleh worker
+            print("Test case 3: Snapshot usang dan worker")
+            worker = columnar.SnapshotWorker(storage, debounce_seconds=0.05).start()
+            storage.add_listener(lambda storage, collection, *args: worker.request(collection))
+            storage.apply("activities", [update_op("act-1", {"status": "berhasil"})])
+            assert get_activities_frame().set_index("id").loc["act-1", "status"] == "berhasil", "Snapshot usang dipakai"
+            assert worker.wait_idle(timeout=10), "Worker snapshot tidak selesai"
+            worker.stop()
+            assert columnar.is_current("activities", storage), "Snapshot tidak ditulis ulang setelah penulisan"
+            assert worker.status()["writes"] == 1, "Penulisan beruntun tidak digabung"
+            print("✓ Snapshot diperbarui setelah penulisan")
+            
+            # Test case 4: Token snapshot backend journal ikut berubah saat journal bertambah
+            print("Test case 4: Token backend journal")
+            journal = JournalStorage(data_dir, compact_threshold=1000)
+            columnar.write_snapshot("activities", journal)
+            journal.apply("activities", [update_op("act-2", {"status": "gagal"})])
+            assert not columnar.is_current("activities", journal), "Snapshot tidak usang setelah journal bertambah"
+            print("✓ Token backend journal sesuai")
+            
+            # Test case 5: Export CSV dari DataFrame kolumnar
+            print("Test case 5: Export CSV")
+            os.chdir(data_dir)
+            success, message, csv_file = export_to_csv("activities", columns=["id", "status"])
+            assert success, message
+            assert list(pd.read_csv(csv_file).columns) == ["id", "status"], "Kolom export tidak sesuai"
+            os.makedirs("data", exist_ok=True)
+            write_yaml(os.path.join("data", "users.yaml"), {"users": [
+                {"username": "admin", "password_hash": "$2b$12$rahasia", "name": "Admin", "role": "superadmin",
+                 "email": "admin@example.com", "created_at": "2025-05-01 10:00:00"}
+            ]})
+            success, message, csv_file = export_to_csv("users")
+            assert success, message
+            with open(csv_file) as file:
+                exported = file.read()
+            assert "password" not in exported and "$2b$" not in exported, "Hash password ikut diekspor"
+            assert list(pd.read_csv(csv_file).columns) == ["username", "name", "role", "email", "created_at"], "Kolom export pengguna tidak sesuai"
+            print("✓ Export CSV berhasil")
+    finally:
+        os.chdir(previous_dir)
+        set_storage(previous_storage)
+        frames.clear_frame_cache()
+    
+    print("Semua test snapshot kolumnar berhasil!")
+    return True
+
+def test_shared_snapshot():
+    """
+    Menguji snapshot Arrow versi yang di-mmap dan dipakai bersama antar-proses
+    """
+    print("Menguji snapshot bersama...")
+    
+    import sys
+    import subprocess
+    import tempfile
+    import columnar
+    from storage import YamlStorage, insert_op, update_op
+    
+    if not columnar.is_available():
+        print("pyarrow tidak terpasang, test snapshot bersama dilewati")
+        return True
+    
+    import pyarrow as pa
+    
+    # Proses pembaca terpisah: membuka snapshot lewat pointer dan mencetak status act-0
+    reader = (
+        "import sys, columnar\n"
+        "from storage import YamlStorage\n"
+        "table = columnar.open_snapshot('activities', YamlStorage(sys.argv[1]))\n"
+        "print(dict(zip(table.column('id').to_pylist(), table.column('status').to_pylist()))['act-0'])\n"
+    )
+    
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            storage = YamlStorage(data_dir)
+            storage.apply("activities", [
+                insert_op({"id": f"act-{i}", "marketer_username": "m1", "prospect_name": f"PT {i}",
+                           "status": "baru", "created_at": "2025-05-01 10:00:00"})
+                for i in range(1000)
+            ])
+            
+            # Test case 1: Tabel dibaca lewat memory map tanpa salinan
+            print("Test case 1: Memory map tanpa salinan")
+            first_path = columnar.write_snapshot("activities", storage)
+            allocated = pa.total_allocated_bytes()
+            table = columnar.open_snapshot("activities", storage)
+            assert table.num_rows == 1000, "Jumlah baris snapshot tidak sesuai"
+            assert pa.total_allocated_bytes() == allocated, "Snapshot disalin ke memori proses"
+            assert columnar.open_snapshot("activities", storage) is table, "Tabel di-mmap ulang tanpa perubahan"
+            print("✓ Snapshot di-mmap tanpa salinan")
+            
+            # Test case 2: Pointer berpindah ke versi baru, versi lama dibersihkan
+            print("Test case 2: Pointer versi")
+            assert columnar.write_snapshot("activities", storage) == first_path, "Snapshot ditulis ulang tanpa perubahan data"
+            storage.apply("activities", [update_op("act-0", {"status": "berhasil"})])
+            assert columnar.open_snapshot("activities", storage) is None, "Snapshot usang dipakai"
+            second_path = columnar.write_snapshot("activities", storage, keep_versions=1)
+            assert second_path != first_path and not os.path.exists(first_path), "Versi lama tidak dibersihkan"
+            updated = columnar.open_snapshot("activities", storage)
+            assert updated is not table and updated.column("status")[0].as_py() == "berhasil", "Pembaca tidak pindah ke versi baru"
+            assert table.column("status")[0].as_py() == "baru", "Tabel versi lama yang masih dipakai rusak"
+            print("✓ Pointer berpindah ke versi baru")
+            
+            # Test case 3: Proses lain membaca versi yang sama lewat pointer
+            print("Test case 3: Pembaca di proses lain")
+            result = subprocess.run(
+                [sys.executable, "-c", reader, data_dir],
+                capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+            )
+            assert result.returncode == 0, result.stderr
+            assert result.stdout.strip() == "berhasil", "Proses lain tidak membaca snapshot terbaru"
+            print("✓ Proses lain membaca snapshot yang sama")
+    finally:
+        columnar.release_snapshots()
+    
+    print("Semua test snapshot bersama berhasil!")
+    return True
+
+def test_slotted_records():
+    """
+    Menguji record ber-slot untuk aktivitas, follow-up dan pengguna
+    """
+    print("Menguji record ber-slot...")
+    
+    import json
+    import pickle
+    import tempfile
+    import tracemalloc
+    import pandas as pd
+    from records import ActivityRecord, UserRecord, to_records
+    from storage import YamlStorage, JournalStorage, SqliteStorage, insert_op, update_op
+    from yaml_io import load_yaml, dump_yaml
+    
+    rows = [
+        {"id": f"act-{i}", "marketer_username": f"m{i % 3}", "prospect_name": f"PT {i}",
+         "prospect_location": "Jakarta", "activity_type": "Presentasi", "status": "baru",
+         "description": f"Deskripsi {i}", "created_at": "2025-05-01 10:00:00"}
+        for i in range(5000)
+    ]
+    
+    # Test case 1: Record bisa dipakai seperti dict
+    print("Test case 1: Kompatibilitas dict")
+    record = ActivityRecord({**rows[0], "catatan_lama": "x"})
+    assert record == rows[0] | {"catatan_lama": "x"} and dict(record) == {**record}, "Isi record tidak sama dengan dict"
+    assert record.get("contact_email") is None and "contact_email" not in record, "Field yang tidak ada dianggap ada"
+    record["status"] = "berhasil"
+    del record["catatan_lama"]
+    assert record["status"] == "berhasil" and len(record) == len(rows[0]), "Perubahan record tidak sesuai"
+    assert pickle.loads(pickle.dumps(record)) == record, "Record tidak bisa dipickle"
+    assert not hasattr(record, "__dict__"), "Record masih punya __dict__"
+    print("✓ Record kompatibel dengan dict")
+    
+    # Test case 2: Nilai kategori di-intern dan memori turun
+    print("Test case 2: Interning dan memori")
+    text = dump_yaml({"activities": rows})
+    tracemalloc.start()
+    parsed = load_yaml(text)["activities"]
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    tracemalloc.start()
+    records = to_records("activities", load_yaml(text)["activities"])
+    record_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert records[0]["prospect_location"] is records[1]["prospect_location"], "Nilai kategori tidak di-intern"
+    assert record_bytes * 2 < dict_bytes, f"Memori record tidak turun: {record_bytes} vs {dict_bytes}"
+    assert dump_yaml({"activities": records}) == text, "Teks YAML record berbeda dengan dict"
+    assert list(pd.DataFrame(records)["id"]) == [row["id"] for row in parsed], "DataFrame dari record tidak sesuai"
+    print(f"✓ Memori turun {dict_bytes / record_bytes:.1f}x")
+    
+    # Test case 3: Semua backend mengembalikan record ber-slot
+    print("Test case 3: Backend penyimpanan")
+    with tempfile.TemporaryDirectory() as data_dir:
+        for storage in (YamlStorage(data_dir), JournalStorage(data_dir), SqliteStorage(data_dir)):
+            storage.apply("activities", [insert_op(dict(row)) for row in rows[:3]])
+            storage.apply("activities", [update_op("act-0", {"status": "gagal"})])
+            loaded = storage.load("activities")
+            assert all(type(item) is ActivityRecord for item in loaded), f"{type(storage).__name__} tidak memakai record ber-slot"
+            assert storage.get("activities", "act-0")["status"] == "gagal", f"{type(storage).__name__} tidak diperbarui"
+            assert json.loads(json.dumps(loaded[0], default=dict)) == loaded[0], "Record tidak bisa diserialisasi ke JSON"
+    assert type(UserRecord({"username": "admin", "role": "superadmin"})["role"]) is str, "Record pengguna tidak sesuai"
+    print("✓ Backend memakai record ber-slot")
+    
+    print("Semua test record ber-slot berhasil!")
+    return True
+
+def test_dashboard_aggregates():
+    """
+    Menguji agregat dashboard yang diperbarui secara inkremental
+    """
+    print("Menguji agregat dashboard...")
+    
+    import tempfile
+    from storage import YamlStorage, get_storage, set_storage, insert_op, update_op, delete_op
+    from aggregates import get_activity_aggregates, verify_aggregates, build_aggregates
+    
+    previous_storage = get_storage()
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            storage = YamlStorage(data_dir)
+            set_storage(storage)
+            storage.apply("activities", [
+                insert_op({"id": f"act-{i}", "marketer_username": f"m{i % 2}", "prospect_name": f"PT {i % 3}",
+                           "prospect_location": "Jakarta", "activity_type": "Presentasi", "status": "baru",
+                           "created_at": f"2025-05-0{i % 2 + 1} 10:00:00"})
+                for i in range(6)
+            ])
+            
+            # Test case 1: Agregat awal
+            print("Test case 1: Agregat awal")
+            aggregates = get_activity_aggregates()
+            assert aggregates.total == 6, "Total aktivitas tidak sesuai"
+            assert aggregates.prospect_count() == 3, "Jumlah prospek unik tidak sesuai"
+            assert dict(aggregates.most_common("day")) == {"2025-05-01": 3, "2025-05-02": 3}, "Agregat harian tidak sesuai"
+            assert get_activity_aggregates("m1").total == 3, "Sub-agregat marketing tidak sesuai"
+            print("✓ Agregat awal sesuai")
+            
+            # Test case 2: Pembaruan inkremental lewat listener penyimpanan
+            print("Test case 2: Pembaruan inkremental")
+            import aggregates as aggregates_module
+            live = aggregates_module._state["aggregates"]
+            storage.apply("activities", [
+                update_op("act-0", {"status": "berhasil"}),
+                delete_op("act-1"),
+                insert_op({"id": "act-9", "marketer_username": "m2", "prospect_name": "PT 9",
+                           "prospect_location": "Bandung", "activity_type": "Demo Produk", "status": "baru",
+                           "created_at": "2025-05-03 10:00:00"}),
+            ])
+            aggregates = get_activity_aggregates()
+            assert aggregates_module._state["aggregates"] is live, "Agregat dihitung ulang, bukan diperbarui"
+            assert dict(aggregates.most_common("status")) == {"baru": 5, "berhasil": 1}, "Agregat status tidak sesuai"
+            assert get_activity_aggregates("m1").total == 2, "Sub-agregat tidak diperbarui"
+            assert aggregates.to_dict() == build_aggregates(storage.load("activities")).to_dict(), "Agregat tidak konsisten"
+            print("✓ Pembaruan inkremental berhasil")
+            
+            # Test case 3: Verifikasi konsistensi
+            print("Test case 3: Verifikasi agregat")
+            assert verify_aggregates() == (True, []), "Verifikasi agregat gagal"
+            print("✓ Verifikasi agregat berhasil")
+    finally:
+        set_storage(previous_storage)
+    
+    print("Semua test agregat dashboard berhasil!")
+    return True
+
+def test_activity_labels():
+    """
+    Menguji lookup label pilihan aktivitas per versi data
+    """
+    print("Menguji label pilihan aktivitas...")
+    
+    import tempfile
+    from storage import YamlStorage, get_storage, set_storage, insert_op, update_op
+    from frames import get_activity_labels
+    
+    previous_storage = get_storage()
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            storage = YamlStorage(data_dir)
+            set_storage(storage)
+            storage.apply("activities", [
+                insert_op({"id": f"act-{i}", "marketer_username": f"m{i % 2}", "prospect_name": f"PT Maju {i}"})
+                for i in range(4)
+            ])
+            
+            # Test case 1: Label dan urutan id
+            print("Test case 1: Label dan urutan id")
+            labels, ids = get_activity_labels()
+            assert ids == ["act-0", "act-1", "act-2", "act-3"], "Urutan id tidak sesuai"
+            assert labels["act-2"] == "act-2 - PT Maju 2", "Label tidak sesuai"
+            assert get_activity_labels("m1")[1] == ["act-1", "act-3"], "Filter marketing tidak sesuai"
+            print("✓ Label sesuai")
+            
+            # Test case 2: Lookup dipakai ulang dan diperbarui setelah penulisan
+            print("Test case 2: Cache per versi")
+            assert get_activity_labels() is get_activity_labels(), "Lookup dibangun ulang tanpa perubahan data"
+            storage.apply("activities", [update_op("act-2", {"prospect_name": "PT Baru"})])
+            assert get_activity_labels()[0]["act-2"] == "act-2 - PT Baru", "Label tidak diperbarui"
+            print("✓ Lookup diperbarui setelah penulisan")
+    finally:
+        set_storage(previous_storage)
+    
+    print("Semua test label pilihan aktivitas berhasil!")
+    return True
+
+def test_activity_query():
+    """
+    Menguji query aktivitas per halaman pada backend YAML dan SQLite
+    """
+    print("Menguji query aktivitas...")
+    
+    import tempfile
+    from datetime import date
+    from storage import YamlStorage, SqliteStorage, get_storage, set_storage, insert_op
+    from utils_with_edit_delete import query_marketing_activities
+    
+    previous_storage = get_storage()
+    try:
+        for backend in (YamlStorage, SqliteStorage):
+            with tempfile.TemporaryDirectory() as data_dir:
+                storage = backend(data_dir)
+                set_storage(storage)
+                storage.apply("activities", [
+                    insert_op({"id": f"act-{i:02d}", "marketer_username": f"m{i % 2}",
+                               "prospect_name": f"PT Maju_{i}", "prospect_location": "Jakarta" if i < 10 else "Bandung",
+                               "status": "baru" if i % 3 else "berhasil",
+                               "created_at": f"2025-05-{i + 1:02d} 10:00:00"})
+                    for i in range(20)
+                ])
+                
+                # Test case 1: Halaman dan jumlah total
+                print(f"Test case 1 ({backend.__name__}): Halaman dan jumlah total")
+                rows, total = query_marketing_activities(offset=5, limit=5)
+                assert total == 20, "Jumlah total tidak sesuai"
+                assert [r["id"] for r in rows] == ["act-14", "act-13", "act-12", "act-11", "act-10"], "Halaman tidak sesuai"
+                print("✓ Halaman sesuai")
+                
+                # Test case 2: Filter status, marketing, tanggal dan pencarian
+                print(f"Test case 2 ({backend.__name__}): Filter")
+                rows, total = query_marketing_activities(status="berhasil", marketer_username="m0", descending=False)
+                assert [r["id"] for r in rows] == ["act-00", "act-06", "act-12", "act-18"] and total == 4, "Filter status/marketing tidak sesuai"
+                rows, total = query_marketing_activities(date_from=date(2025, 5, 3), date_to=date(2025, 5, 4), limit=None)
+                assert sorted(r["id"] for r in rows) == ["act-02", "act-03"], "Filter tanggal tidak sesuai"
+                rows, total = query_marketing_activities(search="BANDUNG", limit=3)
+                assert total == 10 and len(rows) == 3, "Pencarian tidak sesuai"
+                rows, total = query_marketing_activities(search="maju_1", limit=None)
+                assert total == 11, "Pencarian dengan karakter khusus tidak sesuai"
+                print("✓ Filter sesuai")
+    finally:
+        set_storage(previous_storage)
+    
+    print("Semua test query aktivitas berhasil!")
+    return True
+
+def test_archive_tier():
+    """
+    Menguji pemindahan aktivitas selesai ke arsip dingin dan pembacaannya
+    """
+    print("Menguji arsip aktivitas...")
+    
+    import gzip
+    import tempfile
+    from datetime import datetime
+    from storage import YamlStorage, get_storage, set_storage, insert_op
+    from archive import archive_closed_activities, aggregates_with_archive, followup_count_with_archive, get_archive
+    from auto_backup import load_sheet_activities
+    from utils_with_edit_delete import (
+        get_all_marketing_activities, get_activity_by_id, get_followups_by_activity_id,
+        query_marketing_activities
+    )
+    
+    previous_storage = get_storage()
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            storage = YamlStorage(data_dir)
+            set_storage(storage)
+            storage.apply("activities", [
+                insert_op({"id": "act-0", "marketer_username": "m1", "prospect_name": "PT Lama", "status": "berhasil",
+                           "created_at": "2024-01-05 10:00:00", "updated_at": "2024-01-20 10:00:00"}),
+                insert_op({"id": "act-1", "marketer_username": "m1", "prospect_name": "PT Aktif", "status": "gagal",
+                           "created_at": "2024-01-06 10:00:00", "updated_at": "2024-01-06 10:00:00"}),
+                insert_op({"id": "act-2", "marketer_username": "m2", "prospect_name": "PT Terbuka", "status": "baru",
+                           "created_at": "2024-01-07 10:00:00", "updated_at": "2024-01-07 10:00:00"}),
+                insert_op({"id": "act-3", "marketer_username": "m2", "prospect_name": "PT Baru", "status": "berhasil",
+                           "created_at": "2025-05-20 10:00:00", "updated_at": "2025-05-20 10:00:00"}),
+            ])
+            storage.apply("followups", [
+                insert_op({"id": "fu-0", "activity_id": "act-0", "marketer_username": "m1",
+                           "notes": "Kontrak ditandatangani", "created_at": "2024-01-20 10:00:00"}),
+                insert_op({"id": "fu-1", "activity_id": "act-1", "marketer_username": "m1",
+                           "notes": "Ditolak", "created_at": "2025-05-25 10:00:00"}),
+            ])
+            
+            # Test case 1: Hanya aktivitas selesai yang lama tidak berubah yang diarsipkan
+            print("Test case 1: Pengarsipan aktivitas selesai")
+            assert archive_closed_activities(90, now=datetime(2025, 6, 1)) == (1, 1), "Jumlah yang diarsipkan tidak sesuai"
+            assert sorted(a["id"] for a in get_all_marketing_activities()) == ["act-1", "act-2", "act-3"], "Data utama tidak sesuai"
+            assert [f["id"] for f in storage.load("followups")] == ["fu-1"], "Follow-up tidak ikut diarsipkan"
+            archive = get_archive()
+            with gzip.open(archive.archive_path("activities"), 'rt') as file:
+                assert "PT Lama" in file.read(), "Isi arsip tidak sesuai"
+            assert archive_closed_activities(90, now=datetime(2025, 6, 1)) == (0, 0), "Pengarsipan ulang tidak kosong"
+            print("✓ Pengarsipan berhasil")
+            
+            # Test case 2: Arsip hanya dibaca jika diminta
+            print("Test case 2: Arsip dibaca secara lazy")
+            assert get_activity_by_id("act-0") is None, "Aktivitas arsip masih ada di data utama"
+            rows, total = query_marketing_activities(search="lama")
+            assert total == 0, "Pencarian tanpa arsip menemukan data arsip"
+            assert archive.stats()["counts"] == {"activities": 1, "followups": 1}, "Jumlah arsip tidak sesuai"
+            aggregates = aggregates_with_archive()
+            assert aggregates.total == 4 and aggregates.counts["status"]["berhasil"] == 2, "Deal arsip hilang dari agregat"
+            assert aggregates_with_archive("m1").counts["status"]["berhasil"] == 1, "Agregat arsip per marketing tidak sesuai"
+            assert followup_count_with_archive() == 2 and followup_count_with_archive("m1") == 2, \
+                "Follow-up arsip hilang dari jumlah dashboard"
+            assert not archive._cache, "Arsip dibaca tanpa diminta"
+            assert "act-0" in [a["id"] for a in load_sheet_activities()], "Aktivitas arsip hilang dari sheet"
+            assert get_activity_by_id("act-0", include_archived=True)["prospect_name"] == "PT Lama", "Aktivitas arsip tidak ditemukan"
+            assert [f["id"] for f in get_followups_by_activity_id("act-0", include_archived=True)] == ["fu-0"], "Follow-up arsip tidak ditemukan"
+            print("✓ Pembacaan arsip berhasil")
+            
+            # Test case 3: Query gabungan data utama dan arsip
+            print("Test case 3: Query dengan arsip")
+            rows, total = query_marketing_activities(include_archived=True, limit=3)
+            assert total == 4 and [r["id"] for r in rows] == ["act-3", "act-2", "act-1"], "Halaman gabungan tidak sesuai"
+            rows, total = query_marketing_activities(include_archived=True, offset=3, limit=3)
+            assert [r["id"] for r in rows] == ["act-0"], "Halaman kedua gabungan tidak sesuai"
+            rows, total = query_marketing_activities(search="kontrak", include_archived=True)
+            assert [r["id"] for r in rows] == ["act-0"] and total == 1, "Pencarian catatan follow-up arsip tidak sesuai"
+            rows, total = query_marketing_activities(marketer_username="m1", status="berhasil", include_archived=True)
+            assert [r["id"] for r in rows] == ["act-0"], "Filter pada arsip tidak sesuai"
+            print("✓ Query dengan arsip berhasil")
+            
+            # Test case 4: Pengarsipan berikutnya menambah member gzip baru
+            print("Test case 4: Penambahan arsip")
+            assert archive_closed_activities(90, now=datetime(2025, 12, 1)) == (2, 1), "Pengarsipan kedua tidak sesuai"
+            assert sorted(a["id"] for a in get_all_marketing_activities(include_archived=True)) == [
+                "act-0", "act-1", "act-2", "act-3"
+            ], "Gabungan data utama dan arsip tidak sesuai"
+            assert sorted(a["id"] for a in archive.load("activities")) == ["act-0", "act-1", "act-3"], "Arsip lama hilang"
+            assert archive.stats()["counts"] == {"activities": 3, "followups": 2}, "Jumlah arsip tidak diperbarui"
+            assert aggregates_with_archive().counts["status"] == {"berhasil": 2, "gagal": 1, "baru": 1}, \
+                "Agregat gabungan tidak sesuai"
+            expected = archive.stats()["aggregates"].to_dict()
+            os.remove(archive.stats_path())
+            archive._stats = None
+            assert archive.stats()["aggregates"].to_dict() == expected, "Ringkasan arsip yang dihitung ulang berbeda"
+            print("✓ Penambahan arsip berhasil")
+            
+            # Test case 5: Record yang masih ada di data utama (pengarsipan terputus) tidak dihitung dua kali
+            print("Test case 5: Pengarsipan terputus")
+            archive.append("activities", [storage.get("activities", "act-2")])
+            rows, total = query_marketing_activities(include_archived=True, limit=3)
+            assert total == 4, f"Total menghitung record ganda: {total}"
+            rows, total = query_marketing_activities(include_archived=True, offset=3, limit=3)
+            assert [r["id"] for r in rows] == ["act-0"], "Halaman kedua berisi record ganda"
+            print("✓ Pengarsipan terputus berhasil")
+    finally:
+        set_storage(previous_storage)
+    
+    print("Semua test arsip aktivitas berhasil!")
+    return True
+
+def test_search_index():
+    """
+    Menguji indeks pencarian aktivitas dan follow-up
+    """
+    print("Menguji indeks pencarian...")
+    
+    import tempfile
+    import columnar
+    import search_index
+    from storage import YamlStorage, get_storage, set_storage, insert_op, update_op, delete_op
+    from search_index import search_activities
+    
+    previous_storage = get_storage()
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            storage = YamlStorage(data_dir)
+            set_storage(storage)
+            storage.apply("activities", [
+                insert_op({"id": "act-1", "prospect_name": "Café Sejahtera", "prospect_location": "Bandung",
+                           "contact_person": "Budi", "description": "Presentasi produk"}),
+                insert_op({"id": "act-2", "prospect_name": "PT Bandung Raya", "prospect_location": "Jakarta",
+                           "contact_person": "Sari", "description": "Demo untuk kafe di Bandung"}),
+            ])
+            
+            # Test case 1: Normalisasi huruf, diakritik dan awalan
+            print("Test case 1: Normalisasi dan awalan")
+            assert search_activities("cafe") == ["act-1"], "Diakritik tidak dinormalkan"
+            assert search_activities("SEJAH") == ["act-1"], "Pencarian awalan gagal"
+            assert search_activities("sejahtera jakarta") == [], "Semua token kueri harus cocok"
+            print("✓ Normalisasi dan awalan berhasil")
+            
+            # Test case 2: Peringkat berdasarkan bobot field
+            print("Test case 2: Peringkat")
+            assert search_activities("bandung") == ["act-2", "act-1"], "Peringkat tidak sesuai"
+            print("✓ Peringkat sesuai")
+            
+            # Test case 3: Pembaruan inkremental termasuk catatan follow-up
+            print("Test case 3: Pembaruan inkremental")
+            index = search_index._state["index"]
+            storage.apply("followups", [insert_op({"id": "fu-1", "activity_id": "act-1", "notes": "Minta penawaran harga"})])
+            storage.apply("activities", [update_op("act-2", {"prospect_name": "PT Nusantara"})])
+            assert search_activities("penawaran") == ["act-1"], "Catatan follow-up tidak terindeks"
+            assert search_activities("nusantara") == ["act-2"], "Perubahan aktivitas tidak terindeks"
+            assert search_activities("raya") == [], "Token lama tidak dihapus"
+            storage.apply("followups", [delete_op("fu-1")])
+            assert search_activities("penawaran") == [], "Follow-up yang dihapus masih ditemukan"
+            assert search_index._state["index"] is index, "Indeks dibangun ulang, bukan diperbarui"
+            print("✓ Pembaruan inkremental berhasil")
+            
+            # Test case 4: Indeks dibangun dari snapshot kolumnar yang mutakhir
+            if columnar.is_available():
+                print("Test case 4: Indeks dari snapshot kolumnar")
+                storage.apply("followups", [insert_op({"id": "fu-2", "activity_id": "act-2", "notes": "Kirim brosur"})])
+                for collection in ("activities", "followups"):
+                    columnar.write_snapshot(collection, storage)
+                loads = []
+                original_load = storage.load
+                storage.load = lambda collection: loads.append(collection) or original_load(collection)
+                search_index.rebuild_search_index(storage)
+                storage.load = original_load
+                assert loads == [], "Indeks dibangun dari record meskipun snapshot mutakhir"
+                assert search_activities("brosur") == ["act-2"] and search_activities("cafe") == ["act-1"], \
+                    "Indeks dari snapshot tidak sesuai"
+                print("✓ Indeks dari snapshot kolumnar berhasil")
+    finally:
+        set_storage(previous_storage)
+    
+    print("Semua test indeks pencarian berhasil!")
+    return True
+
+def test_auth_cache():
+    """
+    Menguji indeks pengguna dan cache kredensial
+    """
+    print("Menguji indeks pengguna dan cache kredensial...")
+    
+    import uuid
+    import tempfile
+    from auth import CredentialCache, get_user_index
+    from utils_with_edit_delete import add_user, delete_user, authenticate_user, write_yaml
+    
+    # Test case 1: Cache kredensial dengan batas ukuran dan TTL
+    print("Test case 1: Cache kredensial")
+    cache = CredentialCache(max_size=2, ttl=60)
+    cache.add("a", "pw", "hash-a")
+    cache.add("b", "pw", "hash-b")
+    cache.add("c", "pw", "hash-c")
+    assert not cache.contains("a", "pw", "hash-a"), "Entri tertua tidak dibuang"
+    assert cache.contains("c", "pw", "hash-c"), "Entri tidak ditemukan"
+    assert not cache.contains("c", "salah", "hash-c"), "Password salah cocok dengan cache"
+    assert not cache.contains("c", "pw", "hash-baru"), "Hash berubah tetapi cache masih cocok"
+    cache.configure(2, 0)
+    cache.add("d", "pw", "hash-d")
+    assert not cache.contains("d", "pw", "hash-d"), "TTL 0 seharusnya tidak menyimpan entri"
+    print("✓ Cache kredensial berhasil")
+    
+    # Test case 2: Indeks pengguna diperbarui saat pengguna ditambah/dihapus
+    # (di direktori data sementara agar data/users.yaml tidak berubah)
+    print("Test case 2: Indeks pengguna")
+    previous_dir = os.getcwd()
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            os.chdir(work_dir)
+            os.makedirs("data")
+            write_yaml(os.path.join("data", "users.yaml"), {"users": []})
+            username = f"auth_test_{uuid.uuid4().hex[:6]}"
+            success, message = add_user(username, "rahasia123", "Auth Test", "marketing", "auth@example.com")
+            assert success, f"Gagal menambah pengguna: {message}"
+            assert username in get_user_index(), "Pengguna baru tidak ada di indeks"
+            assert authenticate_user(username, "rahasia123") is not None, "Autentikasi gagal"
+            assert authenticate_user(username, "salah") is None, "Password salah diterima"
+            assert authenticate_user(username, "rahasia123") is not None, "Autentikasi dari cache gagal"
+            delete_user(username, "admin")
+            assert username not in get_user_index(), "Pengguna terhapus masih ada di indeks"
+            assert authenticate_user(username, "rahasia123") is None, "Pengguna terhapus masih bisa login"
+    finally:
+        os.chdir(previous_dir)
+    print("✓ Indeks pengguna berhasil")
+    
+    print("Semua test indeks pengguna dan cache kredensial berhasil!")
+    return True
+
+def test_password_pool():
+    """
+    Menguji pool proses untuk hash dan verifikasi password
+    """
+    print("Menguji pool password...")
+    
+    from auth import PasswordPool, PasswordPoolBusy
+    
+    # Test case 1: Hash dan verifikasi lewat proses worker
+    print("Test case 1: Hash dan verifikasi di worker")
+    pool = PasswordPool({"password_workers": 1, "password_queue_limit": 1})
+    hashed = pool.hash("rahasia", 4)
+    assert hashed.startswith("$2b$04$"), "Cost bcrypt tidak dipakai"
+    assert pool.verify("rahasia", hashed), "Verifikasi gagal"
+    assert not pool.verify("salah", hashed), "Password salah diterima"
+    metrics = pool.metrics()
+    assert metrics["operations"]["verify"]["count"] == 2 and metrics["fallbacks"] == 0, "Metrik tidak sesuai"
+    print("✓ Hash dan verifikasi di worker berhasil")
+    
+    # Test case 2: Batas antrian
+    print("Test case 2: Batas antrian")
+    pool._pending = 1
+    try:
+        pool.verify("rahasia", hashed)
+        assert False, "Permintaan melebihi batas antrian seharusnya ditolak"
+    except PasswordPoolBusy:
+        pass
+    finally:
+        pool._pending = 0
+    assert pool.metrics()["rejected"] == 1, "Penolakan tidak tercatat"
+    pool._executor.shutdown()
+    
+    # Setelah timeout, slot antrian tetap terpakai sampai bcrypt di worker selesai
+    slow_pool = PasswordPool({"password_workers": 1, "password_queue_limit": 1, "password_timeout": 0.01})
+    try:
+        slow_pool.hash("rahasia", 12)
+        assert False, "Permintaan seharusnya timeout"
+    except PasswordPoolBusy:
+        pass
+    assert slow_pool.metrics()["pending"] == 1, "Slot dilepas sebelum pekerjaan selesai"
+    deadline = time.time() + 30
+    while slow_pool.metrics()["pending"] and time.time() < deadline:
+        time.sleep(0.05)
+    assert slow_pool.metrics()["pending"] == 0, "Slot tidak dilepas setelah pekerjaan selesai"
+    slow_pool._executor.shutdown()
+    print("✓ Batas antrian berhasil")
+    
+    # Test case 3: Tanpa worker bcrypt dijalankan langsung
+    print("Test case 3: Tanpa worker")
+    inline_pool = PasswordPool({"password_workers": 0})
+    assert inline_pool.verify("rahasia", hashed), "Verifikasi langsung gagal"
+    assert inline_pool._executor is None, "Pool proses tidak seharusnya dibuat"
+    print("✓ Tanpa worker berhasil")
+    
+    print("Semua test pool password berhasil!")
+    return True
+
+def test_initialize_database_once():
+    """
+    Menguji inisialisasi file database yang hanya berjalan sekali per proses
+    """
+    print("Menguji inisialisasi database sekali jalan...")
+    
+    import tempfile
+    import utils_with_edit_delete
+    from auth import password_pool
+    from utils_with_edit_delete import initialize_database, get_initialization_state
+    
+    def hash_count():
+        return password_pool.metrics()["operations"].get("hash", {}).get("count", 0)
+    
+    previous_dir = os.getcwd()
+    previous_state = dict(utils_with_edit_delete._initialization)
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            os.chdir(work_dir)
+            
+            # Test case 1: File yang belum ada dibuat, hanya sekali per proses
+            print("Test case 1: Inisialisasi pertama")
+            utils_with_edit_delete._initialization.update({"done": False, "created_files": []})
+            initialize_database()
+            state = get_initialization_state()
+            assert state["done"] and len(state["created_files"]) == 4, "File default tidak dibuat"
+            hashes = hash_count()
+            os.remove(os.path.join("data", "followups.yaml"))
+            initialize_database()
+            assert not os.path.exists(os.path.join("data", "followups.yaml")), "Inisialisasi berjalan lebih dari sekali"
+            print("✓ Inisialisasi pertama berhasil")
+            
+            # Test case 2: Tidak ada hash bcrypt jika users.yaml sudah ada
+            print("Test case 2: Tanpa hash jika users.yaml ada")
+            utils_with_edit_delete._initialization.update({"done": False, "created_files": []})
+            initialize_database()
+            assert get_initialization_state()["created_files"] == [os.path.join("data", "followups.yaml")], "File yang dibuat tidak sesuai"
+            assert hash_count() == hashes, "Password admin di-hash ulang meskipun users.yaml sudah ada"
+            print("✓ Tanpa hash jika users.yaml ada")
+    finally:
+        os.chdir(previous_dir)
+        utils_with_edit_delete._initialization.update(previous_state)
+    
+    print("Semua test inisialisasi database berhasil!")
+    return True
+
+def test_sheet_sync():
+    """
+    Menguji worker sinkronisasi Google Sheets dengan client gspread palsu
+    """
+    print("Menguji sinkronisasi Google Sheets...")
+    
+    import re
+    import tempfile
+    from storage import YamlStorage, get_storage, set_storage, transaction
+    from auto_backup import SheetClient, SheetSyncWorker, SHEET_HEADER
+    
+    class FakeWorksheet:
+        id = 0
+        
+        def __init__(self):
+            self.rows = []
+            self.calls = []
+            self.failures = 0
+            self.spreadsheet = None
+        
+        def get_all_values(self):
+            self.calls.append("get_all_values")
+            return [list(row) for row in self.rows]
+        
+        def col_values(self, col):
+            self.calls.append("col_values")
+            values = [row[col - 1] if len(row) >= col else "" for row in self.rows]
+            while values and values[-1] == "":
+                values.pop()
+            return values
+        
+        def clear(self):
+            self.calls.append("clear")
+            self.rows = []
+        
+        def update(self, values, range_name):
+            self.calls.append("update")
+            start = int(re.match(r"[A-Z]+(\d+)", range_name).group(1)) - 1
+            self.rows[start:start + len(values)] = [list(row) for row in values]
+        
+        def batch_update(self, data):
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("Koneksi terputus")
+            self.calls.append(("batch_update", len(data)))
+            for item in data:
+                self.rows[int(re.match(r"[A-Z]+(\d+)", item["range"]).group(1)) - 1] = list(item["values"][0])
+        
+        def append_rows(self, values):
+            self.calls.append(("append_rows", len(values)))
+            self.rows.extend(list(row) for row in values)
+        
+    class FakeClient:
+        def __init__(self, worksheet):
+            self.sheet1 = worksheet
+            worksheet.spreadsheet = self
+            self.failures = 0
+            self.opened = 0
+        
+        def batch_update(self, body):
+            self.sheet1.calls.append(("delete_rows", len(body["requests"])))
+            for request in body["requests"]:
+                rows = request["deleteDimension"]["range"]
+                del self.sheet1.rows[rows["startIndex"]:rows["endIndex"]]
+        
+        def open_by_key(self, key):
+            self.opened += 1
+            return self
+        
+        def fetch_sheet_metadata(self, params=None):
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("Koneksi terputus")
+            return {"spreadsheetId": "sheet-key"}
+    
+    def expected_rows(storage):
+        return [SHEET_HEADER] + [
+            [record["id"], record["prospect_name"], record["prospect_location"], record["activity_date"],
+             record["status"], record["marketer_username"]]
+            for record in storage.load("activities")
+        ]
+    
+    def activity(activity_id, prospect_name):
+        return {"id": activity_id, "prospect_name": prospect_name, "prospect_location": "Bandung",
+                "activity_date": "2025-01-01", "status": "baru", "marketer_username": "marketing"}
+    
+    previous_storage = get_storage()
+    worker = None
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            storage = YamlStorage(data_dir)
+            set_storage(storage)
+            with transaction(storage) as txn:
+                for i in range(1, 5):
+                    txn.insert("activities", activity(f"act-{i}", f"Prospek {i}"))
+            worksheet = FakeWorksheet()
+            client = FakeClient(worksheet)
+            sheet_client = SheetClient(lambda: client, "sheet-key")
+            worker = SheetSyncWorker(sheet_client, debounce_seconds=0.05, backoff_seconds=0.01).start()
+            
+            # Test case 1: Permintaan beruntun digabung menjadi satu sinkronisasi
+            print("Test case 1: Debounce permintaan")
+            for _ in range(5):
+                worker.request_sync()
+            assert worker.wait_idle(5), "Sinkronisasi tidak selesai"
+            status = worker.status()
+            assert status["syncs"] == 1, "Permintaan beruntun tidak digabung"
+            assert status["last_sync"]["rewritten"] and status["lag_seconds"] == 0.0, "Status sinkronisasi tidak sesuai"
+            assert worksheet.rows == expected_rows(storage), "Isi sheet tidak sesuai"
+            print("✓ Debounce permintaan berhasil")
+            
+            # Test case 2: Versi per record dan delta (dry run) tanpa menulis ke sheet
+            print("Test case 2: Versi record dan dry run")
+            with transaction(storage) as txn:
+                txn.update("activities", "act-2", {"status": "tertarik"})
+                txn.update("activities", "act-2", {"prospect_location": "Jakarta"})
+                txn.delete("activities", "act-1")
+                txn.delete("activities", "act-3")
+                txn.insert("activities", activity("act-5", "Prospek 5"))
+            assert storage.get("activities", "act-2")["version"] == 2, "Versi record tidak naik sekali per transaksi"
+            assert storage.get("activities", "act-5")["version"] == 1, "Record baru tidak mulai dari versi 1"
+            worksheet.calls = []
+            delta = worker.diff()
+            assert delta == {"rewrite": False, "deleted": ["act-1", "act-3"], "updated": ["act-2"], "appended": ["act-5"]}, \
+                f"Delta tidak sesuai: {delta}"
+            assert worksheet.calls == ["col_values"], "Dry run menulis ke sheet"
+            print("✓ Versi record dan dry run berhasil")
+            
+            # Test case 3: Hanya baris yang berubah yang dikirim
+            print("Test case 3: Sinkronisasi inkremental")
+            worksheet.calls = []
+            worker.request_sync()
+            assert worker.wait_idle(5), "Sinkronisasi tidak selesai"
+            assert worksheet.calls == ["col_values", ("delete_rows", 2), ("batch_update", 1), ("append_rows", 1)], \
+                f"Panggilan sheet tidak sesuai: {worksheet.calls}"
+            assert worksheet.rows == expected_rows(storage), "Isi sheet tidak sesuai setelah perubahan"
+            print("✓ Sinkronisasi inkremental berhasil")
+            
+            # Test case 4: Kegagalan diulang dengan jeda
+            print("Test case 4: Percobaan ulang")
+            worksheet.failures = 2
+            with transaction(storage) as txn:
+                txn.update("activities", "act-4", {"prospect_name": "Prospek Empat"})
+            worker.request_sync()
+            assert worker.wait_idle(5), "Sinkronisasi tidak selesai"
+            status = worker.status()
+            assert status["retries"] == 2 and status["failures"] == 0, "Percobaan ulang tidak sesuai"
+            assert status["last_error"] is None and status["lag_seconds"] == 0.0, "Status setelah pulih tidak sesuai"
+            assert worksheet.rows == expected_rows(storage), "Isi sheet tidak sesuai setelah percobaan ulang"
+            print("✓ Percobaan ulang berhasil")
+            
+            # Test case 5: Client dipakai ulang dan dibuat ulang hanya setelah gagal
+            print("Test case 5: Cache client")
+            metrics = sheet_client.metrics()
+            assert client.opened == 3 and metrics["connects"] == 3, "Client tidak dipakai ulang"
+            assert metrics["invalidations"] == 2 and metrics["connected"], "Koneksi gagal tidak dibuang"
+            client.failures = 1
+            ok, message, _ = sheet_client.health_check()
+            assert not ok and not sheet_client.metrics()["connected"], "Cek koneksi gagal tidak terdeteksi"
+            ok, message, _ = sheet_client.health_check()
+            assert ok and sheet_client.metrics()["connects"] == 4, "Cek koneksi tidak terhubung ulang"
+            print("✓ Cache client berhasil")
+            
+            # Test case 6: Sinkronisasi penuh memperbaiki baris yang diubah di luar aplikasi
+            print("Test case 6: Sinkronisasi penuh")
+            worksheet.rows[1][1] = "Diubah manual"
+            worksheet.calls = []
+            summary = SheetSyncWorker(sheet_client).sync_now()
+            assert not summary["rewritten"] and summary["updated"] == 1 and summary["appended"] == 0, "Sinkronisasi penuh tidak sesuai"
+            assert worksheet.calls == ["get_all_values", ("batch_update", 1)], "Panggilan sheet tidak perlu"
+            assert worksheet.rows == expected_rows(storage), "Isi sheet tidak diperbaiki"
+            worksheet.rows[0] = ["Header", "Rusak"]
+            assert worker.diff(full_resync=True)["rewrite"], "Header rusak tidak memicu tulis ulang"
+            assert worker.sync_now(full_resync=True)["rewritten"], "Sheet tidak ditulis ulang"
+            assert worksheet.rows == expected_rows(storage), "Isi sheet tidak sesuai setelah ditulis ulang"
+            print("✓ Sinkronisasi penuh berhasil")
+            
+            # Test case 7: Posisi baris dibaca ulang jika sheet diurutkan ulang di luar worker
+            print("Test case 7: Sheet diurutkan ulang di antara sinkronisasi")
+            worksheet.rows[1:] = list(reversed(worksheet.rows[1:]))
+            with transaction(storage) as txn:
+                txn.update("activities", "act-4", {"prospect_name": "Prospek Empat Baru"})
+                txn.delete("activities", "act-2")
+            worker.request_sync()
+            assert worker.wait_idle(5), "Sinkronisasi tidak selesai"
+            assert worksheet.rows[0] == SHEET_HEADER, "Header sheet berubah"
+            assert sorted(worksheet.rows[1:]) == sorted(expected_rows(storage)[1:]), \
+                "Baris yang salah dihapus atau ditimpa setelah sheet diurutkan ulang"
+            print("✓ Sheet diurutkan ulang berhasil")
+    finally:
+        if worker is not None:
+            worker.stop(5)
+        set_storage(previous_storage)
+    
+    print("Semua test sinkronisasi Google Sheets berhasil!")
+    return True
+
 def run_all_tests():
     """
     Menjalankan semua test
@@ -234,6 +1797,98 @@ def run_all_tests():
     test_data_backup_restore()
     print("\n")
     
+    # Uji backup inkremental
+    test_incremental_backup()
+    print("\n")
+    
+    # Uji backend penyimpanan journal
+    test_journal_storage()
+    print("\n")
+    
+    # Uji backend penyimpanan SQLite
+    test_sqlite_storage()
+    print("\n")
+    
+    # Uji backend penyimpanan terpartisi
+    test_partitioned_storage()
+    print("\n")
+    
+    # Uji cache YAML
+    test_yaml_cache()
+    print("\n")
+    
+    # Uji streaming YAML
+    test_yaml_streaming_io()
+    print("\n")
+    
+    # Uji penulisan bersamaan
+    test_concurrent_writes()
+    print("\n")
+    
+    # Uji import sekaligus
+    test_bulk_import()
+    print("\n")
+    
+    # Uji transaksi penyimpanan
+    test_transaction()
+    print("\n")
+    
+    # Uji indeks sekunder
+    test_secondary_indexes()
+    print("\n")
+    
+    # Uji cache DataFrame
+    test_dataframe_cache()
+    print("\n")
+    
+    # Uji snapshot kolumnar
+    test_columnar_snapshot()
+    print("\n")
+    
+    # Uji snapshot bersama
+    test_shared_snapshot()
+    print("\n")
+    
+    # Uji record ber-slot
+    test_slotted_records()
+    print("\n")
+    
+    # Uji agregat dashboard
+    test_dashboard_aggregates()
+    print("\n")
+    
+    # Uji label pilihan aktivitas
+    test_activity_labels()
+    print("\n")
+    
+    # Uji query aktivitas
+    test_activity_query()
+    print("\n")
+    
+    # Uji arsip aktivitas
+    test_archive_tier()
+    print("\n")
+    
+    # Uji indeks pencarian
+    test_search_index()
+    print("\n")
+    
+    # Uji indeks pengguna dan cache kredensial
+    test_auth_cache()
+    print("\n")
+    
+    # Uji pool password
+    test_password_pool()
+    print("\n")
+    
+    # Uji inisialisasi database sekali jalan
+    test_initialize_database_once()
+    print("\n")
+    
+    # Uji sinkronisasi Google Sheets
+    test_sheet_sync()
+    print("\n")
+    
     print("Semua test berhasil!")
     return True
 
@@ -1,35 +1,50 @@
-import yaml
 import os
-import bcrypt
 import uuid
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 import streamlit as st
+from storage import get_storage, transaction
+from repository import read_cached_yaml, store_cached_yaml, invalidate
+from yaml_io import write_yaml_file
+from locking import data_lock
+from search_index import search_activities
+from archive import get_archive, with_archived, search_archived_activities, query_with_archive
+from auth import get_security_settings, get_user_index, credential_cache, password_pool, PasswordPoolBusy
 
-# Fungsi untuk membuat file YAML jika belum ada
+# Jenis aktivitas dan status prospek yang dikenali aplikasi
+ACTIVITY_TYPES = ["Presentasi", "Demo Produk", "Follow-up Call", "Email", "Meeting", "Lainnya"]
+ACTIVITY_STATUSES = ["baru", "dalam_proses", "berhasil", "gagal"]
+
+# Fungsi untuk membuat file YAML jika belum ada (True jika file dibuat)
 def create_yaml_if_not_exists(file_path, default_content):
     if not os.path.exists(file_path):
-        with open(file_path, 'w') as file:
-            yaml.dump(default_content, file)
+        write_yaml_file(file_path, default_content)
+        store_cached_yaml(file_path, default_content)
+        return True
+    return False
 
-# Fungsi untuk membaca data dari file YAML
+# Fungsi untuk membaca data dari file YAML (di-cache per proses, lihat repository.py)
 def read_yaml(file_path):
-    if os.path.exists(file_path):
-        with open(file_path, 'r') as file:
-            return yaml.safe_load(file)
-    return None
+    return read_cached_yaml(file_path)
 
 # Fungsi untuk menulis data ke file YAML
 def write_yaml(file_path, data):
-    with open(file_path, 'w') as file:
-        yaml.dump(data, file)
+    try:
+        write_yaml_file(file_path, data)
+    except Exception:
+        invalidate(file_path)
+        raise
+    store_cached_yaml(file_path, data)
 
-# Fungsi untuk hash password
+# Fungsi untuk hash password (cost bcrypt diatur lewat security_settings.bcrypt_rounds)
+# bcrypt dijalankan di pool proses (lihat auth.PasswordPool)
 def hash_password(password):
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    rounds = get_security_settings()["bcrypt_rounds"]
+    return password_pool.hash(password, rounds)
 
 # Fungsi untuk verifikasi password
 def verify_password(password, hashed_password):
-    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    return password_pool.verify(password, hashed_password)
 
 # Fungsi untuk membuat ID unik
 def generate_id(prefix):
@@ -39,67 +54,149 @@ def generate_id(prefix):
 def get_current_timestamp():
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+# Status inisialisasi file database di proses ini
+_initialization = {"done": False, "initialized_at": None, "created_files": []}
+_initialization_lock = threading.Lock()
+
 # Fungsi untuk inisialisasi file database
 def initialize_database():
-    # Direktori data
-    data_dir = "data"
-    if not os.path.exists(data_dir):
-        os.makedirs(data_dir)
-    
-    # File users.yaml
-    users_file = os.path.join(data_dir, "users.yaml")
-    default_users = {
-        "users": [
-            {
-                "username": "admin",
-                "password_hash": hash_password("admin123"),
-                "name": "Admin Utama",
-                "role": "superadmin",
-                "email": "admin@example.com",
-                "created_at": get_current_timestamp()
+    """
+    Dipanggil di setiap rerun Streamlit, tetapi hanya bekerja sekali per
+    proses. Default (termasuk hash bcrypt password admin) hanya dibuat untuk
+    file yang memang belum ada.
+    """
+    if _initialization["done"]:
+        return
+    
+    with _initialization_lock:
+        if _initialization["done"]:
+            return
+        
+        # Direktori data
+        data_dir = "data"
+        if not os.path.exists(data_dir):
+            os.makedirs(data_dir)
+        
+        created_files = []
+        
+        # File users.yaml
+        users_file = os.path.join(data_dir, "users.yaml")
+        if not os.path.exists(users_file):
+            default_users = {
+                "users": [
+                    {
+                        "username": "admin",
+                        "password_hash": hash_password("admin123"),
+                        "name": "Admin Utama",
+                        "role": "superadmin",
+                        "email": "admin@example.com",
+                        "created_at": get_current_timestamp()
+                    }
+                ]
             }
-        ]
-    }
-    create_yaml_if_not_exists(users_file, default_users)
-    
-    # File marketing_activities.yaml
-    activities_file = os.path.join(data_dir, "marketing_activities.yaml")
-    default_activities = {"activities": []}
-    create_yaml_if_not_exists(activities_file, default_activities)
-    
-    # File followups.yaml
-    followups_file = os.path.join(data_dir, "followups.yaml")
-    default_followups = {"followups": []}
-    create_yaml_if_not_exists(followups_file, default_followups)
-    
-    # File config.yaml
-    config_file = os.path.join(data_dir, "config.yaml")
-    default_config = {
-        "app_settings": {
-            "app_name": "AI Suara Marketing Tracker",
-            "version": "1.0.0",
-            "theme": "light",
-            "date_format": "%Y-%m-%d %H:%M:%S"
-        },
-        "notification_settings": {
-            "enable_email": False,
-            "enable_reminder": True,
-            "reminder_days_before": 1
-        }
-    }
-    create_yaml_if_not_exists(config_file, default_config)
+            if create_yaml_if_not_exists(users_file, default_users):
+                created_files.append(users_file)
+        
+        # File marketing_activities.yaml
+        activities_file = os.path.join(data_dir, "marketing_activities.yaml")
+        if create_yaml_if_not_exists(activities_file, {"activities": []}):
+            created_files.append(activities_file)
+        
+        # File followups.yaml
+        followups_file = os.path.join(data_dir, "followups.yaml")
+        if create_yaml_if_not_exists(followups_file, {"followups": []}):
+            created_files.append(followups_file)
+        
+        # File config.yaml
+        config_file = os.path.join(data_dir, "config.yaml")
+        if not os.path.exists(config_file):
+            default_config = {
+                "app_settings": {
+                    "app_name": "AI Suara Marketing Tracker",
+                    "version": "1.0.0",
+                    "theme": "light",
+                    "date_format": "%Y-%m-%d %H:%M:%S"
+                },
+                "notification_settings": {
+                    "enable_email": False,
+                    "enable_reminder": True,
+                    "reminder_days_before": 1
+                },
+                "storage_settings": {
+                    "backend": "yaml",
+                    "journal": {
+                        "compact_threshold": 1000
+                    },
+                    "sqlite": {
+                        "db_file": "marketing_tracker.db"
+                    },
+                    "partitioned": {
+                        "directory": "partitions"
+                    }
+                },
+                "security_settings": {
+                    "bcrypt_rounds": 12,
+                    "credential_cache_ttl": 300,
+                    "credential_cache_size": 256,
+                    "password_workers": 2,
+                    "password_queue_limit": 16,
+                    "password_timeout": 30
+                },
+                "sheets_settings": {
+                    "enabled": True,
+                    "spreadsheet_key": "1SdEX5TzMzKfKcE1oCuaez2ctxgIxwwipkk9NT0jOYtI",
+                    "credentials_file": "service_account_key.json",
+                    "debounce_seconds": 2,
+                    "max_delay_seconds": 30,
+                    "max_retries": 5,
+                    "backoff_seconds": 1,
+                    "backoff_max_seconds": 60,
+                    "client_max_age_seconds": 3600
+                },
+                "backup_settings": {
+                    "keep_last": 10,
+                    "keep_hourly": 24,
+                    "keep_daily": 30
+                },
+                "columnar_settings": {
+                    "enabled": True,
+                    "debounce_seconds": 1,
+                    "keep_versions": 2
+                },
+                "archive_settings": {
+                    "min_age_days": 180
+                }
+            }
+            if create_yaml_if_not_exists(config_file, default_config):
+                created_files.append(config_file)
+        
+        _initialization.update({
+            "done": True,
+            "initialized_at": get_current_timestamp(),
+            "created_files": created_files
+        })
+
+# Fungsi untuk mendapatkan status inisialisasi file database
+def get_initialization_state():
+    return dict(_initialization)
 
 # Fungsi untuk autentikasi pengguna
 def authenticate_user(username, password):
     users_file = os.path.join("data", "users.yaml")
-    users_data = read_yaml(users_file)
+    user = get_user_index(users_file).get(username)
     
-    if not users_data or "users" not in users_data:
+    if user is None:
         return None
     
-    for user in users_data["users"]:
-        if user["username"] == username and verify_password(password, user["password_hash"]):
-            return user
+    # Kredensial yang baru saja diverifikasi tidak perlu dihitung ulang dengan bcrypt
+    settings = get_security_settings()
+    credential_cache.configure(settings["credential_cache_size"], settings["credential_cache_ttl"])
+    if credential_cache.contains(username, password, user["password_hash"]):
+        return user
+    
+    if verify_password(password, user["password_hash"]):
+        credential_cache.add(username, password, user["password_hash"])
+        return user
     
     return None
 
@@ -116,28 +213,39 @@ def get_all_users():
 # Fungsi untuk menambahkan pengguna baru
 def add_user(username, password, name, role, email):
     users_file = os.path.join("data", "users.yaml")
-    users_data = read_yaml(users_file)
     
-    if not users_data:
-        users_data = {"users": []}
-    
-    # Cek apakah username sudah ada
-    for user in users_data["users"]:
-        if user["username"] == username:
-            return False, "Username sudah digunakan"
-    
-    # Tambahkan pengguna baru
-    new_user = {
-        "username": username,
-        "password_hash": hash_password(password),
-        "name": name,
-        "role": role,
-        "email": email,
-        "created_at": get_current_timestamp()
-    }
-    
-    users_data["users"].append(new_user)
-    write_yaml(users_file, users_data)
+    # Cek apakah username sudah ada sebelum menghitung hash yang lambat
+    if username in get_user_index(users_file):
+        return False, "Username sudah digunakan"
+    
+    # Hash dihitung di luar lock agar pengguna lain tidak ikut menunggu bcrypt
+    try:
+        password_hash = hash_password(password)
+    except PasswordPoolBusy:
+        return False, "Server sedang sibuk, silakan coba lagi sebentar lagi"
+    
+    with data_lock("users"):
+        users_data = read_yaml(users_file)
+        
+        if not users_data:
+            users_data = {"users": []}
+        
+        # Cek ulang di dalam lock karena sesi lain bisa menambahkan username yang sama
+        for user in users_data["users"]:
+            if user["username"] == username:
+                return False, "Username sudah digunakan"
+        
+        # Tambahkan pengguna baru
+        new_user = {
+            "username": username,
+            "password_hash": password_hash,
+            "name": name,
+            "role": role,
+            "email": email,
+            "created_at": get_current_timestamp()
+        }
+        
+        write_yaml(users_file, {**users_data, "users": users_data["users"] + [new_user]})
     
     return True, "Pengguna berhasil ditambahkan"
 
@@ -148,55 +256,87 @@ def delete_user(username, current_user_username):
         return False, "Anda tidak dapat menghapus akun Anda sendiri"
     
     users_file = os.path.join("data", "users.yaml")
-    users_data = read_yaml(users_file)
-    
-    if not users_data or "users" not in users_data:
-        return False, "Data pengguna tidak ditemukan"
-    
-    # Cari pengguna yang akan dihapus
-    user_found = False
-    new_users_list = []
-    
-    for user in users_data["users"]:
-        if user["username"] == username:
-            user_found = True
-        else:
-            new_users_list.append(user)
-    
-    if not user_found:
-        return False, "Pengguna tidak ditemukan"
     
-    # Update data pengguna
-    users_data["users"] = new_users_list
-    write_yaml(users_file, users_data)
+    with data_lock("users"):
+        users_data = read_yaml(users_file)
+        
+        if not users_data or "users" not in users_data:
+            return False, "Data pengguna tidak ditemukan"
+        
+        # Cari pengguna yang akan dihapus
+        user_found = False
+        new_users_list = []
+        
+        for user in users_data["users"]:
+            if user["username"] == username:
+                user_found = True
+            else:
+                new_users_list.append(user)
+        
+        if not user_found:
+            return False, "Pengguna tidak ditemukan"
+        
+        # Update data pengguna
+        write_yaml(users_file, {**users_data, "users": new_users_list})
     
     return True, f"Pengguna {username} berhasil dihapus"
 
 # Fungsi untuk mendapatkan semua aktivitas pemasaran
-def get_all_marketing_activities():
-    activities_file = os.path.join("data", "marketing_activities.yaml")
-    activities_data = read_yaml(activities_file)
-    
-    if not activities_data or "activities" not in activities_data:
-        return []
-    
-    return activities_data["activities"]
+# (arsip aktivitas yang sudah selesai hanya dibaca jika include_archived=True)
+def get_all_marketing_activities(include_archived=False):
+    activities = get_storage().load("activities")
+    if include_archived:
+        return with_archived(activities, get_archive().load("activities"))
+    return activities
 
 # Fungsi untuk mendapatkan aktivitas pemasaran berdasarkan username
-def get_marketing_activities_by_username(username):
-    activities = get_all_marketing_activities()
-    return [activity for activity in activities if activity["marketer_username"] == username]
+def get_marketing_activities_by_username(username, include_archived=False):
+    activities = get_storage().find("activities", "marketer_username", username)
+    if include_archived:
+        return with_archived(activities, get_archive().find("activities", "marketer_username", username))
+    return activities
+
+# Fungsi untuk mengambil satu halaman aktivitas pemasaran sesuai filter
+def query_marketing_activities(status=None, marketer_username=None, date_from=None, date_to=None,
+                               search=None, sort_by="created_at", descending=True, offset=0, limit=50,
+                               include_archived=False):
+    """
+    Filter tanggal berlaku untuk created_at (date_from dan date_to inklusif).
+    Pencarian memakai indeks pencarian (nama prospek, lokasi, kontak,
+    deskripsi dan catatan follow-up); dengan sort_by=None hasil diurutkan
+    dari yang paling relevan. Pada backend SQLite filter, urutan dan halaman
+    dijalankan di database. Dengan include_archived=True arsip ikut dicari;
+    hasil dari arsip menyusul hasil utama jika diurutkan menurut relevansi.
+    Mengembalikan (daftar aktivitas pada halaman, jumlah total yang cocok).
+    """
+    ids = None
+    if search:
+        ids = search_activities(search)
+        if not ids and not include_archived:
+            return [], 0
+    ranges = {}
+    if date_from or date_to:
+        ranges["created_at"] = (
+            date_from.strftime("%Y-%m-%d") if date_from else None,
+            (date_to + timedelta(days=1)).strftime("%Y-%m-%d") if date_to else None
+        )
+    query = dict(
+        filters={"status": status, "marketer_username": marketer_username},
+        ranges=ranges,
+        sort_by=sort_by,
+        descending=descending,
+        offset=offset,
+        limit=limit
+    )
+    if include_archived:
+        archived_ids = search_archived_activities(search) if search else None
+        return query_with_archive("activities", ids=ids, archived_ids=archived_ids, **query)
+    return get_storage().query("activities", ids=ids, **query)
 
 # Fungsi untuk menambahkan aktivitas pemasaran baru
 def add_marketing_activity(marketer_username, prospect_name, prospect_location, 
                           contact_person, contact_position, contact_phone, 
                           contact_email, activity_date, activity_type, description):
-    activities_file = os.path.join("data", "marketing_activities.yaml")
-    activities_data = read_yaml(activities_file)
-    
-    if not activities_data:
-        activities_data = {"activities": []}
-    
     # Buat ID baru
     activity_id = generate_id("act")
     
@@ -218,141 +358,168 @@ def add_marketing_activity(marketer_username, prospect_name, prospect_location,
         "updated_at": get_current_timestamp()
     }
     
-    activities_data["activities"].append(new_activity)
-    write_yaml(activities_file, activities_data)
+    with transaction() as txn:
+        txn.insert("activities", new_activity)
     
     return True, "Aktivitas pemasaran berhasil ditambahkan", activity_id
 
+# Fungsi untuk menambahkan banyak aktivitas pemasaran sekaligus (satu kali tulis)
+def add_marketing_activities_bulk(activities):
+    """
+    activities berisi dict dengan field yang sama seperti parameter
+    add_marketing_activity (termasuk marketer_username), opsional dengan
+    status. Seluruh aktivitas disimpan dalam satu operasi tulis.
+    """
+    if not activities:
+        return False, "Tidak ada aktivitas untuk ditambahkan", []
+    
+    timestamp = get_current_timestamp()
+    new_activities = []
+    
+    for activity in activities:
+        new_activities.append({
+            "id": generate_id("act"),
+            "marketer_username": activity["marketer_username"],
+            "prospect_name": activity["prospect_name"],
+            "prospect_location": activity["prospect_location"],
+            "contact_person": activity["contact_person"],
+            "contact_position": activity.get("contact_position", ""),
+            "contact_phone": activity.get("contact_phone", ""),
+            "contact_email": activity.get("contact_email", ""),
+            "activity_date": activity["activity_date"],
+            "activity_type": activity["activity_type"],
+            "description": activity["description"],
+            "status": activity.get("status") or "baru",
+            "created_at": timestamp,
+            "updated_at": timestamp
+        })
+    
+    with transaction() as txn:
+        for activity in new_activities:
+            txn.insert("activities", activity)
+    
+    return True, f"{len(new_activities)} aktivitas pemasaran berhasil ditambahkan", [a["id"] for a in new_activities]
+
 # Fungsi untuk mengedit aktivitas pemasaran
 def edit_marketing_activity(activity_id, prospect_name, prospect_location, 
                            contact_person, contact_position, contact_phone, 
                            contact_email, activity_date, activity_type, description, status):
-    activities_file = os.path.join("data", "marketing_activities.yaml")
-    activities_data = read_yaml(activities_file)
-    
-    if not activities_data or "activities" not in activities_data:
-        return False, "Data aktivitas tidak ditemukan"
-    
-    # Cari aktivitas yang akan diedit
-    activity_found = False
-    
-    for activity in activities_data["activities"]:
-        if activity["id"] == activity_id:
-            activity_found = True
-            
-            # Update data aktivitas
-            activity["prospect_name"] = prospect_name
-            activity["prospect_location"] = prospect_location
-            activity["contact_person"] = contact_person
-            activity["contact_position"] = contact_position
-            activity["contact_phone"] = contact_phone
-            activity["contact_email"] = contact_email
-            activity["activity_date"] = activity_date
-            activity["activity_type"] = activity_type
-            activity["description"] = description
-            activity["status"] = status
-            activity["updated_at"] = get_current_timestamp()
-            
-            break
-    
-    if not activity_found:
-        return False, "Aktivitas tidak ditemukan"
-    
-    # Simpan perubahan
-    write_yaml(activities_file, activities_data)
+    with transaction() as txn:
+        if not txn.load("activities"):
+            return False, "Data aktivitas tidak ditemukan"
+        
+        # Cari aktivitas yang akan diedit
+        if txn.get("activities", activity_id) is None:
+            return False, "Aktivitas tidak ditemukan"
+        
+        # Simpan perubahan
+        txn.update("activities", activity_id, {
+            "prospect_name": prospect_name,
+            "prospect_location": prospect_location,
+            "contact_person": contact_person,
+            "contact_position": contact_position,
+            "contact_phone": contact_phone,
+            "contact_email": contact_email,
+            "activity_date": activity_date,
+            "activity_type": activity_type,
+            "description": description,
+            "status": status,
+            "updated_at": get_current_timestamp()
+        })
     
     return True, "Aktivitas pemasaran berhasil diperbarui"
 
 # Fungsi untuk menghapus aktivitas pemasaran
 def delete_marketing_activity(activity_id):
-    activities_file = os.path.join("data", "marketing_activities.yaml")
-    activities_data = read_yaml(activities_file)
-    
-    if not activities_data or "activities" not in activities_data:
-        return False, "Data aktivitas tidak ditemukan"
-    
-    # Cari aktivitas yang akan dihapus
-    activity_found = False
-    new_activities_list = []
-    
-    for activity in activities_data["activities"]:
-        if activity["id"] == activity_id:
-            activity_found = True
-        else:
-            new_activities_list.append(activity)
-    
-    if not activity_found:
-        return False, "Aktivitas tidak ditemukan"
-    
-    # Update data aktivitas
-    activities_data["activities"] = new_activities_list
-    write_yaml(activities_file, activities_data)
-    
-    # Hapus juga semua follow-up terkait
-    followups_file = os.path.join("data", "followups.yaml")
-    followups_data = read_yaml(followups_file)
-    
-    if followups_data and "followups" in followups_data:
-        new_followups_list = [f for f in followups_data["followups"] if f["activity_id"] != activity_id]
-        followups_data["followups"] = new_followups_list
-        write_yaml(followups_file, followups_data)
+    # Aktivitas dan follow-up terkait dihapus dalam satu transaksi
+    with transaction() as txn:
+        if not txn.load("activities"):
+            return False, "Data aktivitas tidak ditemukan"
+        
+        # Cari aktivitas yang akan dihapus
+        if txn.get("activities", activity_id) is None:
+            return False, "Aktivitas tidak ditemukan"
+        
+        txn.delete("activities", activity_id)
+        
+        # Hapus juga semua follow-up terkait
+        for followup in txn.find("followups", "activity_id", activity_id):
+            txn.delete("followups", followup["id"])
     
     return True, "Aktivitas pemasaran berhasil dihapus"
 
 # Fungsi untuk memperbarui status aktivitas pemasaran
 def update_activity_status(activity_id, new_status):
-    activities_file = os.path.join("data", "marketing_activities.yaml")
-    activities_data = read_yaml(activities_file)
-    
-    if not activities_data or "activities" not in activities_data:
+    with transaction() as txn:
+        return stage_activity_status(txn, activity_id, new_status)
+
+# Fungsi untuk mencatat perubahan status aktivitas ke dalam transaksi yang sedang berjalan
+def stage_activity_status(txn, activity_id, new_status):
+    if not txn.load("activities"):
         return False, "Data aktivitas tidak ditemukan"
     
-    for activity in activities_data["activities"]:
-        if activity["id"] == activity_id:
-            activity["status"] = new_status
-            activity["updated_at"] = get_current_timestamp()
-            write_yaml(activities_file, activities_data)
-            return True, "Status aktivitas berhasil diperbarui"
+    if txn.get("activities", activity_id) is None:
+        return False, "Aktivitas tidak ditemukan"
     
-    return False, "Aktivitas tidak ditemukan"
+    txn.update("activities", activity_id, {
+        "status": new_status,
+        "updated_at": get_current_timestamp()
+    })
+    return True, "Status aktivitas berhasil diperbarui"
 
 # Fungsi untuk mendapatkan aktivitas pemasaran berdasarkan ID
-def get_activity_by_id(activity_id):
-    activities = get_all_marketing_activities()
-    for activity in activities:
-        if activity["id"] == activity_id:
-            return activity
-    return None
+def get_activity_by_id(activity_id, include_archived=False):
+    activity = get_storage().get("activities", activity_id)
+    if activity is None and include_archived:
+        activity = get_archive().get("activities", activity_id)
+    return activity
+
+# Fungsi untuk mengecek apakah aktivitas hanya ada di arsip (hanya-baca)
+def is_activity_archived(activity_id):
+    return get_storage().get("activities", activity_id) is None \
+        and get_archive().get("activities", activity_id) is not None
 
 # Fungsi untuk mendapatkan semua follow-up
-def get_all_followups():
-    followups_file = os.path.join("data", "followups.yaml")
-    followups_data = read_yaml(followups_file)
-    
-    if not followups_data or "followups" not in followups_data:
-        return []
-    
-    return followups_data["followups"]
+def get_all_followups(include_archived=False):
+    followups = get_storage().load("followups")
+    if include_archived:
+        return with_archived(followups, get_archive().load("followups"))
+    return followups
 
 # Fungsi untuk mendapatkan follow-up berdasarkan activity_id
-def get_followups_by_activity_id(activity_id):
-    followups = get_all_followups()
-    return [followup for followup in followups if followup["activity_id"] == activity_id]
+def get_followups_by_activity_id(activity_id, include_archived=False):
+    followups = get_storage().find("followups", "activity_id", activity_id)
+    if include_archived:
+        return with_archived(followups, get_archive().find("followups", "activity_id", activity_id))
+    return followups
 
 # Fungsi untuk mendapatkan follow-up berdasarkan username
-def get_followups_by_username(username):
-    followups = get_all_followups()
-    return [followup for followup in followups if followup["marketer_username"] == username]
+def get_followups_by_username(username, include_archived=False):
+    followups = get_storage().find("followups", "marketer_username", username)
+    if include_archived:
+        return with_archived(followups, get_archive().find("followups", "marketer_username", username))
+    return followups
+
+# Fungsi untuk mendapatkan follow-up yang dijadwalkan dalam beberapa hari ke depan
+def get_upcoming_followups(marketer_username=None, days=7):
+    """
+    Mengembalikan follow-up dengan next_followup_date antara sekarang dan
+    sekarang + days (inklusif), terurut dari jadwal terdekat. Pada backend
+    terpartisi hanya partisi yang rentang jadwalnya beririsan yang dibuka.
+    """
+    now = datetime.now()
+    end = now + timedelta(days=days, seconds=1)
+    followups, _ = get_storage().query(
+        "followups",
+        filters={"marketer_username": marketer_username},
+        ranges={"next_followup_date": (now.strftime("%Y-%m-%d %H:%M:%S"), end.strftime("%Y-%m-%d %H:%M:%S"))},
+        sort_by="next_followup_date"
+    )
+    return followups
 
 # Fungsi untuk menambahkan follow-up baru
 def add_followup(activity_id, marketer_username, followup_date, notes, 
                 next_action, next_followup_date, interest_level, status_update):
-    followups_file = os.path.join("data", "followups.yaml")
-    followups_data = read_yaml(followups_file)
-    
-    if not followups_data:
-        followups_data = {"followups": []}
-    
     # Buat ID baru
     followup_id = generate_id("fu")
     
@@ -370,14 +537,57 @@ def add_followup(activity_id, marketer_username, followup_date, notes,
         "created_at": get_current_timestamp()
     }
     
-    followups_data["followups"].append(new_followup)
-    write_yaml(followups_file, followups_data)
-    
-    # Update status aktivitas
-    update_activity_status(activity_id, status_update)
+    # Follow-up dan status aktivitas ditulis bersama dalam satu transaksi
+    with transaction() as txn:
+        txn.insert("followups", new_followup)
+        
+        # Update status aktivitas
+        stage_activity_status(txn, activity_id, status_update)
     
     return True, "Follow-up berhasil ditambahkan"
 
+# Fungsi untuk menambahkan banyak follow-up sekaligus
+def add_followups_bulk(followups):
+    """
+    followups berisi dict dengan field yang sama seperti parameter add_followup.
+    Semua follow-up ditulis dalam satu operasi, lalu status setiap aktivitas
+    terkait diperbarui sekali memakai status_update follow-up terakhirnya.
+    """
+    if not followups:
+        return False, "Tidak ada follow-up untuk ditambahkan"
+    
+    with transaction() as txn:
+        known_ids = {activity["id"] for activity in txn.load("activities")}
+        unknown_ids = sorted({f["activity_id"] for f in followups} - known_ids)
+        if unknown_ids:
+            return False, f"Aktivitas tidak ditemukan: {', '.join(unknown_ids)}"
+        
+        timestamp = get_current_timestamp()
+        new_followups = []
+        latest_status = {}
+        
+        for followup in followups:
+            new_followups.append({
+                "id": generate_id("fu"),
+                "activity_id": followup["activity_id"],
+                "marketer_username": followup["marketer_username"],
+                "followup_date": followup["followup_date"],
+                "notes": followup["notes"],
+                "next_action": followup["next_action"],
+                "next_followup_date": followup["next_followup_date"],
+                "interest_level": followup["interest_level"],
+                "status_update": followup["status_update"],
+                "created_at": timestamp
+            })
+            latest_status[followup["activity_id"]] = followup["status_update"]
+        
+        for followup in new_followups:
+            txn.insert("followups", followup)
+        for activity_id, status in latest_status.items():
+            txn.update("activities", activity_id, {"status": status, "updated_at": timestamp})
+    
+    return True, f"{len(new_followups)} follow-up berhasil ditambahkan"
+
 # Fungsi untuk mendapatkan konfigurasi aplikasi
 def get_app_config():
     config_file = os.path.join("data", "config.yaml")
@@ -391,7 +601,8 @@ def get_app_config():
 # Fungsi untuk memperbarui konfigurasi aplikasi
 def update_app_config(config_data):
     config_file = os.path.join("data", "config.yaml")
-    write_yaml(config_file, config_data)
+    with data_lock("config"):
+        write_yaml(config_file, config_data)
     return True, "Konfigurasi berhasil diperbarui"
 
 # Fungsi untuk cek login - FIXED: Hanya mengembalikan user, bukan tuple
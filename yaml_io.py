@@ -0,0 +1,225 @@
+import os
+import time
+import tempfile
+import yaml
+from collections.abc import Mapping
+from contextlib import contextmanager
+
+# Gunakan loader/dumper berbasis libyaml (C) jika tersedia, jika tidak pakai
+# implementasi Python murni. Keduanya menghasilkan data dan teks YAML yang sama.
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+    LIBYAML_AVAILABLE = True
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+    LIBYAML_AVAILABLE = False
+
+# Record non-dict (misalnya record ber-slot di records.py) ditulis sebagai mapping biasa
+def _represent_mapping(dumper, data):
+    return dumper.represent_dict(dict(data))
+
+for _dumper in {SafeDumper, yaml.SafeDumper}:
+    _dumper.add_multi_representer(Mapping, _represent_mapping)
+
+# Jumlah record yang di-parse/ditulis per batch saat streaming
+STREAM_BATCH_SIZE = 1000
+
+# Fungsi untuk parse YAML dari string atau file object
+def load_yaml(stream, loader=None):
+    return yaml.load(stream, Loader=loader or SafeLoader)
+
+# Fungsi untuk serialisasi data ke YAML (ke stream jika diberikan, jika tidak ke string)
+def dump_yaml(data, stream=None, dumper=None):
+    return yaml.dump(data, stream, Dumper=dumper or SafeDumper)
+
+# Fungsi untuk membaca file YAML
+def read_yaml_file(file_path):
+    if os.path.exists(file_path):
+        with open(file_path, 'r') as file:
+            return load_yaml(file)
+    return None
+
+# Fungsi untuk fsync direktori agar hasil rename ikut tersimpan permanen
+def _fsync_directory(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        # Tidak didukung di semua platform (misalnya Windows)
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+# Context manager untuk menulis file secara atomik
+@contextmanager
+def atomic_write(file_path, mode='w'):
+    """
+    Isi ditulis ke file sementara di direktori yang sama, di-fsync, lalu
+    menggantikan file tujuan lewat os.replace. Jika proses mati di tengah
+    penulisan, file lama tetap utuh.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(file_path)}.", suffix=".tmp", dir=directory
+    )
+    try:
+        try:
+            os.chmod(temp_path, os.stat(file_path).st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(temp_path, 0o644)
+        with os.fdopen(fd, mode) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    _fsync_directory(directory)
+
+# Fungsi untuk menulis file YAML secara atomik
+def write_yaml_file(file_path, data):
+    with atomic_write(file_path) as file:
+        dump_yaml(data, file)
+
+# Fungsi untuk membaca record koleksi satu per satu dari file YAML
+def iter_yaml_records(file_path, key, batch_size=STREAM_BATCH_SIZE):
+    """
+    Menghasilkan record dari file berbentuk {key: [record, ...]} tanpa memuat
+    seluruh dokumen sekaligus. File yang ditulis dumper ini meletakkan setiap
+    item daftar di kolom 0 dengan awalan "- ", sementara baris lanjutan selalu
+    menjorok, sehingga file bisa dipotong per item lalu di-parse per batch.
+    Untuk file dengan bentuk lain, seluruh dokumen di-parse seperti biasa.
+    """
+    if not os.path.exists(file_path):
+        return
+    with open(file_path, 'r') as file:
+        header = file.readline()
+        if header != f"{key}:\n":
+            file.seek(0)
+            data = load_yaml(file)
+            if data and data.get(key):
+                yield from data[key]
+            return
+
+        lines = []
+        items = 0
+        for line in file:
+            if line.startswith("-") and (line.startswith("- ") or line == "-\n"):
+                if items >= batch_size:
+                    yield from load_yaml("".join(lines)) or []
+                    lines = []
+                    items = 0
+                items += 1
+            lines.append(line)
+        if lines:
+            yield from load_yaml("".join(lines)) or []
+
+# Fungsi untuk menulis record koleksi ke file YAML secara bertahap
+def write_yaml_records(file_path, key, records, batch_size=STREAM_BATCH_SIZE):
+    """
+    Pasangan iter_yaml_records: menulis {key: records} per batch sehingga
+    teks YAML hasil akhirnya sama dengan dump_yaml({key: list(records)}).
+    Penulisan bersifat atomik seperti write_yaml_file.
+    """
+    with atomic_write(file_path) as file:
+        batch = []
+        written = 0
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                if written == 0:
+                    file.write(f"{key}:\n")
+                dump_yaml(batch, file)
+                written += len(batch)
+                batch = []
+        if batch:
+            if written == 0:
+                file.write(f"{key}:\n")
+            dump_yaml(batch, file)
+            written += len(batch)
+        if written == 0:
+            dump_yaml({key: []}, file)
+
+# Fungsi untuk membuat data aktivitas sintetis untuk benchmark
+def generate_synthetic_activities(count):
+    statuses = ["baru", "dalam_proses", "berhasil", "gagal"]
+    types = ["Presentasi", "Demo Produk", "Follow-up Call", "Email", "Meeting", "Lainnya"]
+    activities = []
+    for i in range(count):
+        activities.append({
+            "id": f"act-{i:08x}",
+            "marketer_username": f"marketing_{i % 25}",
+            "prospect_name": f"PT Prospek {i}",
+            "prospect_location": f"Kota {i % 120}",
+            "contact_person": f"Kontak {i}",
+            "contact_position": "Manager",
+            "contact_phone": f"08{i:010d}",
+            "contact_email": f"kontak{i}@example.com",
+            "activity_date": "2025-05-24 10:00:00",
+            "activity_type": types[i % len(types)],
+            "description": f"Presentasi produk AI Suara untuk prospek {i}",
+            "status": statuses[i % len(statuses)],
+            "created_at": "2025-05-24 09:59:58",
+            "updated_at": "2025-05-24 09:59:58"
+        })
+    return {"activities": activities}
+
+# Fungsi untuk membandingkan kecepatan loader/dumper C dan Python murni
+def run_benchmark(sizes=(10000, 100000), work_dir="."):
+    """
+    Menulis file aktivitas sintetis untuk setiap ukuran lalu mengukur waktu
+    dump dan load dengan implementasi Python murni dan libyaml.
+    Mengembalikan daftar dict hasil pengukuran (dalam detik).
+    """
+    implementations = [("python", yaml.SafeLoader, yaml.SafeDumper)]
+    if LIBYAML_AVAILABLE:
+        implementations.append(("libyaml", yaml.CSafeLoader, yaml.CSafeDumper))
+
+    results = []
+    for size in sizes:
+        data = generate_synthetic_activities(size)
+        file_path = os.path.join(work_dir, f"benchmark_activities_{size}.yaml")
+        try:
+            for name, loader, dumper in implementations:
+                start = time.perf_counter()
+                with open(file_path, 'w') as file:
+                    dump_yaml(data, file, dumper=dumper)
+                dump_seconds = time.perf_counter() - start
+
+                start = time.perf_counter()
+                with open(file_path, 'r') as file:
+                    loaded = load_yaml(file, loader=loader)
+                load_seconds = time.perf_counter() - start
+
+                assert len(loaded["activities"]) == size
+                results.append({
+                    "records": size,
+                    "implementation": name,
+                    "dump_seconds": dump_seconds,
+                    "load_seconds": load_seconds,
+                    "file_size": os.path.getsize(file_path)
+                })
+        finally:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        sizes = [int(arg) for arg in sys.argv[2:]] or [10000, 100000]
+        print(f"libyaml tersedia: {LIBYAML_AVAILABLE}")
+        print(f"{'Record':>10} {'Implementasi':>12} {'Dump (s)':>10} {'Load (s)':>10} {'Ukuran (MB)':>12}")
+        for result in run_benchmark(sizes):
+            print(f"{result['records']:>10} {result['implementation']:>12} "
+                  f"{result['dump_seconds']:>10.2f} {result['load_seconds']:>10.2f} "
+                  f"{result['file_size'] / 1024 / 1024:>12.1f}")
+    else:
+        print("Penggunaan: python yaml_io.py benchmark [jumlah_record ...]")